@@ -0,0 +1,79 @@
+"""
+Mesure du temps d'import de l'application
+
+Chaque mesure importe app.py dans un interpréteur neuf (aucun module en cache),
+comme au démarrage d'un worker. La médiane des exécutions est comparée à
+IMPORT_TIME_BUDGET_SECONDS; l'option --detail affiche les modules les plus
+coûteux d'après python -X importtime.
+
+Usage:
+    python bench_import.py
+    python bench_import.py --runs 10 --detail 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from config import IMPORT_TIME_BUDGET_SECONDS
+
+DOSSIER_BACKEND = os.path.dirname(os.path.abspath(__file__))
+
+MESURE = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+
+
+def mesurer_import(runs):
+    """Durées (secondes) de `import app` sur `runs` interpréteurs neufs"""
+    durees = []
+    for _ in range(runs):
+        sortie = subprocess.run(
+            [sys.executable, '-c', MESURE],
+            cwd=DOSSIER_BACKEND, capture_output=True, text=True, check=True
+        )
+        durees.append(float(sortie.stdout.strip().splitlines()[-1]))
+    return durees
+
+
+def modules_les_plus_couteux(limite):
+    """(durée cumulée en secondes, module) des imports les plus lents, d'après -X importtime"""
+    sortie = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=DOSSIER_BACKEND, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for ligne in sortie.stderr.splitlines():
+        if not ligne.startswith('import time:') or 'cumulative' in ligne:
+            continue
+        _, cumule, module = ligne[len('import time:'):].split('|')
+        modules.append((int(cumule) / 1e6, module.strip()))
+    return sorted(modules, reverse=True)[:limite]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Temps d'import de l'API AppISIS")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=IMPORT_TIME_BUDGET_SECONDS)
+    parser.add_argument('--detail', type=int, default=0, metavar='N',
+                        help="affiche les N modules les plus lents à importer")
+    args = parser.parse_args(argv)
+
+    durees = mesurer_import(args.runs)
+    mediane = statistics.median(durees)
+    print(f"import app: médiane {mediane:.3f}s, min {min(durees):.3f}s, max {max(durees):.3f}s "
+          f"({args.runs} exécutions, budget {args.budget:.3f}s)")
+
+    if args.detail:
+        for duree, module in modules_les_plus_couteux(args.detail):
+            print(f"  {duree:8.3f}s  {module}")
+
+    if mediane > args.budget:
+        print(f"✗ Budget dépassé de {mediane - args.budget:.3f}s")
+        return 1
+    print("✓ Dans le budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Cache des graphiques rendus (images PNG encodées en base64)
+
+Les entrées sont adressées par leur contenu: la clé est un hash du type de
+graphique, des filtres appliqués et du numéro de version de la collection
+source. Toute écriture dans la collection incrémente sa version, ce qui rend
+les anciennes clés inaccessibles; elles finissent évincées par la politique LRU.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+class ChartCache:
+    """Cache LRU thread-safe borné par un budget en octets"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(collection, chart_type, filters, version):
+        """Construit la clé (utilisée aussi comme ETag) d'un graphique"""
+        payload = json.dumps({
+            "collection": collection,
+            "chart": chart_type,
+            "filters": filters,
+            "version": version
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Renvoie l'image en cache ou None, et la marque comme récemment utilisée"""
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key, image):
+        """Ajoute une image et évince les entrées les plus anciennes au-delà du budget"""
+        size = len(image)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= len(self._entries.pop(key))
+            self._entries[key] = image
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def stats(self):
+        """Statistiques d'utilisation du cache"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
@@ -0,0 +1,133 @@
+"""
+Rendu des graphiques (PNG base64) sans la machine à états de pyplot
+
+Chaque graphique est décrit par une spécification simple (dictionnaire de
+listes et de chaînes) puis rendu dans un pool de processus. Les figures sont
+créées avec matplotlib.figure.Figure et le canevas Agg: aucun état global
+n'est partagé entre deux rendus, et le GIL ne limite plus le nombre de
+graphiques rendus en parallèle.
+"""
+
+import base64
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+CHART_STYLE = 'seaborn-v0_8'
+FIGSIZE = (12, 8)
+DPI = 150
+
+
+def _init_worker():
+    """Initialise un processus de rendu: backend Agg et style appliqués une seule fois"""
+    import matplotlib
+    matplotlib.use('Agg')
+    # Sous-module non chargé par "import matplotlib" (l'API n'importe plus seaborn)
+    import matplotlib.style
+    matplotlib.style.use(CHART_STYLE)
+
+
+def _draw_pie(ax, spec):
+    kwargs = {'labels': spec['labels'], 'autopct': '%1.1f%%'}
+    if spec.get('colors'):
+        kwargs['colors'] = spec['colors']
+    if spec.get('startangle') is not None:
+        kwargs['startangle'] = spec['startangle']
+    if spec.get('wedge_width'):
+        kwargs['wedgeprops'] = dict(width=spec['wedge_width'])
+    ax.pie(spec['values'], **kwargs)
+
+
+def _draw_bar(ax, spec):
+    bars = ax.bar(spec['labels'], spec['values'], color=spec.get('color'))
+
+    # Ajouter les valeurs sur les barres
+    if spec.get('value_format'):
+        for bar in bars:
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width() / 2., height + spec.get('label_offset', 0),
+                    spec['value_format'].format(height),
+                    ha='center', va='bottom', fontsize=12)
+
+    if spec.get('ylim'):
+        ax.set_ylim(*spec['ylim'])
+
+
+def _draw_line(ax, spec):
+    for serie in spec['series']:
+        ax.plot(serie['x'], serie['y'], marker='o', linewidth=2, label=serie.get('label'))
+
+    if spec.get('legend_title'):
+        ax.legend(title=spec['legend_title'])
+    if spec.get('grid'):
+        ax.grid(True, linestyle='--', alpha=0.7)
+
+
+_DRAWERS = {
+    'pie': _draw_pie,
+    'bar': _draw_bar,
+    'line': _draw_line,
+}
+
+
+def render_chart(spec):
+    """Rend une spécification de graphique et renvoie l'image PNG encodée en base64"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=FIGSIZE)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+
+    _DRAWERS[spec['type']](ax, spec)
+
+    ax.set_title(spec['title'], fontsize=16)
+    if spec.get('xlabel'):
+        ax.set_xlabel(spec['xlabel'], fontsize=spec.get('label_fontsize'))
+    if spec.get('ylabel'):
+        ax.set_ylabel(spec['ylabel'], fontsize=spec.get('label_fontsize'))
+    if spec.get('xtick_rotation') is not None:
+        ax.tick_params(axis='x', labelrotation=spec['xtick_rotation'])
+        if spec.get('xtick_ha'):
+            for label in ax.get_xticklabels():
+                label.set_horizontalalignment(spec['xtick_ha'])
+
+    fig.tight_layout()
+
+    img = BytesIO()
+    fig.savefig(img, format='png', dpi=DPI, bbox_inches='tight')
+    return base64.b64encode(img.getvalue()).decode('utf-8')
+
+
+class ChartRenderer:
+    """Pool borné de processus de rendu, créé à la demande et sûr après un fork"""
+
+    def __init__(self, max_workers, timeout):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        # Limite le nombre de rendus en attente pour ne pas accumuler de travail
+        self._slots = threading.BoundedSemaphore(max_workers * 2)
+
+    def _get_executor(self):
+        with self._lock:
+            # Un pool hérité d'un processus parent (fork) n'est pas utilisable
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker)
+                self._pid = os.getpid()
+            return self._executor
+
+    def render(self, spec):
+        """Rend un graphique dans le pool et attend le résultat"""
+        with self._slots:
+            future = self._get_executor().submit(render_chart, spec)
+            return future.result(timeout=self.timeout)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
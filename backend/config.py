@@ -14,11 +14,67 @@ MONGO_COLLECTION_RSE = 'donnees_rse'  # Collection enseignement
 MONGO_COLLECTION_ARION = 'donnees_arion' # Collection pour les données ARION
 MONGO_COLLECTION_VACATAIRE = 'donnees_vacataire' 
 MONGO_COLLECTION_ETUDIANT = 'etudiants'
+
+# Pool de connexions MongoDB (un seul client par processus)
+MONGO_CLIENT_OPTIONS = {
+    'maxPoolSize': int(os.environ.get('MONGO_MAX_POOL_SIZE', 50)),
+    'minPoolSize': int(os.environ.get('MONGO_MIN_POOL_SIZE', 0)),
+    'maxIdleTimeMS': int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', 60000)),
+    'serverSelectionTimeoutMS': int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)),
+    'readPreference': os.environ.get('MONGO_READ_PREFERENCE', 'primary'),
+}
 # Configuration des uploads
 UPLOAD_FOLDER = '../data'
 ALLOWED_EXTENSIONS = {'csv'}
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max
 
+# Pagination de la liste des étudiants (/etudiants/liste)
+ETUDIANTS_LISTE_DEFAULT_PER_PAGE = 100
+ETUDIANTS_LISTE_MAX_PER_PAGE = 1000
+
+# Clé naturelle d'un étudiant (colonnes du CSV d'effectifs et année académique de l'import): les
+# imports font un upsert sur ces champs quand ils sont tous renseignés; index unique correspondant
+# dans indexes.py. L'année fait partie de la clé: chaque import annuel garde ses effectifs, et un
+# étudiant réinscrit garde une ligne par année et par formation.
+ETUDIANTS_CLE_NATURELLE = tuple(
+    champ.strip()
+    for champ in os.environ.get('ETUDIANTS_CLE_NATURELLE', 'Nom,Prénom,Date de naissance,Formation,annee').split(',')
+    if champ.strip()
+)
+
+# Pagination par curseur de GET /api/etudiants
+ETUDIANTS_DEFAULT_PAGE_SIZE = 500
+ETUDIANTS_MAX_PAGE_SIZE = 1000
+
+# Pagination des lignes RSE renvoyées par /api/rse/stats?include=rows
+RSE_ROWS_DEFAULT_PER_PAGE = 50
+RSE_ROWS_MAX_PER_PAGE = 1000
+
+# Taille des lots lus depuis MongoDB pour les exports NDJSON en flux
+NDJSON_BATCH_SIZE = 500
+
+# Budget mémoire du cache des graphiques rendus (LRU)
+CHART_CACHE_MAX_BYTES = 32 * 1024 * 1024  # 32MB
+
+# Pool de processus de rendu des graphiques (matplotlib)
+CHART_RENDER_WORKERS = int(os.environ.get('CHART_RENDER_WORKERS', max(1, min(4, (os.cpu_count() or 2) - 1))))
+CHART_RENDER_TIMEOUT = 30  # secondes
+
+# Nombre d'upserts envoyés par appel bulk_write lors des imports d'heures d'enseignement
+HEURES_ENSEIGNEMENT_BULK_BATCH_SIZE = 500
+
+# Instantanés DataFrame des collections (snapshots.py): une colonne texte est encodée
+# en catégories si son nombre de valeurs distinctes ne dépasse pas ce ratio du nombre de lignes
+SNAPSHOT_MAX_RATIO_CATEGORIE = 0.5
+
+# Imports de fichiers en tâche de fond (voir import_jobs.py)
+IMPORT_SPOOL_DIR = os.environ.get('IMPORT_SPOOL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'imports_en_cours'))
+IMPORT_WORKERS = 2
+IMPORT_JOB_SYNC_WAIT = 5  # secondes d'attente avant de répondre 202 avec l'identifiant du job
+IMPORT_JOB_BATCH_SIZE = 1000
+IMPORT_JOB_TTL_SECONDS = 7 * 24 * 3600  # conservation des jobs dans la collection jobs
+IMPORT_JOB_STALE_SECONDS = 15 * 60  # job en cours sans progression depuis ce délai au démarrage: considéré interrompu
+
 # Rôles utilisateurs
 ROLES = {
     'ADMIN': 'admin',
@@ -40,3 +96,10 @@ PERMISSIONS = {
 JWT_SECRET_KEY = SECRET_KEY
 JWT_ACCESS_TOKEN_EXPIRES_HOURS = 24
 
+# Cache des claims JWT vérifiés (borné par le nombre d'entrées, le TTL et l'exp du jeton)
+JWT_CLAIMS_CACHE_MAX_ENTRIES = 10000
+JWT_CLAIMS_CACHE_TTL = 300  # secondes
+
+
+# Budget du temps d'import de app.py (démarrage des workers), vérifié par bench_import.py
+IMPORT_TIME_BUDGET_SECONDS = float(os.environ.get('IMPORT_TIME_BUDGET_SECONDS', 1.5))
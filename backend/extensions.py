@@ -0,0 +1,225 @@
+"""
+Ressources partagées par les blueprints de l'API
+
+Connexion MongoDB et collections, caches, pool de rendu des graphiques,
+imports en tâche de fond et décorateurs communs. Rien ici ne contacte la base
+au chargement du module: les collections sont résolues à la première requête.
+"""
+
+import threading
+from datetime import datetime
+from functools import wraps
+
+import jwt
+from flask import current_app, request, jsonify, Response, stream_with_context
+
+from config import *
+from chart_cache import ChartCache
+from charts import ChartRenderer
+from import_jobs import ImportJobManager, STATUTS_TERMINES
+from indexes import appliquer_index
+from migrations import migrer_etudiants
+from mongo_manager import MongoManager
+from rse_stats import verifier_rse_stats
+from snapshots import SnapshotCache
+from token_cache import TokenCache
+
+# Client MongoDB unique pour l'application (recréé dans chaque worker après un fork)
+mongo = MongoManager(MONGO_URI, MONGO_DB, **MONGO_CLIENT_OPTIONS)
+
+# Base de données AppISIS
+db = mongo.db
+users_collection = mongo.collection(MONGO_COLLECTION_USERS)
+enseignement_collection = mongo.collection(MONGO_COLLECTION_ENSEIGNEMENT)
+heures_enseignement_collection = mongo.collection('heures_enseignement_detaillees')
+rse_collection = mongo.collection(MONGO_COLLECTION_RSE)
+arion_collection = mongo.collection(MONGO_COLLECTION_ARION)
+vacataire_collection = mongo.collection(MONGO_COLLECTION_VACATAIRE)
+donnees_vac_collection = mongo.collection('donnees_vac')
+etudiants_collection = mongo.collection(MONGO_COLLECTION_ETUDIANT)
+versions_collection = mongo.collection('collection_versions')
+jobs_collection = mongo.collection('jobs')
+rse_stats_collection = mongo.collection('rse_stats')
+jetons_revoques_collection = mongo.collection('jetons_revoques')
+
+_base_initialisee = False
+_verrou_initialisation = threading.Lock()
+
+def initialiser_base():
+    """Prépare la base au premier appel de chaque processus
+
+    Crée les index, vérifie le résumé RSE, ajoute les champs canoniques des étudiants
+    manquants, et clôt les imports interrompus.
+    """
+    global _base_initialisee
+    if _base_initialisee:
+        return
+    with _verrou_initialisation:
+        if _base_initialisee:
+            return
+        try:
+            # Index déclarés dans indexes.py (idempotent)
+            appliquer_index(db)
+
+            # Résumé des statistiques RSE: tenu à jour à chaque écriture, construit ou corrigé ici
+            # s'il est absent ou a dérivé (processus arrêté entre une insertion et son $inc)
+            if verifier_rse_stats(rse_collection, rse_stats_collection):
+                print("Résumé rse_stats reconstruit à partir des données RSE")
+
+            # Champs canoniques des étudiants enregistrés avant la normalisation à l'ingestion
+            if migrer_etudiants(etudiants_collection):
+                bump_collection_version(MONGO_COLLECTION_ETUDIANT)
+
+            # Imports laissés en cours par un processus arrêté (leur progression ne bouge plus)
+            import_jobs.marquer_interrompus(IMPORT_JOB_STALE_SECONDS)
+            print(f"Connexion à la base {MONGO_DB} réussie!")
+        except Exception as e:
+            print("Échec de connexion MongoDB:", e)
+        # Pas de nouvelle tentative à chaque requête si la base est indisponible
+        _base_initialisee = True
+
+def get_collection_version(collection_name):
+    """Renvoie le numéro de version courant d'une collection"""
+    return get_collection_etat(collection_name)[0]
+
+def get_collection_etat(collection_name):
+    """Renvoie (version, modifications) d'une collection; modifications exclut les insertions seules"""
+    doc = versions_collection.find_one({'_id': collection_name}) or {}
+    return doc.get('version', 0), doc.get('modifications', 0)
+
+def bump_collection_version(collection_name, insertion_seule=False):
+    """Incrémente la version d'une collection après une écriture
+
+    insertion_seule=True signale une écriture qui n'a fait qu'ajouter des
+    documents: les instantanés peuvent alors être complétés au lieu d'être relus.
+    """
+    increments = {'version': 1} if insertion_seule else {'version': 1, 'modifications': 1}
+    versions_collection.update_one({'_id': collection_name}, {'$inc': increments}, upsert=True)
+
+# Instantanés DataFrame des collections, partagés par les endpoints calculés avec pandas
+snapshots = SnapshotCache(get_collection_etat, SNAPSHOT_MAX_RATIO_CATEGORIE)
+
+# Cache des graphiques rendus, partagé par les endpoints de graphiques
+chart_cache = ChartCache(CHART_CACHE_MAX_BYTES)
+chart_renderer = ChartRenderer(CHART_RENDER_WORKERS, CHART_RENDER_TIMEOUT)
+
+# Imports de fichiers traités en tâche de fond
+import_jobs = ImportJobManager(jobs_collection, IMPORT_SPOOL_DIR, IMPORT_WORKERS)
+
+def cached_chart(collection_name, filter_args=()):
+    """Décorateur qui met en cache les graphiques et gère ETag / 304 Not Modified"""
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user, chart_type, *args, **kwargs):
+            filters = {arg: request.args.get(arg) for arg in filter_args if request.args.get(arg)}
+            etag = ChartCache.make_key(collection_name, chart_type, filters, get_collection_version(collection_name))
+
+            # Le client possède déjà cette version du graphique
+            if etag in request.if_none_match:
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
+
+            image = chart_cache.get(etag)
+            if image is None:
+                response, status = f(current_user, chart_type, *args, **kwargs)
+                if status != 200:
+                    return response, status
+                image = response.get_json()['image']
+                chart_cache.put(etag, image)
+
+            response = jsonify({"image": image})
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response, 200
+        return decorated
+    return decorator
+
+# Claims des jetons déjà vérifiés, pour ne pas refaire la vérification HS256 à chaque requête
+token_cache = TokenCache(JWT_CLAIMS_CACHE_MAX_ENTRIES, JWT_CLAIMS_CACHE_TTL)
+
+def token_required(f):
+    """Décorateur pour vérifier l'authentification"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        auth_header = request.headers.get('Authorization')
+        
+        if not auth_header or not auth_header.startswith("Bearer "):
+            return jsonify({"error": "Token manquant ou invalide"}), 401
+        
+        token = auth_header.split(" ")[1]
+        
+        # Jeton déconnecté: refusé avant toute lecture du cache ou vérification de signature
+        if token_cache.is_revoked(token):
+            return jsonify({"error": "Token révoqué"}), 401
+        
+        current_user = token_cache.get(token)
+        if current_user is not None:
+            return f(current_user, *args, **kwargs)
+        
+        try:
+            data = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=["HS256"])
+        except jwt.ExpiredSignatureError:
+            return jsonify({"error": "Token expiré"}), 401
+        except jwt.InvalidTokenError:
+            return jsonify({"error": "Token invalide"}), 401
+        
+        # Déconnexion servie par un autre processus: la révocation est partagée via MongoDB
+        if jetons_revoques_collection.find_one({'_id': TokenCache.digest(token)}, {'_id': 1}):
+            token_cache.revoke(token, data.get('exp'))
+            return jsonify({"error": "Token révoqué"}), 401
+        
+        current_user = data
+        token_cache.put(token, data)
+        return f(current_user, *args, **kwargs)
+    return decorated
+
+def revoquer_jeton(token, claims):
+    """Révoque un jeton jusqu'à son exp: immédiatement dans ce processus, via MongoDB pour les autres
+
+    Les autres processus le refusent au plus tard après JWT_CLAIMS_CACHE_TTL (durée
+    de vie de leurs claims en cache). Les révocations expirées sont purgées par un index TTL.
+    """
+    exp = claims.get('exp')
+    token_cache.revoke(token, exp)
+    jetons_revoques_collection.update_one(
+        {'_id': TokenCache.digest(token)},
+        {'$set': {'expire_at': datetime.utcfromtimestamp(exp) if isinstance(exp, (int, float)) else None}},
+        upsert=True
+    )
+
+# Export NDJSON en flux pour les endpoints de données volumineux
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+def wants_ndjson():
+    """Indique si le client demande un export NDJSON via l'en-tête Accept"""
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+def ndjson_response(cursor, transform=None):
+    """Diffuse les documents d'un curseur PyMongo ligne par ligne (mémoire constante)"""
+    cursor = cursor.batch_size(NDJSON_BATCH_SIZE)
+
+    def generate():
+        try:
+            for document in cursor:
+                if transform:
+                    document = transform(document)
+                yield current_app.json.dumps(document) + '\n'
+        finally:
+            cursor.close()
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+def reponse_import_job(job_id):
+    """Renvoie le résultat d'un import s'il se termine rapidement, sinon 202 avec l'URL de suivi du job"""
+    job = import_jobs.wait(job_id, IMPORT_JOB_SYNC_WAIT)
+    if job['status'] in STATUTS_TERMINES:
+        return jsonify({**job['result'], "job_id": job_id}), job['http_status']
+    
+    return jsonify({
+        "message": "Import en cours de traitement",
+        "job_id": job_id,
+        "status": job['status'],
+        "status_url": f"/api/jobs/{job_id}",
+        "success": True
+    }), 202
@@ -0,0 +1,167 @@
+"""
+Imports de fichiers en tâche de fond
+
+Le fichier reçu est d'abord écrit sur disque (spool), puis traité par un pool
+de workers. L'état de chaque import (statut, lignes traitées, résultat ou
+erreur) est conservé dans la collection jobs et consultable pendant le
+traitement, ce qui évite de bloquer un worker web pendant tout l'import.
+"""
+
+import logging
+import os
+import threading
+import uuid
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+STATUTS_TERMINES = ('succeeded', 'failed')
+
+
+def inserer_par_lots(collection, records, progress, batch_size):
+    """Insère des documents par lots en signalant l'avancement; renvoie le nombre inséré"""
+    inserted = 0
+    progress(0, len(records))
+    for start in range(0, len(records), batch_size):
+        result = collection.insert_many(records[start:start + batch_size])
+        inserted += len(result.inserted_ids)
+        progress(inserted)
+    return inserted
+
+
+class ImportJobManager:
+    """Pool de workers qui exécute les imports et suit leur état dans la collection jobs"""
+
+    def __init__(self, collection, spool_dir, max_workers):
+        self.collection = collection
+        self.spool_dir = spool_dir
+        self.max_workers = max_workers
+        self._executor = None
+        self._pid = None
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._app = None
+
+    def init_app(self, app):
+        """Associe l'application Flask: les imports s'exécutent dans son contexte (current_app)"""
+        self._app = app
+        app.extensions['import_jobs'] = self
+
+    def _get_executor(self):
+        with self._lock:
+            # Les threads d'un pool ne survivent pas à un fork: on recrée le pool dans le fils
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='import')
+                self._pid = os.getpid()
+                self._futures = {}
+            return self._executor
+
+    def _update(self, job_id, **fields):
+        fields['updated_at'] = datetime.utcnow()
+        self.collection.update_one({'_id': job_id}, {'$set': fields})
+
+    def submit(self, job_type, processor, file, params):
+        """Écrit le fichier sur disque, crée le job et le confie au pool; renvoie l'identifiant du job"""
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.spool_dir, exist_ok=True)
+        chemin = os.path.join(self.spool_dir, job_id + os.path.splitext(file.filename)[1].lower())
+        file.save(chemin)
+
+        now = datetime.utcnow()
+        self.collection.insert_one({
+            '_id': job_id,
+            'type': job_type,
+            'filename': file.filename,
+            'status': 'queued',
+            'rows_total': None,
+            'rows_processed': 0,
+            'result': None,
+            'error': None,
+            'http_status': None,
+            'created_by': params.get('username'),
+            'created_at': now,
+            'updated_at': now,
+            'started_at': None,
+            'finished_at': None
+        })
+
+        executor = self._get_executor()
+        future = executor.submit(self._run, job_id, processor, chemin, params)
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda _: self._futures.pop(job_id, None))
+        return job_id
+
+    def _run(self, job_id, processor, chemin, params):
+        self._update(job_id, status='running', started_at=datetime.utcnow())
+
+        def progress(rows_processed, rows_total=None):
+            fields = {'rows_processed': rows_processed}
+            if rows_total is not None:
+                fields['rows_total'] = rows_total
+            self._update(job_id, **fields)
+
+        try:
+            # Le processeur renvoie (corps de la réponse, code HTTP), comme une vue
+            with self._app.app_context() if self._app is not None else nullcontext():
+                result, http_status = processor(chemin, params, progress)
+            self._update(
+                job_id,
+                status='succeeded' if http_status < 400 else 'failed',
+                result=result,
+                error=(result.get('error') or result.get('warning')) if http_status >= 400 else None,
+                http_status=http_status,
+                finished_at=datetime.utcnow()
+            )
+        except Exception as e:
+            logger.exception(f"Échec de l'import {job_id}")
+            self._update(
+                job_id,
+                status='failed',
+                result={'error': f"Erreur lors du traitement du fichier: {str(e)}"},
+                error=str(e),
+                http_status=500,
+                finished_at=datetime.utcnow()
+            )
+        finally:
+            try:
+                os.remove(chemin)
+            except OSError:
+                pass
+
+    def marquer_interrompus(self, delai):
+        """Passe en échec les jobs en attente ou en cours sans activité depuis delai secondes
+
+        Un job dont le processus a été arrêté (redémarrage, crash) resterait sinon
+        indéfiniment en 'running'. Renvoie le nombre de jobs modifiés.
+        """
+        now = datetime.utcnow()
+        message = "Import interrompu: le serveur a été arrêté pendant le traitement"
+        return self.collection.update_many(
+            {'status': {'$in': ['queued', 'running']}, 'updated_at': {'$lt': now - timedelta(seconds=delai)}},
+            {'$set': {
+                'status': 'failed',
+                'result': {'error': message},
+                'error': message,
+                'http_status': 500,
+                'finished_at': now,
+                'updated_at': now
+            }}
+        ).modified_count
+
+    def get(self, job_id):
+        """Renvoie l'état public d'un job, ou None s'il n'existe pas"""
+        job = self.collection.find_one({'_id': job_id})
+        if job is None:
+            return None
+        job['job_id'] = job.pop('_id')
+        return job
+
+    def wait(self, job_id, timeout):
+        """Attend la fin d'un job au plus timeout secondes et renvoie son état"""
+        future = self._futures.get(job_id)
+        if future is not None:
+            wait([future], timeout=timeout)
+        return self.get(job_id)
@@ -0,0 +1,235 @@
+"""
+Registre des index MongoDB et audit des plans d'exécution
+
+INDEX_PAR_COLLECTION décrit, collection par collection, les index dont ont
+besoin les requêtes de l'API; ils sont créés au démarrage (create_index est
+idempotent). REQUETES_AUDITEES reprend la forme des filtres et tris utilisés
+par chaque route, COMMANDES_AUDITEES les distinct et agrégations: l'audit les
+passe à explain() et signale tout plan qui parcourt la collection entière
+(COLLSCAN) sans que ce soit attendu.
+
+Usage:
+    python indexes.py appliquer
+    python indexes.py audit
+"""
+
+import argparse
+import sys
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+from config import (
+    MONGO_URI, MONGO_DB, MONGO_CLIENT_OPTIONS, IMPORT_JOB_TTL_SECONDS,
+    MONGO_COLLECTION_USERS, MONGO_COLLECTION_RSE, MONGO_COLLECTION_ARION,
+    MONGO_COLLECTION_VACATAIRE, MONGO_COLLECTION_ETUDIANT, ETUDIANTS_CLE_NATURELLE
+)
+
+# Collection -> liste de (clés, options de create_index)
+INDEX_PAR_COLLECTION = {
+    MONGO_COLLECTION_USERS: [
+        ([("username", ASCENDING)], {"unique": True}),
+        ([("email", ASCENDING)], {"unique": True}),
+    ],
+    MONGO_COLLECTION_ETUDIANT: [
+        ([("id", ASCENDING)], {}),
+        ([("annee", ASCENDING)], {}),
+        ([("niveau", ASCENDING)], {}),
+        # Champs canoniques (normalisation.normaliser_etudiant) regroupés par les statistiques
+        ([("annee_debut", ASCENDING), ("niveau", ASCENDING)], {}),
+        # Un seul document par clé naturelle (cible des upserts d'import); les étudiants
+        # importés sans cette clé ne sont pas concernés
+        ([(champ, ASCENDING) for champ in ETUDIANTS_CLE_NATURELLE], {
+            "unique": True,
+            "name": "etudiant_cle_naturelle",
+            "partialFilterExpression": {champ: {"$exists": True} for champ in ETUDIANTS_CLE_NATURELLE}
+        }),
+    ],
+    'heures_enseignement_detaillees': [
+        # Une seule UE par année académique, niveau et semestre (clé des imports en upsert)
+        ([("annee_academique", ASCENDING), ("niveau", ASCENDING), ("semestre", ASCENDING),
+          ("unite_enseignement.code", ASCENDING)],
+         {"unique": True, "name": "ue_par_annee_niveau_semestre"}),
+        ([("annee_debut", ASCENDING), ("niveau", ASCENDING), ("semestre", ASCENDING)], {}),
+        ([("niveau", ASCENDING), ("semestre", ASCENDING)], {}),
+        ([("unite_enseignement.matieres.intervenant", ASCENDING)], {}),
+    ],
+    MONGO_COLLECTION_RSE: [
+        ([("id", ASCENDING)], {}),
+        # Filtre par année et tri de /api/rse/data et /api/rse/stats?include=rows
+        ([("annee", DESCENDING), ("_id", ASCENDING)], {}),
+        ([("promotion", ASCENDING), ("semestre", ASCENDING)], {}),
+        ([("type_activite", ASCENDING)], {}),
+    ],
+    MONGO_COLLECTION_ARION: [
+        ([("id", ASCENDING)], {}),
+        ([("annee", DESCENDING), ("date", DESCENDING)], {}),
+        # Regroupements par mois de /api/arion/monthly_stats
+        ([("year", ASCENDING), ("month", ASCENDING)], {}),
+        ([("formateur", ASCENDING)], {}),
+        ([("statut", ASCENDING)], {}),
+    ],
+    MONGO_COLLECTION_VACATAIRE: [
+        ([("id", ASCENDING)], {}),
+    ],
+    'jobs': [
+        # Les jobs d'import terminés sont purgés automatiquement
+        ([("created_at", ASCENDING)], {"expireAfterSeconds": IMPORT_JOB_TTL_SECONDS}),
+    ],
+    'jetons_revoques': [
+        # Une révocation n'est utile que jusqu'à l'expiration du jeton
+        ([("expire_at", ASCENDING)], {"expireAfterSeconds": 0}),
+    ],
+    'rse_stats': [
+        ([("annee", ASCENDING), ("promotion", ASCENDING), ("type_activite", ASCENDING), ("semestre", ASCENDING)],
+         {"unique": True, "name": "rse_stats_cle"}),
+    ],
+}
+
+# Forme des requêtes de chaque route: (route, collection, filtre, tri)
+REQUETES_AUDITEES = [
+    ('/etudiants/delete/<id>', MONGO_COLLECTION_ETUDIANT, {"id": "x"}, None),
+    ('/api/heures-enseignement', 'heures_enseignement_detaillees',
+     {"annee_academique": "2023-2024", "niveau": "FIE3", "semestre": "S5"}, None),
+    ('/api/heures-enseignement', 'heures_enseignement_detaillees',
+     {"annee_debut": 2023, "niveau": "FIE3"}, None),
+    ('/api/heures-enseignement/graph-data', 'heures_enseignement_detaillees', {"niveau": "FIE3"}, None),
+    ('/api/heures-enseignement/stats', 'heures_enseignement_detaillees',
+     {"unite_enseignement.matieres.intervenant": "x"}, None),
+    ('/api/rse/data', MONGO_COLLECTION_RSE, {"annee": 2024}, [("annee", DESCENDING)]),
+    ('/api/rse/data', MONGO_COLLECTION_RSE, {"promotion": "FIE3"}, [("annee", DESCENDING)]),
+    ('/api/rse/data', MONGO_COLLECTION_RSE, {"type_activite": "x"}, [("annee", DESCENDING)]),
+    ('/api/rse/stats?include=rows', MONGO_COLLECTION_RSE, {}, [("annee", DESCENDING), ("_id", ASCENDING)]),
+    ('/api/rse/update', MONGO_COLLECTION_RSE, {"id": "x"}, None),
+    ('/api/arion/data', MONGO_COLLECTION_ARION, {"annee": "2024"}, [("annee", DESCENDING), ("date", DESCENDING)]),
+    ('/api/arion/data', MONGO_COLLECTION_ARION, {"statut": "x"}, [("annee", DESCENDING), ("date", DESCENDING)]),
+    ('/api/arion/monthly_stats', MONGO_COLLECTION_ARION, {"year": 2024, "month": {"$ne": None}}, None),
+    ('/api/arion/delete/<id>', MONGO_COLLECTION_ARION, {"id": "x"}, None),
+    ('/api/vacataire/update/<id>', MONGO_COLLECTION_VACATAIRE, {"id": "x"}, None),
+]
+
+# Commandes autres que find: (route, collection, commande, arguments, COLLSCAN attendu)
+# Les statistiques globales comptent tous les étudiants: seul compte le plan de l'étape
+# de lecture (le $project de tête), le $facet s'exécute ensuite sur les documents projetés.
+COMMANDES_AUDITEES = [
+    ('/api/etudiants/niveaux', MONGO_COLLECTION_ETUDIANT, 'distinct', {"key": "niveau"}, False),
+    ('/api/etudiants/annees', MONGO_COLLECTION_ETUDIANT, 'distinct', {"key": "annee"}, False),
+    ('/api/etudiants/stats', MONGO_COLLECTION_ETUDIANT, 'aggregate', {
+        "pipeline": [
+            {"$project": {"_id": 0, "niveau": 1, "annee": 1, "boursier": 1, "genre": 1, "etranger": 1,
+                          "Boursier(ère)": 1, "Genre": 1, "Etranger(ère)": 1}},
+            {"$facet": {"totaux": [{"$count": "total"}]}}
+        ],
+        "cursor": {}
+    }, True),
+    ('/etudiants/liste', MONGO_COLLECTION_ETUDIANT, 'aggregate', {
+        "pipeline": [{"$facet": {"total": [{"$count": "count"}]}}],
+        "cursor": {}
+    }, True),
+]
+
+
+# IndexOptionsConflict, IndexKeySpecsConflict
+CODES_INDEX_EN_CONFLIT = (85, 86)
+
+
+def appliquer_index(db):
+    """Crée les index du registre; renvoie la liste des index en échec"""
+    echecs = []
+    for nom_collection, index in INDEX_PAR_COLLECTION.items():
+        for cles, options in index:
+            try:
+                try:
+                    db[nom_collection].create_index(cles, **options)
+                except OperationFailure as e:
+                    # Index nommé existant avec d'autres clés ou options (ex: ETUDIANTS_CLE_NATURELLE
+                    # modifiée): le registre fait foi, l'ancien index est remplacé
+                    if e.code not in CODES_INDEX_EN_CONFLIT or 'name' not in options:
+                        raise
+                    db[nom_collection].drop_index(options['name'])
+                    db[nom_collection].create_index(cles, **options)
+            except Exception as e:
+                # Un index unique peut échouer sur des doublons existants: les autres sont tout de même créés
+                print(f"Impossible de créer l'index {cles} sur {nom_collection}:", e)
+                echecs.append((nom_collection, cles, str(e)))
+    return echecs
+
+
+def _etapes(plan):
+    """Parcourt récursivement les étapes d'un plan d'exécution"""
+    yield plan.get('stage')
+    for cle in ('inputStage', 'queryPlan'):
+        if isinstance(plan.get(cle), dict):
+            yield from _etapes(plan[cle])
+    for sous_plan in plan.get('inputStages', []):
+        yield from _etapes(sous_plan)
+
+
+def _plan_gagnant(explain):
+    """Plan retenu d'un explain, y compris pour une agrégation (plan sous l'étape $cursor)"""
+    if 'queryPlanner' in explain:
+        return explain['queryPlanner'].get('winningPlan', {})
+    for etape in explain.get('stages', []):
+        if '$cursor' in etape:
+            return etape['$cursor'].get('queryPlanner', {}).get('winningPlan', {})
+    return {}
+
+
+def auditer_requetes(db, requetes=REQUETES_AUDITEES, commandes=COMMANDES_AUDITEES):
+    """Passe chaque forme de requête à explain() et indique celles qui font un COLLSCAN inattendu"""
+    resultats = []
+    for route, nom_collection, filtre, tri in requetes:
+        cursor = db[nom_collection].find(filtre)
+        if tri:
+            cursor = cursor.sort(tri)
+        resultats.append((route, nom_collection, filtre, tri, cursor.explain(), False))
+
+    for route, nom_collection, commande, arguments, collscan_attendu in commandes:
+        explain = db.command('explain', {commande: nom_collection, **arguments}, verbosity='queryPlanner')
+        resultats.append((route, nom_collection, {commande: arguments}, None, explain, collscan_attendu))
+
+    audit = []
+    for route, nom_collection, filtre, tri, explain, collscan_attendu in resultats:
+        etapes = [etape for etape in _etapes(_plan_gagnant(explain)) if etape]
+        audit.append({
+            'route': route,
+            'collection': nom_collection,
+            'filtre': filtre,
+            'tri': tri,
+            'etapes': etapes,
+            'collscan': 'COLLSCAN' in etapes and not collscan_attendu,
+            'collscan_attendu': 'COLLSCAN' in etapes and collscan_attendu
+        })
+    return audit
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index MongoDB de l'API AppISIS")
+    parser.add_argument('commande', choices=['appliquer', 'audit'])
+    args = parser.parse_args(argv)
+
+    from pymongo import MongoClient
+    client = MongoClient(MONGO_URI, **MONGO_CLIENT_OPTIONS)
+    db = client[MONGO_DB]
+
+    try:
+        if args.commande == 'appliquer':
+            echecs = appliquer_index(db)
+            print(f"✓ Index appliqués ({len(echecs)} échec(s))")
+            return 1 if echecs else 0
+
+        resultats = auditer_requetes(db)
+        for resultat in resultats:
+            statut = 'COLLSCAN' if resultat['collscan'] else 'attendu' if resultat['collscan_attendu'] else 'ok'
+            print(f"[{statut:8}] {resultat['route']} {resultat['collection']} "
+                  f"filtre={resultat['filtre']} tri={resultat['tri']} -> {' > '.join(resultat['etapes'])}")
+
+        nb_collscan = sum(resultat['collscan'] for resultat in resultats)
+        print(f"\n{nb_collscan} requête(s) en COLLSCAN sur {len(resultats)}")
+        return 1 if nb_collscan else 0
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
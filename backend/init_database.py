@@ -53,6 +53,11 @@ def init_database():
         enseignement_collection.create_index("uploaded_at")
         print("✓ Index enseignement créés")
         
+        # Index des collections interrogées par l'API (registre partagé avec l'API)
+        from indexes import appliquer_index
+        appliquer_index(db)
+        print("✓ Index de l'API créés")
+        
         # Vérification si un administrateur existe déjà
         admin_exists = users_collection.find_one({"role": "admin"})
         
@@ -0,0 +1,151 @@
+"""
+Migrations ponctuelles des données existantes
+
+Chaque migration est idempotente: elle ne traite que les documents qui ne
+sont pas encore au nouveau format et peut être relancée sans risque.
+
+Usage:
+    python migrations.py dates_arion
+    python migrations.py etudiants
+    python migrations.py doublons_etudiants              (simulation: rapporte les doublons)
+    python migrations.py doublons_etudiants --appliquer
+    python migrations.py rse_stats
+"""
+
+import argparse
+import sys
+
+from pymongo import UpdateOne
+
+from config import (
+    MONGO_URI, MONGO_DB, MONGO_CLIENT_OPTIONS, MONGO_COLLECTION_ARION, MONGO_COLLECTION_ETUDIANT,
+    MONGO_COLLECTION_RSE, ETUDIANTS_CLE_NATURELLE
+)
+from normalisation import normaliser_date_arion, normaliser_etudiant, CHAMPS_CANONIQUES_ETUDIANT
+from rse_stats import verifier_rse_stats
+
+TAILLE_LOT = 1000
+
+
+def migrer_dates_arion(collection, taille_lot=TAILLE_LOT):
+    """Convertit les dates ARION stockées en chaînes en datetime + year/month; renvoie le nombre modifié"""
+    filtre = {'$or': [{'date': {'$type': 'string'}}, {'year': {'$exists': False}}]}
+    operations = []
+    modifies = 0
+
+    for document in collection.find(filtre, {'date': 1}):
+        normalise = normaliser_date_arion({'date': document.get('date')})
+        operations.append(UpdateOne({'_id': document['_id']}, {'$set': normalise}))
+        if len(operations) >= taille_lot:
+            modifies += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+
+    if operations:
+        modifies += collection.bulk_write(operations, ordered=False).modified_count
+    return modifies
+
+
+def migrer_etudiants(collection, taille_lot=TAILLE_LOT):
+    """Ajoute les champs canoniques (boursier, etranger, genre, annee_debut) aux étudiants qui ne les ont pas"""
+    filtre = {'$or': [{champ: {'$exists': False}} for champ in CHAMPS_CANONIQUES_ETUDIANT]}
+    projection = {'Boursier(ère)': 1, 'Etranger(ère)': 1, 'Nationalité': 1, 'Genre': 1, 'annee': 1}
+    operations = []
+    modifies = 0
+
+    for document in collection.find(filtre, projection):
+        canonique = normaliser_etudiant(dict(document))
+        operations.append(UpdateOne(
+            {'_id': document['_id']},
+            {'$set': {champ: canonique[champ] for champ in CHAMPS_CANONIQUES_ETUDIANT}}
+        ))
+        if len(operations) >= taille_lot:
+            modifies += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+
+    if operations:
+        modifies += collection.bulk_write(operations, ordered=False).modified_count
+    return modifies
+
+
+def dedoublonner_etudiants(collection, cle=ETUDIANTS_CLE_NATURELLE, appliquer=False, rapport=print):
+    """Prépare l'index unique sur la clé naturelle des étudiants; renvoie le nombre de documents modifiés
+
+    Les champs de clé vides sont retirés, puis, pour chaque clé présente
+    plusieurs fois (imports répétés), seul le document le plus récent est conservé.
+    Sans appliquer=True, rien n'est modifié: chaque suppression prévue (clé,
+    document conservé, documents supprimés) est seulement rapportée.
+    """
+    modifies = 0
+    for champ in cle:
+        vides = {champ: {'$in': [None, '']}}
+        nombre = collection.count_documents(vides)
+        if nombre:
+            rapport(f"Champ de clé vide retiré: {champ} ({nombre} document(s))")
+            if appliquer:
+                modifies += collection.update_many(vides, {'$unset': {champ: ''}}).modified_count
+
+    pipeline = [
+        {'$match': {champ: {'$exists': True, '$nin': [None, '']} for champ in cle}},
+        {'$group': {
+            '_id': {champ: f'${champ}' for champ in cle},
+            'ids': {'$push': '$_id'},
+            'count': {'$sum': 1}
+        }},
+        {'$match': {'count': {'$gt': 1}}}
+    ]
+    a_supprimer = 0
+    for groupe in collection.aggregate(pipeline, allowDiskUse=True):
+        # Les ObjectId croissent avec la date d'insertion: on garde le dernier importé
+        ids = sorted(groupe['ids'])
+        doublons = ids[:-1]
+        a_supprimer += len(doublons)
+        rapport(f"Doublon {groupe['_id']}: conservé {ids[-1]}, supprimé(s) {', '.join(map(str, doublons))}")
+        if appliquer:
+            modifies += collection.delete_many({'_id': {'$in': doublons}}).deleted_count
+
+    if not appliquer:
+        rapport(f"Simulation: {a_supprimer} doublon(s) à supprimer; relancer avec --appliquer pour les supprimer")
+    return modifies
+
+
+# Migration -> (collection, fonction appliquée à la collection)
+MIGRATIONS = {
+    'dates_arion': (MONGO_COLLECTION_ARION, migrer_dates_arion),
+    'etudiants': (MONGO_COLLECTION_ETUDIANT, migrer_etudiants),
+    # Supprime des documents: simulation par défaut, voir --appliquer
+    'doublons_etudiants': (MONGO_COLLECTION_ETUDIANT, dedoublonner_etudiants),
+    # Résumé rse_stats comparé aux données RSE et reconstruit s'il a dérivé
+    'rse_stats': (MONGO_COLLECTION_RSE, lambda collection: verifier_rse_stats(collection, collection.database['rse_stats'])),
+}
+
+# Migrations qui suppriment des données: elles ne font que rapporter leurs changements sans --appliquer
+MIGRATIONS_DESTRUCTIVES = {'doublons_etudiants'}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrations des données AppISIS")
+    parser.add_argument('migration', choices=sorted(MIGRATIONS))
+    parser.add_argument('--appliquer', action='store_true',
+                        help="effectue les suppressions d'une migration destructive (simulation sinon)")
+    args = parser.parse_args(argv)
+
+    from pymongo import MongoClient
+    client = MongoClient(MONGO_URI, **MONGO_CLIENT_OPTIONS)
+    try:
+        db = client[MONGO_DB]
+        nom_collection, migration = MIGRATIONS[args.migration]
+        options = {'appliquer': args.appliquer} if args.migration in MIGRATIONS_DESTRUCTIVES else {}
+        modifies = migration(db[nom_collection], **options)
+        if modifies:
+            # Même compteur que bump_collection_version: invalide les graphiques et instantanés de l'API
+            db['collection_versions'].update_one(
+                {'_id': nom_collection}, {'$inc': {'version': 1, 'modifications': 1}}, upsert=True
+            )
+        print(f"✓ Migration {args.migration}: {modifies} document(s) modifié(s)")
+    finally:
+        client.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Connexion MongoDB partagée par toute l'application
+
+Un seul MongoClient (et donc un seul pool de connexions) par processus. Les
+collections exposées au reste du code sont des proxys qui résolvent la vraie
+collection à chaque accès: après un fork (gunicorn --preload), le processus
+fils ouvre son propre client au lieu de réutiliser les sockets du parent.
+"""
+
+import os
+import threading
+
+from pymongo import MongoClient
+
+
+class _ProxyMongo:
+    """Proxy paresseux vers une base ou une collection du client courant"""
+
+    def __init__(self, resolve):
+        self._resolve = resolve
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __getitem__(self, name):
+        return self._resolve()[name]
+
+    def __repr__(self):
+        return f"<_ProxyMongo {self._resolve()!r}>"
+
+
+class MongoManager:
+    """Gestionnaire du client MongoDB, créé à la demande et sûr après un fork"""
+
+    def __init__(self, uri=None, db_name=None, **options):
+        self.uri = uri
+        self.db_name = db_name
+        self.options = options
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.db = _ProxyMongo(lambda: self.client[self.db_name])
+
+    def init_app(self, app):
+        """Lit la configuration MONGO_* de l'application Flask et s'y enregistre"""
+        self.uri = app.config.get('MONGO_URI', self.uri)
+        self.db_name = app.config.get('MONGO_DB', self.db_name)
+        self.options = {**self.options, **app.config.get('MONGO_CLIENT_OPTIONS', {})}
+        app.extensions['mongo'] = self
+
+    @property
+    def client(self):
+        """Client du processus courant (recréé dans un processus fils)"""
+        if self._client is not None and self._pid == os.getpid():
+            return self._client
+        with self._lock:
+            # Les sockets et threads de surveillance hérités du parent ne sont pas utilisables
+            if self._client is None or self._pid != os.getpid():
+                self._client = MongoClient(self.uri, **self.options)
+                self._pid = os.getpid()
+            return self._client
+
+    def collection(self, name):
+        """Renvoie un proxy vers une collection de la base configurée"""
+        return _ProxyMongo(lambda: self.client[self.db_name][name])
+
+    def close(self):
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
@@ -0,0 +1,117 @@
+"""
+Normalisation des documents à l'ingestion
+
+Les valeurs sont converties une seule fois, à l'écriture, dans le type attendu
+par les requêtes (dates BSON, booléens, entiers dérivés indexables) plutôt
+qu'à chaque lecture.
+"""
+
+from datetime import date, datetime
+
+# Formats de date acceptés dans les imports ARION, en plus de l'ISO 8601
+FORMATS_DATE_ARION = ('%d/%m/%Y', '%d-%m-%Y', '%Y/%m/%d')
+
+
+def parser_date(value):
+    """Convertit une date (chaîne, date ou datetime) en datetime; None si illisible"""
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if not isinstance(value, str) or not value.strip():
+        return None
+
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=None)
+    except ValueError:
+        pass
+    for fmt in FORMATS_DATE_ARION:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def normaliser_date_arion(record):
+    """Stocke la date d'un document ARION en datetime, avec les champs year et month dérivés
+
+    Une date illisible est conservée telle quelle, avec year et month à None.
+    """
+    parsed = parser_date(record.get('date'))
+    if parsed is not None:
+        record['date'] = parsed
+    record['year'] = parsed.year if parsed else None
+    record['month'] = parsed.month if parsed else None
+    return record
+
+
+# Valeurs reconnues pour les champs oui/non des imports étudiants (comparées en minuscules)
+VALEURS_OUI = frozenset(['oui', 'o', 'yes', 'y', 'true', 'vrai', '1'])
+VALEURS_NON = frozenset(['non', 'n', 'no', 'false', 'faux', '0'])
+
+# Libellés de genre -> valeur canonique
+GENRES = {
+    'masculin': 'masculin', 'm': 'masculin', 'homme': 'masculin', 'h': 'masculin',
+    'féminin': 'feminin', 'feminin': 'feminin', 'f': 'feminin', 'femme': 'feminin'
+}
+
+# Champs dérivés par normaliser_etudiant
+CHAMPS_CANONIQUES_ETUDIANT = ('boursier', 'etranger', 'genre', 'annee_debut')
+
+
+def parser_oui_non(value):
+    """Convertit une valeur oui/non (chaîne, booléen ou 0/1) en booléen; None si vide ou inconnue"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        return bool(value) if value in (0, 1) else None
+    if not isinstance(value, str):
+        return None
+    value = value.strip().lower()
+    if value in VALEURS_OUI:
+        return True
+    if value in VALEURS_NON:
+        return False
+    return None
+
+
+def parser_annee_debut(value):
+    """Année de début d'une année académique ("2021-2022" -> 2021); None si illisible"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        debut = value.strip().split('-')[0].strip()
+        if debut.isdigit():
+            return int(debut)
+    return None
+
+
+def normaliser_etudiant(record):
+    """Ajoute à un document étudiant les champs canoniques boursier, etranger, genre et annee_debut
+
+    Les colonnes d'origine (Boursier(ère), Genre, Etranger(ère), Nationalité,
+    annee) sont conservées pour l'affichage. Un boursier non renseigné compte
+    comme non boursier; un statut étranger non renseigné est déduit de la
+    nationalité.
+    """
+    boursier = record.get('Boursier(ère)')
+    record['boursier'] = False if boursier in (None, '') else parser_oui_non(boursier)
+
+    etranger = parser_oui_non(record.get('Etranger(ère)'))
+    if etranger is None:
+        nationalite = record.get('Nationalité')
+        nationalite = nationalite.strip().lower() if isinstance(nationalite, str) else ''
+        etranger = nationalite not in ('', 'française', 'francaise')
+    record['etranger'] = etranger
+
+    genre = record.get('Genre')
+    record['genre'] = GENRES.get(genre.strip().lower()) if isinstance(genre, str) else None
+
+    record['annee_debut'] = parser_annee_debut(record.get('annee'))
+    return record
@@ -0,0 +1,16 @@
+"""
+Blueprints de l'API, un par domaine fonctionnel
+"""
+
+from routes import arion, auth, cat_special, etudiants, general, heures_enseignement, rse, vacataire
+
+BLUEPRINTS = (
+    general.bp,
+    auth.bp,
+    etudiants.bp,
+    heures_enseignement.bp,
+    rse.bp,
+    arion.bp,
+    vacataire.bp,
+    cat_special.bp,
+)
@@ -0,0 +1,406 @@
+"""
+Routes ARION
+"""
+
+import math
+from datetime import datetime
+from flask import Blueprint, current_app, request, jsonify
+
+from config import *
+from extensions import (
+    arion_collection, bump_collection_version, import_jobs, snapshots, token_required, wants_ndjson,
+    ndjson_response, reponse_import_job
+)
+from import_jobs import inserer_par_lots
+from normalisation import normaliser_date_arion
+
+bp = Blueprint('arion', __name__)
+
+@bp.route('/api/arion/data', methods=['GET'])
+def get_arion_data():
+    """Endpoint pour récupérer les données ARION"""
+    try:
+        # Paramètres de filtrage optionnels
+        arion_id = request.args.get('id')
+        annee = request.args.get('annee')
+        formateur = request.args.get('formateur')
+        statut = request.args.get('statut')
+        
+        # Construire le filtre en fonction des paramètres fournis
+        filter_query = {}
+        
+        if arion_id:
+            filter_query["id"] = arion_id
+        if annee:
+            filter_query["annee"] = annee
+        if formateur:
+            filter_query["formateur"] = {"$regex": formateur, "$options": "i"}
+        if statut:
+            filter_query["statut"] = statut
+        
+        # Récupérer les données avec tri par date décroissante
+        cursor = arion_collection.find(filter_query, {'_id': 0}).sort([('annee', -1), ('date', -1)])
+        
+        if wants_ndjson():
+            return ndjson_response(cursor, nettoyer_document_arion)
+        
+        # Convertir le curseur en liste et nettoyer les données
+        clean_data = [nettoyer_document_arion(item) for item in cursor]
+        
+        return jsonify(clean_data), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la récupération des données ARION: {str(e)}"}), 500
+
+def nettoyer_document_arion(item):
+    """Remplace explicitement les valeurs NaN par null pour JSON"""
+    clean_item = {}
+    for key, value in item.items():
+        # Convertir les valeurs problématiques en None pour JSON
+        if isinstance(value, float) and math.isnan(value):
+            clean_item[key] = None
+        # Les dates stockées en datetime sont renvoyées au format YYYY-MM-DD attendu par le frontend
+        elif key == 'date' and isinstance(value, datetime):
+            clean_item[key] = value.strftime('%Y-%m-%d')
+        else:
+            clean_item[key] = value
+    return clean_item
+@bp.route('/api/arion/add', methods=['POST'])
+def add_arion_data():
+    """Endpoint pour ajouter/modifier des données ARION"""
+    data = request.json
+    
+    if not data:
+        return jsonify({"error": "Données manquantes"}), 400
+    
+    # Validation des champs obligatoires
+    required_fields = ['annee', 'formateur', 'statut', 'groupe', 'activite', 
+                      'code_y', 'niveau', 'date', 'duree']
+    missing_fields = [field for field in required_fields if not data.get(field)]
+    if missing_fields:
+        return jsonify({"error": f"Champs manquants: {', '.join(missing_fields)}"}), 400
+    
+    try:
+        # Vérifier si c'est une mise à jour ou un ajout
+        is_update = 'id' in data and data['id']
+        
+        # Conversion des types
+        data['duree'] = float(data['duree'])
+        normaliser_date_arion(data)
+        
+        # Ajout de métadonnées
+        if is_update:
+            data['updated_by'] = 'admin'  # Valeur par défaut
+            data['updated_at'] = datetime.utcnow()
+        else:
+            data['id'] = f"arion_{int(datetime.utcnow().timestamp())}"
+            data['created_by'] = 'admin'  # Valeur par défaut
+            data['created_at'] = datetime.utcnow()
+        
+        # Mise à jour ou insertion
+        if is_update:
+            result = arion_collection.update_one(
+                {"id": data['id']}, 
+                {"$set": data}
+            )
+            
+            if result.matched_count == 0:
+                return jsonify({"error": "Aucune donnée trouvée avec cet ID"}), 404
+                
+            message = "Données ARION mises à jour avec succès"
+        else:
+            result = arion_collection.insert_one(data)
+            message = "Nouvelles données ARION ajoutées avec succès"
+        
+        bump_collection_version(MONGO_COLLECTION_ARION, insertion_seule=not is_update)
+            
+        return jsonify({"message": message, "success": True, "id": data['id']}), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de l'ajout/modification des données ARION: {str(e)}"}), 500
+
+@bp.route('/api/arion/delete/<string:arion_id>', methods=['DELETE'])
+def delete_arion_data(arion_id):
+    """Endpoint pour supprimer des données ARION"""
+    try:
+        # Suppression des données
+        result = arion_collection.delete_one({"id": arion_id})
+        
+        if result.deleted_count == 0:
+            return jsonify({"error": f"Aucune donnée ARION trouvée avec l'ID {arion_id}"}), 404
+        
+        bump_collection_version(MONGO_COLLECTION_ARION)
+            
+        return jsonify({"message": "Données ARION supprimées avec succès", "success": True}), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la suppression des données ARION: {str(e)}"}), 500
+
+@bp.route('/api/arion/upload', methods=['POST'])
+@token_required
+def upload_arion_csv(current_user):
+    """Endpoint pour importer un fichier CSV de données ARION"""
+    if 'file' not in request.files:
+        return jsonify({"error": "Aucun fichier n'a été envoyé"}), 400
+    
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"error": "Aucun fichier n'a été sélectionné"}), 400
+    
+    if file and file.filename.endswith('.csv'):
+        job_id = import_jobs.submit('arion', traiter_import_arion, file, {
+            'username': current_user['username'],
+            'annee_import': request.form.get('annee_import', '')
+        })
+        return reponse_import_job(job_id)
+    
+    return jsonify({"error": "Format de fichier non pris en charge. Seuls les fichiers CSV sont acceptés."}), 400
+
+def traiter_import_arion(chemin, params, progress):
+    """Traite en tâche de fond un fichier CSV de données ARION"""
+    import pandas as pd
+    try:
+        # Récupérer l'année par défaut si spécifiée
+        default_annee = params.get('annee_import', '')
+        
+        # Lecture du fichier CSV avec pandas
+        # Utilisation de paramètres spécifiques pour gérer les valeurs NaN
+        df = pd.read_csv(
+            chemin,
+            na_values=['', 'NA', 'N/A', 'nan', 'NaN', 'None', 'none'],  # Valeurs considérées comme NaN
+            keep_default_na=True  # Conserver les valeurs NaN par défaut
+        )
+        
+        # Validation des colonnes minimales requises
+        required_columns = ['activite', 'groupe', 'code_y', 'niveau', 'date', 'duree']
+        missing_columns = [col for col in required_columns if col not in df.columns]
+        
+        if missing_columns:
+            return {
+                "error": f"Colonnes manquantes dans le CSV: {', '.join(missing_columns)}"
+            }, 400
+        
+        # Ajouter colonne annee si non présente
+        if 'annee' not in df.columns and default_annee:
+            df['annee'] = default_annee
+        
+        # Vérifier que toutes les lignes ont une année
+        if 'annee' not in df.columns or df['annee'].isnull().any():
+            if not default_annee:
+                return {
+                    "error": "Certaines lignes n'ont pas d'année spécifiée et aucune année par défaut n'a été fournie"
+                }, 400
+            else:
+                # Appliquer l'année par défaut aux lignes sans année
+                if 'annee' in df.columns:
+                    df['annee'] = df['annee'].fillna(default_annee)
+                else:
+                    df['annee'] = default_annee
+        
+        # S'assurer que toutes les colonnes attendues existent, même vides
+        for col in ['formateur', 'statut', 'lieu', 'intervenant']:
+            if col not in df.columns:
+                df[col] = None
+        
+        # Conversion du DataFrame en liste de dictionnaires pour MongoDB
+        # Remplacement explicite des valeurs NaN par None pour MongoDB
+        df = df.replace({pd.NA: None})
+        records = df.where(pd.notnull(df), None).to_dict('records')
+        
+        # Ajout de métadonnées et identifiants uniques
+        timestamp = int(datetime.utcnow().timestamp())
+        for i, record in enumerate(records):
+            record['id'] = f"arion_csv_{timestamp}_{i}"
+            record['uploaded_by'] = params['username']
+            record['uploaded_at'] = datetime.utcnow()
+            record['created_by'] = params['username']
+            record['created_at'] = datetime.utcnow()
+            
+            # Conversion de la durée en nombre si possible
+            if 'duree' in record and record['duree'] is not None:
+                try:
+                    record['duree'] = float(record['duree'])
+                except (ValueError, TypeError):
+                    record['duree'] = 0.0
+            
+            # Date stockée en datetime, avec year et month pour les regroupements par mois
+            normaliser_date_arion(record)
+        
+        # Insertion des données
+        if records:
+            inserted = inserer_par_lots(arion_collection, records, progress, IMPORT_JOB_BATCH_SIZE)
+            bump_collection_version(MONGO_COLLECTION_ARION, insertion_seule=True)
+            
+            return {
+                "message": "Importation CSV réussie", 
+                "records_inserted": inserted,
+                "success": True
+            }, 200
+        else:
+            return {"warning": "Aucune donnée trouvée dans le fichier CSV", "success": False}, 400
+            
+    except Exception as e:
+        return {"error": f"Erreur lors du traitement du fichier CSV: {str(e)}"}, 500
+
+@bp.route('/api/arion/stats', methods=['GET'])
+@token_required
+def get_arion_stats(current_user):
+    """Endpoint pour récupérer les statistiques ARION"""
+    try:
+        # Instantané DataFrame de la collection ARION (relu seulement après une écriture)
+        df = snapshots.frame(arion_collection)
+        
+        if df.empty:
+            return jsonify({"error": "Aucune donnée ARION trouvée"}), 404
+        
+        # Calculer les statistiques
+        stats = {
+            "summary": {
+                "total_activites": len(df),
+                "total_duree": round(float(df['duree'].sum()), 1),
+                "formateurs_count": len(df['formateur'].unique()),
+                "niveaux_count": len(df['niveau'].unique()) if 'niveau' in df.columns else 0
+            }
+        }
+        
+        # Statistiques par année
+        stats_par_annee = {}
+        if 'annee' in df.columns:
+            for annee in df['annee'].unique().tolist():
+                annee_df = df[df['annee'] == annee]
+                stats_par_annee[annee] = {
+                    'count': len(annee_df),
+                    'duree_totale': round(float(annee_df['duree'].sum()), 1)
+                }
+        
+        # Préparation des données pour les graphiques
+        graphiques = {
+            'annees': {
+                'labels': list(stats_par_annee.keys()),
+                'values': [stats_par_annee[a]['count'] for a in stats_par_annee]
+            }
+        }
+        
+        # Evolution mensuelle (pour les 12 derniers mois)
+        evolution_mensuelle = {}
+        if 'year' in df.columns and 'month' in df.columns:
+            # Filtrer les dates valides (year et month sont calculés à l'import)
+            date_df = df.dropna(subset=['year', 'month'])
+            if not date_df.empty:
+                # Clé année-mois
+                date_df = date_df.assign(mois=[f"{int(year):04d}-{int(month):02d}" for year, month in zip(date_df['year'], date_df['month'])])
+                
+                # Regrouper par mois
+                monthly_counts = date_df.groupby('mois').size()
+                
+                # Sélectionner les 12 derniers mois avec des données
+                last_months = sorted(monthly_counts.index)[-12:] if len(monthly_counts) > 0 else []
+                
+                for month in last_months:
+                    evolution_mensuelle[month] = int(monthly_counts.get(month, 0))
+                
+                graphiques['evolution_mensuelle'] = {
+                    'labels': list(evolution_mensuelle.keys()),
+                    'values': list(evolution_mensuelle.values())
+                }
+        
+        # Ajouter les graphiques aux statistiques
+        stats['graphiques'] = graphiques
+        
+        return jsonify(stats), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors du calcul des statistiques ARION: {str(e)}"}), 500
+
+@bp.route('/api/arion/status-stats', methods=['GET'])
+@token_required
+def get_arion_status_stats(current_user):
+    """Endpoint pour le nombre de formateurs distincts par statut ARION"""
+    try:
+        # Statuts harmonisés: "Vacataire" -> "Vacataires", vide ou "non spécifié" -> "Non spécifié"
+        statut = {
+            "$switch": {
+                "branches": [
+                    {"case": {"$eq": ["$statut", "Vacataire"]}, "then": "Vacataires"},
+                    {"case": {"$in": [{"$toLower": {"$ifNull": ["$statut", ""]}}, ["", "non spécifié"]]},
+                     "then": "Non spécifié"}
+                ],
+                "default": "$statut"
+            }
+        }
+        pipeline = [
+            {"$group": {"_id": statut, "formateurs": {"$addToSet": "$formateur"}}},
+            {"$project": {
+                "count": {"$size": {"$filter": {
+                    "input": "$formateurs",
+                    "cond": {"$and": [{"$ne": ["$$this", None]}, {"$ne": ["$$this", ""]}]}
+                }}}
+            }},
+            {"$sort": {"_id": 1}}
+        ]
+        result = list(arion_collection.aggregate(pipeline))
+        
+        if not result:
+            # Si aucune donnée, retourner un tableau vide mais sans données fictives
+            return jsonify({
+                "success": True,
+                "status_stats": {
+                    "labels": [],
+                    "values": []
+                },
+                "message": "Aucune donnée trouvée dans la base de données"
+            })
+        
+        return jsonify({
+            "success": True,
+            "status_stats": {
+                "labels": [item["_id"] for item in result],
+                "values": [item["count"] for item in result]
+            }
+        })
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors de la récupération des statistiques par statut: {str(e)}")
+        # En cas d'erreur, retourner un message clair mais pas de données fictives
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "message": "Une erreur s'est produite lors de la récupération des données"
+        }), 500
+
+@bp.route('/api/arion/monthly_stats', methods=['GET'])
+@token_required
+def get_arion_monthly_stats(current_user):
+    """Endpoint pour le nombre d'activités ARION par mois (paramètre optionnel: year)"""
+    try:
+        # Récupérer le paramètre d'année optionnel
+        selected_year = request.args.get('year', None)
+        
+        pipeline = []
+        
+        # year et month sont calculés à l'import: filtre et regroupement servis par l'index (year, month)
+        if selected_year:
+            try:
+                pipeline.append({"$match": {"year": int(selected_year)}})
+            except ValueError:
+                return jsonify({"error": "Paramètre year invalide"}), 400
+        
+        # Grouper par mois (les dates illisibles, sans month, sont ignorées)
+        pipeline.extend([
+            {"$match": {"month": {"$ne": None}}},
+            {"$group": {"_id": "$month", "count": {"$sum": 1}}}
+        ])
+        
+        monthly_counts = {item["_id"]: item["count"] for item in arion_collection.aggregate(pipeline)}
+        
+        # Préparer les données pour le graphique
+        month_names = ["Jan", "Fév", "Mar", "Avr", "Mai", "Juin", "Juil", "Août", "Sep", "Oct", "Nov", "Déc"]
+        values = [monthly_counts.get(month, 0) for month in range(1, 13)]
+        
+        return jsonify({
+            "labels": month_names,
+            "values": values
+        })
+    
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors de la récupération des statistiques mensuelles: {str(e)}")
+        return jsonify({"error": "Erreur lors de la récupération des statistiques mensuelles"}), 500
@@ -0,0 +1,111 @@
+"""
+Routes des catégories spéciales
+"""
+
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+
+from config import *
+from extensions import (
+    donnees_vac_collection, import_jobs, token_required, wants_ndjson, ndjson_response,
+    reponse_import_job
+)
+from import_jobs import inserer_par_lots
+
+bp = Blueprint('cat_special', __name__)
+
+# Ajoutez cette route pour l'importation CSV des catégories spéciales
+@bp.route('/api/cat-special/upload', methods=['POST'])
+@token_required
+def upload_cat_special_file(current_user):
+    """Endpoint pour uploader un fichier CSV des catégories spéciales"""
+    # Vérification des permissions
+    user_role = current_user['role']
+    if 'upload' not in PERMISSIONS.get(user_role, []):
+        return jsonify({"error": "Permissions insuffisantes"}), 403
+    
+    if 'file' not in request.files:
+        return jsonify({"error": "Aucun fichier n'a été envoyé"}), 400
+    
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"error": "Aucun fichier n'a été sélectionné"}), 400
+    
+    if file and file.filename.endswith('.csv'):
+        job_id = import_jobs.submit('cat_special', traiter_import_cat_special, file, {
+            'username': current_user['username'],
+            'filename': file.filename
+        })
+        return reponse_import_job(job_id)
+    
+    return jsonify({"error": "Format de fichier non pris en charge. Seuls les fichiers CSV sont acceptés."}), 400
+
+def traiter_import_cat_special(chemin, params, progress):
+    """Traite en tâche de fond un fichier CSV des catégories spéciales"""
+    import pandas as pd
+    # Déterminer le type de fichier selon le nom
+    file_type = None
+    if "vacataires" in params['filename'].lower():
+        file_type = "vacataires"
+    elif "convention" in params['filename'].lower():
+        file_type = "convention"
+    else:
+        file_type = "autre"  # Type par défaut si non reconnu
+        
+    # Lecture du fichier CSV
+    df = pd.read_csv(chemin, encoding='utf-8')
+    
+    # Vérification des colonnes requises selon le type
+    if file_type == "vacataires" or file_type == "convention":
+        required_columns = ['Prénom', 'Nom', 'Etablissement', 'Adresse mail']
+        missing_columns = [col for col in required_columns if col not in df.columns]
+        
+        if missing_columns:
+            return {
+                "error": f"Format du fichier non reconnu. Colonnes manquantes: {', '.join(missing_columns)}"
+            }, 400
+    
+    # Conversion des données en dictionnaire pour MongoDB
+    records = df.to_dict('records')
+    
+    # Ajouter des champs supplémentaires
+    for record in records:
+        record['created_by'] = params['username']
+        record['created_at'] = datetime.utcnow().isoformat()
+        record['file_type'] = file_type
+    
+    # Insertion dans MongoDB
+    if records:
+        inserted_count = inserer_par_lots(donnees_vac_collection, records, progress, IMPORT_JOB_BATCH_SIZE)
+        
+        return {
+            "message": f"Importation réussie! {inserted_count} enregistrements insérés.",
+            "records_inserted": inserted_count,
+            "success": True
+        }, 200
+    else:
+        return {
+            "error": "Aucun enregistrement trouvé dans le fichier CSV"
+        }, 400
+
+# Ajoutez cette route pour récupérer les données des catégories spéciales
+@bp.route('/api/cat-special', methods=['GET'])
+@token_required
+def get_cat_special_data(current_user):
+    """Endpoint pour récupérer les données des catégories spéciales"""
+    try:
+        # Récupérer tous les enregistrements
+        cursor = donnees_vac_collection.find({}, {'_id': {'$toString': '$_id'}})
+        
+        if wants_ndjson():
+            return ndjson_response(cursor)
+        
+        records = list(cursor)
+        
+        return jsonify({
+            "data": records,
+            "success": True,
+            "count": len(records)
+        }), 200
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la récupération des données: {str(e)}"}), 500
@@ -0,0 +1,944 @@
+"""
+Routes des données étudiants
+"""
+
+import csv
+import json
+import math
+import uuid
+import base64
+from datetime import datetime
+from bson.objectid import ObjectId
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from flask import Blueprint, current_app, request, jsonify
+
+from config import *
+from extensions import (
+    etudiants_collection, bump_collection_version, chart_renderer, import_jobs, snapshots, cached_chart,
+    token_required, wants_ndjson, ndjson_response, reponse_import_job
+)
+from normalisation import normaliser_etudiant, parser_annee_debut, CHAMPS_CANONIQUES_ETUDIANT
+
+bp = Blueprint('etudiants', __name__)
+
+# Endpoints pour la gestion des étudiants individuels
+@bp.route('/etudiants/save', methods=['POST'])
+@token_required
+def save_etudiant(current_user):
+    """Endpoint pour enregistrer (ajouter ou modifier) un étudiant"""
+    try:
+        data = request.json
+        
+        # Si l'ID est fourni, c'est une modification
+        if 'id' in data and data['id']:
+            # Vérifier si l'étudiant existe
+            etudiant = etudiants_collection.find_one({"id": data['id']})
+            
+            if not etudiant:
+                return jsonify({"error": "Étudiant non trouvé"}), 404
+            
+            # Recalculer les champs canoniques à partir du document complet après modification
+            canonique = normaliser_etudiant({**etudiant, **data})
+            data.update({champ: canonique[champ] for champ in CHAMPS_CANONIQUES_ETUDIANT})
+            
+            # Mettre à jour les données
+            data['updated_by'] = current_user['username']
+            data['updated_at'] = datetime.utcnow().isoformat()
+            
+            result = etudiants_collection.update_one(
+                {"id": data['id']},
+                {"$set": data}
+            )
+            
+            if result.modified_count == 0:
+                return jsonify({"error": "Aucune modification effectuée"}), 400
+            
+            bump_collection_version(MONGO_COLLECTION_ETUDIANT)
+                
+            return jsonify({
+                "message": "Étudiant mis à jour avec succès",
+                "id": data['id']
+            }), 200
+        else:
+            # C'est un ajout
+            # Générer un ID unique
+            data['id'] = str(uuid.uuid4())
+            
+            normaliser_etudiant(data)
+            
+            # Ajouter des métadonnées
+            data['created_by'] = current_user['username']
+            data['created_at'] = datetime.utcnow().isoformat()
+            
+            # Insérer dans la base de données
+            result = etudiants_collection.insert_one(data)
+            
+            if not result.inserted_id:
+                return jsonify({"error": "Erreur lors de l'ajout de l'étudiant"}), 500
+            
+            bump_collection_version(MONGO_COLLECTION_ETUDIANT, insertion_seule=True)
+                
+            return jsonify({
+                "message": "Étudiant ajouté avec succès",
+                "id": data['id']
+            }), 201
+    
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors de l'enregistrement de l'étudiant: {str(e)}")
+        import traceback
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": f"Erreur lors de l'enregistrement de l'étudiant: {str(e)}"}), 500
+@bp.route('/etudiants/delete/<string:etudiant_id>', methods=['DELETE'])
+@token_required
+def delete_etudiant(current_user, etudiant_id):
+    """Endpoint pour supprimer un étudiant"""
+    try:
+        # Vérifier si l'étudiant existe
+        etudiant = etudiants_collection.find_one({"id": etudiant_id})
+        
+        if not etudiant:
+            return jsonify({"error": "Étudiant non trouvé"}), 404
+        
+        # Supprimer l'étudiant
+        result = etudiants_collection.delete_one({"id": etudiant_id})
+        
+        if result.deleted_count == 0:
+            return jsonify({"error": "Aucun étudiant supprimé"}), 400
+        
+        bump_collection_version(MONGO_COLLECTION_ETUDIANT)
+            
+        return jsonify({
+            "message": "Étudiant supprimé avec succès",
+            "id": etudiant_id
+        }), 200
+    
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors de la suppression de l'étudiant: {str(e)}")
+        import traceback
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": f"Erreur lors de la suppression de l'étudiant: {str(e)}"}), 500
+
+@bp.route('/etudiants/liste', methods=['GET'])
+@token_required
+def get_etudiants_liste(current_user):
+    """Endpoint simple pour récupérer les étudiants de la base de données
+
+    Paramètres optionnels:
+    - page / per_page : pagination des lignes étudiants (per_page plafonné à ETUDIANTS_LISTE_MAX_PER_PAGE);
+      sans ces paramètres, toutes les lignes sont renvoyées comme auparavant
+    - stats_only=true : ne renvoie que les statistiques, sans les lignes
+    """
+    try:
+        stats_only = request.args.get('stats_only', 'false').lower() in ('true', '1', 'oui')
+
+        # Calculer toutes les statistiques en une seule agrégation côté MongoDB
+        stats = calculer_stats_etudiants_liste()
+
+        # Si aucun étudiant trouvé
+        if stats["total_etudiants"] == 0:
+            return jsonify({"etudiants": [], "message": "Aucun étudiant trouvé"}), 200
+
+        response = {
+            "stats": stats,
+            "message": "Données récupérées avec succès"
+        }
+
+        if not stats_only:
+            cursor = etudiants_collection.find({}, {'_id': 0}).sort('_id', 1)
+
+            # Pagination seulement si le client la demande (compatibilité avec les appels existants)
+            if 'page' in request.args or 'per_page' in request.args:
+                try:
+                    page = max(int(request.args.get('page', 1)), 1)
+                    per_page = int(request.args.get('per_page', ETUDIANTS_LISTE_DEFAULT_PER_PAGE))
+                except ValueError:
+                    return jsonify({"error": "Paramètres de pagination invalides"}), 400
+                per_page = min(max(per_page, 1), ETUDIANTS_LISTE_MAX_PER_PAGE)
+
+                cursor = cursor.skip((page - 1) * per_page).limit(per_page)
+                response["pagination"] = {
+                    "page": page,
+                    "per_page": per_page,
+                    "total": stats["total_etudiants"],
+                    "pages": math.ceil(stats["total_etudiants"] / per_page)
+                }
+
+            response["etudiants"] = list(cursor)
+
+        return jsonify(response), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors de la récupération des étudiants: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+def _facet_comptage(champ, defaut):
+    """Sous-pipeline $facet qui compte les étudiants par valeur d'un champ"""
+    return [
+        {"$group": {"_id": {"$ifNull": [f"${champ}", defaut]}, "count": {"$sum": 1}}},
+        {"$sort": {"_id": 1}}
+    ]
+
+def calculer_stats_etudiants_liste():
+    """Calcule les statistiques de /etudiants/liste en une seule agrégation $facet"""
+    pipeline = [
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            "annees": [
+                {"$match": {"annee": {"$nin": [None, "", 0]}}},
+                {"$group": {"_id": "$annee"}},
+                {"$sort": {"_id": 1}}
+            ],
+            "niveaux": _facet_comptage('niveau', 'Non spécifié'),
+            "genres": _facet_comptage('Genre', 'Non spécifié'),
+            "nationalites": _facet_comptage('Nationalité', 'Non spécifiée'),
+            "boursiers": [
+                {"$match": {"boursier": True}},
+                {"$count": "count"}
+            ]
+        }}
+    ]
+
+    resultat = next(etudiants_collection.aggregate(pipeline), {})
+
+    total_etudiants = resultat["total"][0]["count"] if resultat.get("total") else 0
+    nb_boursiers = resultat["boursiers"][0]["count"] if resultat.get("boursiers") else 0
+
+    return {
+        "total_etudiants": total_etudiants,
+        "niveaux": {item["_id"]: item["count"] for item in resultat.get("niveaux", [])},
+        "genres": {item["_id"]: item["count"] for item in resultat.get("genres", [])},
+        "boursiers": {"Oui": nb_boursiers, "Non": total_etudiants - nb_boursiers},
+        "nationalites": {item["_id"]: item["count"] for item in resultat.get("nationalites", [])},
+        "annees": [item["_id"] for item in resultat.get("annees", [])],
+        "taux_boursiers": (nb_boursiers / total_etudiants * 100) if total_etudiants > 0 else 0
+    }
+
+@bp.route('/api/etudiants/upload-data', methods=['POST'])
+@token_required
+def upload_etudiants_data(current_user):
+    try:
+        data = request.json
+        if not data or 'etudiants' not in data:
+            return jsonify({"error": "Données invalides"}), 400
+        
+        # Ajouter des métadonnées à chaque étudiant
+        for etudiant in data['etudiants']:
+            normaliser_etudiant(etudiant)
+            etudiant['created_by'] = current_user['username']
+            etudiant['created_at'] = datetime.utcnow().isoformat()
+            
+            # Ajouter un ID si non fourni
+            if 'id' not in etudiant or not etudiant['id']:
+                etudiant['id'] = str(uuid.uuid4())
+        
+        # Écrire les étudiants par lots (upsert sur la clé naturelle quand elle est renseignée)
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "duplicated": 0}
+        erreurs = []
+        for start in range(0, len(data['etudiants']), IMPORT_JOB_BATCH_SIZE):
+            lot_counts, lot_erreurs = ecrire_etudiants(data['etudiants'][start:start + IMPORT_JOB_BATCH_SIZE])
+            for cle in counts:
+                counts[cle] += lot_counts[cle]
+            erreurs += [{"index": start + index, "error": message} for index, message in lot_erreurs]
+        
+        if counts["inserted"] or counts["updated"]:
+            bump_collection_version(MONGO_COLLECTION_ETUDIANT, insertion_seule=not counts["updated"])
+        
+        # Même traitement du résultat que l'import CSV: échec si aucune ligne n'a pu être écrite
+        total_ecrit = counts["inserted"] + counts["updated"] + counts["unchanged"]
+        resultat = {
+            "message": message_import_etudiants(counts, len(erreurs)),
+            "records_inserted": counts["inserted"],
+            "records_updated": counts["updated"],
+            "records_unchanged": counts["unchanged"],
+            "records_duplicated": counts["duplicated"],
+            "records_failed": len(erreurs),
+            "errors": erreurs,
+            "success": total_ecrit > 0 or not erreurs
+        }
+        sans_cle = sum(1 for etudiant in data['etudiants'] if cle_naturelle(etudiant) is None)
+        if sans_cle:
+            resultat["records_without_key"] = sans_cle
+            resultat["warning"] = avertissement_sans_cle(sans_cle)
+        if not resultat["success"]:
+            resultat["error"] = "Aucune ligne n'a pu être importée"
+            return jsonify(resultat), 400
+        return jsonify(resultat), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Erreur: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/etudiants/upload-csv', methods=['POST'])
+@token_required
+def upload_etudiants_csv(current_user):
+    """Endpoint pour importer un fichier CSV d'étudiants, lu en flux et inséré par lots"""
+    # Vérification des permissions (les secrétaires importent les effectifs avec basic_upload)
+    permissions = PERMISSIONS.get(current_user['role'], [])
+    if 'upload' not in permissions and 'basic_upload' not in permissions:
+        return jsonify({"error": "Permissions insuffisantes"}), 403
+    
+    if 'file' not in request.files:
+        return jsonify({"error": "Aucun fichier n'a été envoyé"}), 400
+    
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"error": "Aucun fichier n'a été sélectionné"}), 400
+    
+    if not file.filename.lower().endswith('.csv'):
+        return jsonify({"error": "Format de fichier non pris en charge. Seuls les fichiers CSV sont acceptés."}), 400
+    
+    # Année académique de l'import, appliquée aux lignes sans colonne annee (le CSV d'effectifs n'en a pas)
+    annee = request.form.get('annee', '').strip()
+    if annee and parser_annee_debut(annee) is None:
+        return jsonify({"error": f"Année académique invalide: {annee} (format attendu: 2024-2025)"}), 400
+    
+    job_id = import_jobs.submit('etudiants', traiter_import_etudiants_csv, file, {
+        'username': current_user['username'],
+        'annee': annee
+    })
+    return reponse_import_job(job_id)
+
+def cle_naturelle(etudiant):
+    """Valeurs de la clé naturelle (ETUDIANTS_CLE_NATURELLE) d'un étudiant, ou None si un champ est vide"""
+    cle = tuple(etudiant.get(champ) for champ in ETUDIANTS_CLE_NATURELLE)
+    return cle if all(valeur not in (None, '') for valeur in cle) else None
+
+def avertissement_sans_cle(nombre):
+    """Message signalant les étudiants écrits sans clé naturelle complète (un réimport les dupliquera)"""
+    return (f"{nombre} étudiant(s) sans clé naturelle complète ({', '.join(ETUDIANTS_CLE_NATURELLE)}): "
+            f"insérés sans dédoublonnage, un nouvel import les dupliquera")
+
+def ecrire_etudiants(etudiants):
+    """Écrit un lot d'étudiants en un seul bulk_write (ordered=False)
+
+    Un étudiant dont la clé naturelle (ETUDIANTS_CLE_NATURELLE) est complète
+    est écrit en UpdateOne(upsert=True): réimporter le même fichier ne crée pas
+    de doublon et un document identique n'est pas modifié. Les autres sont
+    insérés. Renvoie les compteurs inserted/updated/unchanged/duplicated et la
+    liste (index dans le lot, message) des lignes rejetées.
+    """
+    # Dédoublonnage sur la clé naturelle: la dernière occurrence du lot l'emporte,
+    # les précédentes sont comptées dans duplicated
+    par_cle = {}
+    sans_cle = []
+    doublons = 0
+    for index, etudiant in enumerate(etudiants):
+        cle = cle_naturelle(etudiant)
+        if cle is not None:
+            doublons += cle in par_cle
+            par_cle[cle] = index
+        else:
+            sans_cle.append(index)
+    
+    operations = []
+    index_lot = []
+    for cle, index in par_cle.items():
+        etudiant = etudiants[index]
+        # Métadonnées posées à la création seulement: un document identique reste inchangé
+        a_la_creation = {champ: etudiant[champ] for champ in ('id', 'created_by', 'created_at') if champ in etudiant}
+        operations.append(UpdateOne(
+            dict(zip(ETUDIANTS_CLE_NATURELLE, cle)),
+            {
+                "$set": {champ: valeur for champ, valeur in etudiant.items() if champ not in a_la_creation},
+                "$setOnInsert": a_la_creation
+            },
+            upsert=True
+        ))
+        index_lot.append(index)
+    for index in sans_cle:
+        # Une clé partielle vide n'est pas stockée: le document reste hors de l'index unique
+        etudiant = {
+            champ: valeur for champ, valeur in etudiants[index].items()
+            if champ not in ETUDIANTS_CLE_NATURELLE or valeur not in (None, '')
+        }
+        operations.append(InsertOne(etudiant))
+        index_lot.append(index)
+    
+    if not operations:
+        return {"inserted": 0, "updated": 0, "unchanged": 0, "duplicated": 0}, []
+    
+    try:
+        details = etudiants_collection.bulk_write(operations, ordered=False).bulk_api_result
+        erreurs = []
+    except BulkWriteError as e:
+        details = e.details
+        erreurs = [
+            (index_lot[erreur['index']], erreur.get('errmsg', "Erreur d'écriture"))
+            for erreur in details.get('writeErrors', [])
+        ]
+    
+    return {
+        "inserted": details.get('nInserted', 0) + details.get('nUpserted', 0),
+        "updated": details.get('nModified', 0),
+        "unchanged": details.get('nMatched', 0) - details.get('nModified', 0),
+        "duplicated": doublons
+    }, erreurs
+
+def message_import_etudiants(counts, nb_erreurs):
+    """Résumé d'un import d'étudiants (upload-data et upload-csv)"""
+    message = (f"{counts['inserted']} étudiant(s) ajouté(s), {counts['updated']} mis à jour, "
+               f"{counts['unchanged']} inchangé(s), {nb_erreurs} ligne(s) en erreur")
+    if counts["duplicated"]:
+        message += f", {counts['duplicated']} doublon(s) du fichier ignoré(s) (dernière occurrence conservée)"
+    return message
+
+def traiter_import_etudiants_csv(chemin, params, progress):
+    """Traite en tâche de fond un CSV d'étudiants ligne à ligne (module csv), par lots de IMPORT_JOB_BATCH_SIZE
+
+    Seul le lot courant est en mémoire; chaque lot est écrit par ecrire_etudiants
+    (upsert sur la clé naturelle). L'année académique de l'import (params['annee'])
+    complète les lignes sans annee. Un fichier sans les colonnes de la clé est
+    refusé. Les lignes mal formées et les erreurs d'écriture sont rapportées
+    par lot, avec leur numéro de ligne dans le fichier.
+    """
+    annee_import = params.get('annee', '')
+    with open(chemin, newline='', encoding='utf-8-sig', errors='replace') as fichier:
+        try:
+            dialecte = csv.Sniffer().sniff(fichier.read(4096), delimiters=',;\t')
+        except csv.Error:
+            dialecte = csv.excel
+        fichier.seek(0)
+        
+        lecteur = csv.DictReader(fichier, dialect=dialecte)
+        if not lecteur.fieldnames:
+            return {"error": "Le fichier CSV est vide"}, 400
+        lecteur.fieldnames = [colonne.strip() for colonne in lecteur.fieldnames]
+        
+        # Sans les colonnes de la clé naturelle, chaque import ajouterait de nouveaux doublons
+        colonnes_manquantes = [
+            champ for champ in ETUDIANTS_CLE_NATURELLE
+            if champ not in lecteur.fieldnames and not (champ == 'annee' and annee_import)
+        ]
+        if colonnes_manquantes:
+            return {
+                "error": (f"Colonnes de la clé naturelle absentes du fichier: {', '.join(colonnes_manquantes)} "
+                          f"(clé attendue: {', '.join(ETUDIANTS_CLE_NATURELLE)}; l'année académique peut "
+                          f"être indiquée à l'import)"),
+                "success": False
+            }, 400
+        
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "duplicated": 0}
+        total_failed = 0
+        sans_cle = 0
+        nb_lots = 0
+        batch_errors = []
+        lot, lignes, erreurs_lot = [], [], []
+        now = datetime.utcnow().isoformat()
+        
+        def vider_lot():
+            nonlocal total_failed, nb_lots, lot, lignes, erreurs_lot
+            nb_lots += 1
+            lot_counts, lot_erreurs = ecrire_etudiants(lot)
+            erreurs = erreurs_lot + [{"line": lignes[index], "error": message} for index, message in lot_erreurs]
+            for cle in counts:
+                counts[cle] += lot_counts[cle]
+            total_failed += len(erreurs)
+            if erreurs:
+                batch_errors.append({
+                    "batch": nb_lots,
+                    "lines": [premiere_ligne, lecteur.line_num],
+                    "inserted": lot_counts["inserted"],
+                    "updated": lot_counts["updated"],
+                    "unchanged": lot_counts["unchanged"],
+                    "errors": erreurs
+                })
+            progress(sum(counts.values()) + total_failed)
+            lot, lignes, erreurs_lot = [], [], []
+        
+        premiere_ligne = lecteur.line_num + 1
+        for record in lecteur:
+            # Les colonnes en trop sont rangées par DictReader sous la clé None
+            if None in record:
+                erreurs_lot.append({"line": lecteur.line_num, "error": "Nombre de colonnes supérieur à l'en-tête"})
+            elif any(valeur and valeur.strip() for valeur in record.values()):
+                etudiant = {colonne: (valeur.strip() if valeur is not None else None) for colonne, valeur in record.items()}
+                if annee_import and not etudiant.get('annee'):
+                    etudiant['annee'] = annee_import
+                normaliser_etudiant(etudiant)
+                etudiant['id'] = etudiant.get('id') or str(uuid.uuid4())
+                etudiant['created_by'] = params['username']
+                etudiant['created_at'] = now
+                if cle_naturelle(etudiant) is None:
+                    sans_cle += 1
+                lot.append(etudiant)
+                lignes.append(lecteur.line_num)
+            
+            if len(lot) + len(erreurs_lot) >= IMPORT_JOB_BATCH_SIZE:
+                vider_lot()
+                premiere_ligne = lecteur.line_num + 1
+        
+        if lot or erreurs_lot:
+            vider_lot()
+    
+    if counts["inserted"] or counts["updated"]:
+        bump_collection_version(MONGO_COLLECTION_ETUDIANT, insertion_seule=not counts["updated"])
+    
+    total_ecrit = counts["inserted"] + counts["updated"] + counts["unchanged"]
+    resultat = {
+        "message": message_import_etudiants(counts, total_failed),
+        "records_inserted": counts["inserted"],
+        "records_updated": counts["updated"],
+        "records_unchanged": counts["unchanged"],
+        "records_duplicated": counts["duplicated"],
+        "records_failed": total_failed,
+        "batches": nb_lots,
+        "batch_errors": batch_errors,
+        "success": total_ecrit > 0 or total_failed == 0
+    }
+    if sans_cle:
+        resultat["records_without_key"] = sans_cle
+        resultat["warning"] = avertissement_sans_cle(sans_cle)
+    if not resultat["success"]:
+        resultat["error"] = "Aucune ligne n'a pu être importée"
+        return resultat, 400
+    return resultat, 200
+
+# Endpoint pour récupérer la liste des années disponibles
+
+@bp.route('/api/etudiants/annees', methods=['GET'])
+@token_required
+def get_etudiants_annees(current_user):
+    """Endpoint pour récupérer la liste des années académiques disponibles"""
+    try:
+        # Valeurs distinctes calculées par MongoDB (index sur annee), sans lire les documents
+        annees = sorted(annee for annee in etudiants_collection.distinct('annee') if annee is not None)
+        
+        return jsonify({"annees": annees}), 200
+    
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors de la récupération des années: {str(e)}")
+        return jsonify({"error": f"Erreur lors de la récupération des années: {str(e)}"}), 500
+
+
+@bp.route('/api/etudiants', methods=['GET'])
+def get_etudiants():  # J'ai supprimé le décorateur @token_required temporairement pour simplifier
+    """Endpoint pour récupérer les étudiants, page par page (pagination par curseur sur _id)
+
+    Paramètres optionnels:
+    - page_size : taille de la page, plafonnée à ETUDIANTS_MAX_PAGE_SIZE
+    - cursor : jeton opaque renvoyé dans 'next_cursor' par la page précédente
+    - fields : liste de champs séparés par des virgules (projection)
+    - limit : sans page_size ni cursor, nombre maximal d'étudiants renvoyés
+
+    Sans page_size ni cursor, la réponse garde sa forme d'origine: un tableau de
+    tous les étudiants (limité à limit s'il est fourni). Avec l'un des deux, elle
+    renvoie un objet {etudiants, count, page_size, next_cursor}.
+    """
+    try:
+        # Reprendre après le dernier _id de la page précédente
+        query = {}
+        cursor_token = request.args.get('cursor')
+        if cursor_token:
+            last_id = decode_pagination_cursor(cursor_token)
+            if last_id is None:
+                return jsonify({"error": "Curseur de pagination invalide"}), 400
+            query['_id'] = {'$gt': last_id}
+
+        # Projection: _id est toujours lu pour construire le curseur suivant
+        fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip() and f.strip() != '_id']
+        projection = {field: 1 for field in fields} if fields else None
+
+        # Export NDJSON: toute la collection en flux, sans pagination
+        if wants_ndjson():
+            export_projection = dict(projection or {}, _id=0)
+            return ndjson_response(etudiants_collection.find(query, export_projection).sort('_id', 1))
+
+        # Forme d'origine pour les clients qui ne demandent pas de page
+        if 'page_size' not in request.args and 'cursor' not in request.args:
+            cursor = etudiants_collection.find(query, dict(projection or {}, _id=0)).sort('_id', 1)
+            if request.args.get('limit'):
+                try:
+                    cursor = cursor.limit(max(int(request.args['limit']), 0))
+                except ValueError:
+                    return jsonify({"error": "Paramètre limit invalide"}), 400
+            return jsonify(list(cursor)), 200
+
+        # Taille de page, plafonnée côté serveur
+        try:
+            page_size = int(request.args.get('page_size') or ETUDIANTS_DEFAULT_PAGE_SIZE)
+        except ValueError:
+            return jsonify({"error": "Paramètre page_size invalide"}), 400
+        page_size = min(max(page_size, 1), ETUDIANTS_MAX_PAGE_SIZE)
+
+        # Lire une ligne de plus pour savoir s'il reste une page
+        documents = list(etudiants_collection.find(query, projection).sort('_id', 1).limit(page_size + 1))
+        has_more = len(documents) > page_size
+        documents = documents[:page_size]
+
+        next_cursor = encode_pagination_cursor(documents[-1]['_id']) if has_more else None
+
+        for etudiant in documents:
+            etudiant.pop('_id', None)
+
+        return jsonify({
+            "etudiants": documents,
+            "count": len(documents),
+            "page_size": page_size,
+            "next_cursor": next_cursor
+        }), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors de la récupération des étudiants: {str(e)}")
+        return jsonify({"error": f"Erreur lors de la récupération des étudiants: {str(e)}"}), 500
+
+def encode_pagination_cursor(last_id):
+    """Encode le dernier _id d'une page en jeton opaque pour la page suivante"""
+    payload = json.dumps({"_id": str(last_id)}).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+def decode_pagination_cursor(cursor_token):
+    """Décode un jeton de pagination, renvoie None s'il est invalide"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor_token.encode('ascii')))
+        last_id = payload["_id"]
+    except (ValueError, KeyError, TypeError):
+        return None
+    return ObjectId(last_id) if ObjectId.is_valid(last_id) else last_id
+@bp.route('/api/etudiants/niveaux', methods=['GET'])
+def get_etudiants_niveaux():
+    """Endpoint pour récupérer tous les niveaux d'étudiants disponibles"""
+    try:
+        # Utiliser distinct pour récupérer tous les niveaux uniques
+        niveaux = etudiants_collection.distinct("niveau")
+        
+        # Filtrer les valeurs None ou vides
+        niveaux = [niveau for niveau in niveaux if niveau]
+        
+        # Trier les niveaux
+        niveaux.sort()
+        
+        print(f"Niveaux disponibles: {niveaux}")
+        
+        return jsonify({"niveaux": niveaux}), 200
+    
+    except Exception as e:
+        print(f"ERREUR lors de la récupération des niveaux: {str(e)}")
+        import traceback
+        print(traceback.format_exc())
+        return jsonify({"error": f"Erreur lors de la récupération des niveaux: {str(e)}"}), 500
+@bp.route('/api/etudiants/add', methods=['POST'])
+@token_required
+def add_etudiant(current_user):
+    """Endpoint pour ajouter un étudiant"""
+    try:
+        data = request.form.to_dict()
+        
+        # Vérification des champs obligatoires
+        required_fields = ['Nom', 'Prénom', 'Genre', 'niveau', 'annee']
+        for field in required_fields:
+            if field not in data or not data[field]:
+                return jsonify({"success": False, "message": f"Le champ '{field}' est obligatoire"}), 400
+        
+        normaliser_etudiant(data)
+        
+        # Ajout des métadonnées
+        data['created_by'] = current_user['username']
+        data['created_at'] = datetime.utcnow().isoformat()
+        
+        # Ajout d'un ID si non fourni
+        if 'id' not in data or not data['id']:
+            data['id'] = str(uuid.uuid4())
+        
+        # Insertion dans la base de données
+        result = etudiants_collection.insert_one(data)
+        
+        if result.inserted_id:
+            bump_collection_version(MONGO_COLLECTION_ETUDIANT, insertion_seule=True)
+            return jsonify({
+                "success": True,
+                "message": "Étudiant ajouté avec succès",
+                "id": data['id']
+            }), 201
+        else:
+            return jsonify({"success": False, "message": "Erreur lors de l'ajout de l'étudiant"}), 500
+    
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors de l'ajout d'un étudiant: {str(e)}")
+        return jsonify({"success": False, "message": f"Erreur lors de l'ajout de l'étudiant: {str(e)}"}), 500
+   
+@bp.route('/api/etudiants/stats', methods=['GET'])
+@token_required
+def get_etudiants_stats(current_user):
+    """Endpoint pour récupérer les statistiques des étudiants individuels
+
+    Tous les blocs sont calculés par MongoDB en une seule agrégation ($facet), sur
+    les champs canoniques écrits à l'ingestion (complétés au démarrage pour les
+    documents plus anciens, voir initialiser_base): seuls les compteurs par
+    niveau et par année reviennent côté Python.
+    """
+    try:
+        def compter(condition):
+            return {"$sum": {"$cond": [condition, 1, 0]}}
+        
+        def present(champ):
+            return {"$max": {"$cond": [{"$gt": [f"${champ}", None]}, 1, 0]}}
+        
+        pipeline = [
+            # Seuls les champs utiles aux statistiques sont lus: les champs canoniques
+            # (normalisation.normaliser_etudiant) et les colonnes d'origine pour leur présence
+            {"$project": {
+                "_id": 0, "niveau": 1, "annee": 1,
+                "boursier": 1, "genre": 1, "etranger": 1,
+                "Boursier(ère)": 1, "Genre": 1, "Etranger(ère)": 1
+            }},
+            {"$facet": {
+                "totaux": [{"$group": {
+                    "_id": None,
+                    "total": {"$sum": 1},
+                    "boursiers": compter({"$eq": ["$boursier", True]}),
+                    "non_boursiers": compter({"$eq": ["$boursier", False]}),
+                    "masculin": compter({"$eq": ["$genre", "masculin"]}),
+                    "feminin": compter({"$eq": ["$genre", "feminin"]}),
+                    "etrangers": compter({"$eq": ["$etranger", True]}),
+                    "niveau_present": present("niveau"),
+                    "annee_present": present("annee"),
+                    "boursier_present": present("Boursier(ère)"),
+                    "genre_present": present("Genre"),
+                    "etranger_present": present("Etranger(ère)")
+                }}],
+                "par_niveau": [
+                    {"$match": {"niveau": {"$ne": None}}},
+                    {"$group": {"_id": "$niveau", "total": {"$sum": 1}, "etrangers": compter({"$eq": ["$etranger", True]})}}
+                ],
+                "par_annee_niveau": [
+                    {"$match": {"annee": {"$ne": None}}},
+                    {"$group": {"_id": {"annee": "$annee", "niveau": "$niveau"}, "count": {"$sum": 1}}}
+                ]
+            }}
+        ]
+        resultat = next(etudiants_collection.aggregate(pipeline))
+        
+        if not resultat["totaux"]:
+            return jsonify({"error": "Aucun étudiant trouvé dans la base de données"}), 404
+        totaux = resultat["totaux"][0]
+        total_etudiants = totaux["total"]
+        
+        # 1. Taux de boursiers
+        boursiers_data = {}
+        if totaux["boursier_present"]:
+            total = totaux["boursiers"] + totaux["non_boursiers"]
+            boursiers_data = {
+                'boursiers': totaux["boursiers"],
+                'non_boursiers': totaux["non_boursiers"],
+                'taux_boursiers': float(totaux["boursiers"] / total * 100) if total > 0 else 0,
+                'taux_non_boursiers': float(totaux["non_boursiers"] / total * 100) if total > 0 else 0
+            }
+        
+        # 2. Répartition par niveau d'étude
+        niveaux_data = {}
+        if totaux["niveau_present"]:
+            niveaux_data = {
+                'counts': {item["_id"]: item["total"] for item in resultat["par_niveau"]},
+                'total': total_etudiants
+            }
+        
+        # 3. Répartition par genre
+        genre_data = {}
+        if totaux["genre_present"]:
+            total = totaux["masculin"] + totaux["feminin"]
+            genre_data = {
+                'masculin': totaux["masculin"],
+                'feminin': totaux["feminin"],
+                'taux_masculin': float(totaux["masculin"] / total * 100) if total > 0 else 0,
+                'taux_feminin': float(totaux["feminin"] / total * 100) if total > 0 else 0
+            }
+        
+        # 4. Taux d'étudiants étrangers par niveau
+        etrangers_data = {}
+        if totaux["etranger_present"] and totaux["niveau_present"]:
+            etrangers_data = {
+                'par_niveau': {
+                    item["_id"]: {
+                        'total': item["total"],
+                        'etrangers': item["etrangers"],
+                        'taux_etrangers': item["etrangers"] / item["total"] * 100
+                    }
+                    for item in resultat["par_niveau"]
+                },
+                'total_etrangers': totaux["etrangers"],
+                'taux_global': totaux["etrangers"] / total_etudiants * 100
+            }
+        
+        # 5. Évolution du nombre d'étudiants par niveau et par année de début (ex: "2021-2022" -> "2021")
+        evolution_data = {}
+        annees = sorted({item["_id"]["annee"] for item in resultat["par_annee_niveau"]})
+        if totaux["niveau_present"] and totaux["annee_present"]:
+            evolution = {}
+            annees_debut = set()
+            for item in resultat["par_annee_niveau"]:
+                annee = item["_id"]["annee"]
+                annee_debut = annee.split('-')[0] if isinstance(annee, str) else annee
+                annees_debut.add(annee_debut)
+                niveau = item["_id"].get("niveau")
+                if niveau is None:
+                    continue
+                par_annee = evolution.setdefault(niveau, {})
+                par_annee[annee_debut] = par_annee.get(annee_debut, 0) + item["count"]
+            
+            # Même forme qu'un tableau croisé: chaque niveau a une valeur pour chaque année
+            for par_annee in evolution.values():
+                for annee_debut in annees_debut:
+                    par_annee.setdefault(annee_debut, 0)
+            evolution_data = {
+                'par_annee_niveau': evolution,
+                'annees': sorted(annees_debut)
+            }
+        
+        # Assembler toutes les statistiques
+        stats = {
+            'boursiers': boursiers_data,
+            'niveaux': niveaux_data,
+            'genre': genre_data,
+            'etrangers': etrangers_data,
+            'evolution': evolution_data,
+            'annees': annees
+        }
+        
+        return jsonify(stats), 200
+    
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors du calcul des statistiques étudiants: {str(e)}")
+        return jsonify({"error": f"Erreur lors du calcul des statistiques: {str(e)}"}), 500
+
+@bp.route('/api/etudiants/chart/<chart_type>', methods=['GET'])
+@token_required
+@cached_chart(MONGO_COLLECTION_ETUDIANT, filter_args=('annee',))
+def get_etudiants_chart(current_user, chart_type):
+    """Endpoint pour générer des graphiques spécifiques aux étudiants"""
+    try:
+        # Instantané DataFrame de la collection étudiants (partagé: lu sans être modifié)
+        df = snapshots.frame(etudiants_collection)
+        
+        if df.empty:
+            return jsonify({"error": "Aucun étudiant trouvé dans la base de données"}), 404
+        
+        # Le DataFrame est agrégé ici; seul le résultat est envoyé au pool de rendu
+        if chart_type == 'boursiers_pie':
+            # Vérification de l'existence de la colonne "Boursier(ère)"
+            if 'Boursier(ère)' not in df.columns:
+                return jsonify({"error": "Données de boursiers non disponibles"}), 400
+            
+            # Champ canonique boursier, comme /api/etudiants/stats (non renseigné = non boursier)
+            boursiers_count = int(df['boursier'].eq(True).sum())
+            non_boursiers_count = int(df['boursier'].eq(False).sum())
+            
+            spec = {
+                'type': 'pie',
+                'values': [boursiers_count, non_boursiers_count],
+                'labels': ['Boursiers', 'Non-boursiers'],
+                'colors': ['#3366cc', '#dc3912'],
+                'startangle': 90,
+                'title': 'Répartition des étudiants boursiers'
+            }
+            
+        elif chart_type == 'niveaux_bar':
+            # Vérification de l'existence de la colonne "niveau"
+            if 'niveau' not in df.columns:
+                return jsonify({"error": "Données de niveau non disponibles"}), 400
+            
+            # Paramètre pour filtrer par année
+            annee_filter = request.args.get('annee')
+            
+            # Filtrer par année si spécifiée
+            if annee_filter and 'annee' in df.columns:
+                df = df[df['annee'] == annee_filter]
+            
+            # Compter les étudiants par niveau (sans les niveaux absents de l'année filtrée)
+            niveau_counts = df['niveau'].value_counts().sort_index()
+            niveau_counts = niveau_counts[niveau_counts > 0]
+            
+            spec = {
+                'type': 'bar',
+                'labels': [str(niveau) for niveau in niveau_counts.index],
+                'values': niveau_counts.values.tolist(),
+                'color': '#3366cc',
+                'value_format': '{:.0f}',
+                'label_offset': 0.1,
+                'title': 'Nombre d\'étudiants par niveau',
+                'xlabel': 'Niveau',
+                'ylabel': 'Nombre d\'étudiants',
+                'label_fontsize': 12,
+                'xtick_rotation': 0
+            }
+            
+        elif chart_type == 'genre_pie':
+            # Vérification de l'existence de la colonne "Genre"
+            if 'Genre' not in df.columns:
+                return jsonify({"error": "Données de genre non disponibles"}), 400
+            
+            # Champ canonique genre, comme /api/etudiants/stats
+            masculin_count = int(df['genre'].eq('masculin').sum())
+            feminin_count = int(df['genre'].eq('feminin').sum())
+            
+            spec = {
+                'type': 'pie',
+                'values': [masculin_count, feminin_count],
+                'labels': ['Masculin', 'Féminin'],
+                'colors': ['#3366cc', '#dc3912'],
+                'startangle': 90,
+                'title': 'Répartition des étudiants par genre'
+            }
+            
+        elif chart_type == 'etrangers_bar':
+            # Vérification de l'existence des colonnes nécessaires
+            if 'Etranger(ère)' not in df.columns or 'niveau' not in df.columns:
+                return jsonify({"error": "Données d'étrangers ou de niveau non disponibles"}), 400
+            
+            # Champ canonique etranger (déduit de la nationalité si non renseigné), comme /api/etudiants/stats
+            etrangers_data = df['etranger'].eq(True).groupby(df['niveau'], observed=True).agg(['size', 'sum'])
+            taux_etrangers = etrangers_data['sum'] / etrangers_data['size'] * 100
+            
+            spec = {
+                'type': 'bar',
+                'labels': [str(niveau) for niveau in taux_etrangers.index],
+                'values': [float(taux) for taux in taux_etrangers],
+                'color': '#3366cc',
+                'value_format': '{:.1f}%',
+                'label_offset': 0.5,
+                'ylim': (0, 100),  # Limiter l'axe y à 100%
+                'title': 'Taux d\'étudiants étrangers par niveau',
+                'xlabel': 'Niveau',
+                'ylabel': 'Taux d\'étrangers (%)',
+                'label_fontsize': 12,
+                'xtick_rotation': 0
+            }
+            
+        elif chart_type == 'evolution_line':
+            # Vérification de l'existence des colonnes nécessaires
+            if 'niveau' not in df.columns or 'annee' not in df.columns:
+                return jsonify({"error": "Données de niveau ou d'année non disponibles"}), 400
+            
+            # Année de début (ex: "2021-2022" -> "2021"), calculée à part pour ne pas modifier l'instantané
+            annee_start = df['annee'].astype(object).map(
+                lambda annee: annee.split('-')[0] if isinstance(annee, str) else annee
+            ).rename('annee_start')
+            
+            # Grouper par année et niveau
+            evolution_data = df.groupby([annee_start, 'niveau'], observed=True).size().unstack(fill_value=0).reset_index()
+            evolution_data = evolution_data.sort_values('annee_start')
+            
+            annees = evolution_data['annee_start'].tolist()
+            spec = {
+                'type': 'line',
+                'series': [
+                    {'x': annees, 'y': evolution_data[col].tolist(), 'label': str(col)}
+                    for col in evolution_data.columns[1:]  # Ignorer la colonne annee_start
+                ],
+                'title': 'Évolution du nombre d\'étudiants par niveau et par année',
+                'xlabel': 'Année',
+                'ylabel': 'Nombre d\'étudiants',
+                'label_fontsize': 12,
+                'xtick_rotation': 45,
+                'legend_title': 'Niveau',
+                'grid': True
+            }
+            
+        else:
+            return jsonify({"error": "Type de graphique non reconnu"}), 400
+        
+        return jsonify({"image": chart_renderer.render(spec)}), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors de la génération du graphique: {str(e)}")
+        return jsonify({"error": f"Erreur lors de la génération du graphique: {str(e)}"}), 500
@@ -0,0 +1,31 @@
+"""
+Routes générales: santé de l'API et suivi des imports
+"""
+
+from flask import Blueprint, jsonify
+
+from extensions import import_jobs, token_required
+
+bp = Blueprint('general', __name__)
+
+@bp.route('/api/jobs/<job_id>', methods=['GET'])
+@token_required
+def get_import_job(current_user, job_id):
+    """Endpoint pour suivre l'avancement d'un import en tâche de fond"""
+    job = import_jobs.get(job_id)
+    # Un utilisateur ne suit que ses propres imports (l'administrateur les voit tous)
+    if not job or (job.get('created_by') != current_user['username'] and current_user['role'] != 'admin'):
+        return jsonify({"error": "Import introuvable"}), 404
+    
+    return jsonify(job), 200
+
+
+############################################################ Routes pour les templates (si nécessaire)
+@bp.route('/')
+def home():
+    return jsonify({"message": "API AppISIS - Backend opérationnel", "version": "1.0"})
+
+@bp.route('/api/test', methods=['GET'])
+def test_api():
+    """Endpoint de test pour vérifier que l'API est accessible"""
+    return jsonify({"message": "API accessible", "status": "ok"}), 200
@@ -0,0 +1,700 @@
+"""
+Routes des heures d'enseignement et des référentiels associés
+"""
+
+from datetime import datetime
+from pymongo import UpdateOne
+from flask import Blueprint, current_app, request, jsonify
+
+from config import *
+from extensions import (
+    heures_enseignement_collection, import_jobs, token_required, reponse_import_job
+)
+
+bp = Blueprint('heures_enseignement', __name__)
+
+@bp.route('/api/heures-enseignement/upload', methods=['POST'])
+@token_required
+def upload_heures_enseignement_file(current_user):
+    """Endpoint pour uploader un fichier Excel ou CSV des heures d'enseignement détaillées"""
+    # Vérification des permissions
+    user_role = current_user['role']
+    if 'upload' not in PERMISSIONS.get(user_role, []):
+        return jsonify({"error": "Permissions insuffisantes"}), 403
+    
+    if 'file' not in request.files:
+        return jsonify({"error": "Aucun fichier n'a été envoyé"}), 400
+    
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"error": "Aucun fichier n'a été sélectionné"}), 400
+    
+    if file and (file.filename.endswith('.csv') or file.filename.endswith('.xlsx')):
+        job_id = import_jobs.submit('heures_enseignement', traiter_import_heures_enseignement, file, {
+            'username': current_user['username'],
+            'filename': file.filename
+        })
+        return reponse_import_job(job_id)
+    
+    return jsonify({"error": "Format de fichier non pris en charge. Seuls les fichiers CSV et Excel sont acceptés."}), 400
+
+def traiter_import_heures_enseignement(chemin, params, progress):
+    """Traite en tâche de fond un fichier Excel ou CSV des heures d'enseignement détaillées"""
+    import pandas as pd
+    # Récupérer des paramètres supplémentaires depuis le nom du fichier
+    import re
+    annee_match = re.search(r'(20\d{2})[-_](20\d{2})', params['filename'])
+    if annee_match:
+        annee_debut = annee_match.group(1)
+        annee_fin = annee_match.group(2)
+    else:
+        # Valeurs par défaut
+        annee_debut = '2020'
+        annee_fin = '2021'
+        
+    annee_academique = f"{annee_debut}-{annee_fin}"
+    
+    # Lecture du fichier
+    if chemin.endswith('.csv'):
+        df = pd.read_csv(chemin)
+    else:  # Excel
+        df = pd.read_excel(chemin)
+    
+    # Vérification des colonnes requises
+    required_columns = ['code_ue', 'nom_matiere']
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    
+    if missing_columns:
+        return {
+            "error": f"Format du fichier non reconnu. Colonnes essentielles manquantes: {', '.join(missing_columns)}",
+            "success": False
+        }, 400
+    
+    records_to_insert = construire_ues_heures_enseignement(df, annee_academique, annee_debut, annee_fin)
+    current_app.logger.info(f"Heures d'enseignement {annee_academique}: {len(df)} lignes, {len(records_to_insert)} UE")
+    
+    # Upsert par lots sur la clé (année, niveau, semestre, code UE): réimporter
+    # le même fichier ne crée aucun doublon
+    counts = upsert_heures_enseignement(records_to_insert, params['username'], progress)
+    
+    return {
+        "message": (f"Données d'heures d'enseignement importées avec succès. "
+                    f"{counts['inserted']} UE ajoutées, {counts['updated']} mises à jour, "
+                    f"{counts['unchanged']} inchangées."),
+        "records_inserted": counts['inserted'],
+        "records_updated": counts['updated'],
+        "records_unchanged": counts['unchanged'],
+        "success": True
+    }, 200
+
+HEURES_ENSEIGNEMENT_COLONNES = ['cm_hm', 'cm_hp', 'cm_hr', 'td_hm', 'td_hp', 'td_hr', 'tp_hm', 'tp_hp', 'tp_hr']
+
+def construire_ues_heures_enseignement(df, annee_academique, annee_debut, annee_fin):
+    """Construit les documents UE/matières d'une maquette à partir d'opérations en colonnes"""
+    import pandas as pd
+    df = df.copy()
+    
+    # Niveau et semestre par défaut si les colonnes sont absentes
+    if 'niveau' not in df.columns:
+        df['niveau'] = 'FIE1'
+    if 'semestre' not in df.columns:
+        df['semestre'] = 'S1'
+    df = df.dropna(subset=['niveau', 'semestre'])
+    df['niveau'] = df['niveau'].astype(str).str.strip()
+    df['semestre'] = df['semestre'].astype(str).str.strip()
+    
+    # Conversion numérique en une seule passe: les valeurs non numériques valent 0
+    colonnes_numeriques = ['ects'] + HEURES_ENSEIGNEMENT_COLONNES
+    for col in colonnes_numeriques:
+        if col not in df.columns:
+            df[col] = 0
+    df[colonnes_numeriques] = df[colonnes_numeriques].apply(pd.to_numeric, errors='coerce').fillna(0).astype(float)
+    
+    df['intervenant'] = df['intervenant'].fillna('').astype(str) if 'intervenant' in df.columns else ''
+    df['nom_matiere'] = df['nom_matiere'].astype(str).str.strip().where(df['nom_matiere'].notna(), 'Sans nom')
+    
+    # Une ligne sans code_ue est une matière de la dernière UE rencontrée dans son niveau/semestre
+    df['code_ue'] = df['code_ue'].astype(str).str.strip().where(df['code_ue'].notna(), '').replace('', None)
+    df['code_ue'] = df.groupby(['niveau', 'semestre'])['code_ue'].ffill()
+    df = df[df['code_ue'].notna()]
+    
+    # Le nom de l'UE est celui de sa première ligne
+    cles = ['niveau', 'semestre', 'code_ue']
+    df['nom_ue'] = df.groupby(cles, sort=False)['nom_matiere'].transform('first')
+    noms = df['nom_matiere'].where(df['nom_matiere'] != df['nom_ue'], df['nom_matiere'] + ' (cours)')
+    
+    heures = {col: df[col].tolist() for col in HEURES_ENSEIGNEMENT_COLONNES}
+    matieres = [
+        {
+            "nom": nom,
+            "ects": ects,
+            "intervenant": intervenant,
+            "heures_cm": {"hm": cm_hm, "hp": cm_hp, "hr": cm_hr},
+            "heures_td": {"hm": td_hm, "hp": td_hp, "hr": td_hr},
+            "heures_tp": {"hm": tp_hm, "hp": tp_hp, "hr": tp_hr}
+        }
+        for nom, ects, intervenant, cm_hm, cm_hp, cm_hr, td_hm, td_hp, td_hr, tp_hm, tp_hp, tp_hr in zip(
+            noms.tolist(), df['ects'].tolist(), df['intervenant'].tolist(),
+            *(heures[col] for col in HEURES_ENSEIGNEMENT_COLONNES)
+        )
+    ]
+    
+    # Regroupement des matières par UE, dans l'ordre d'apparition
+    ues = {}
+    for cle, nom_ue, matiere in zip(zip(*(df[col].tolist() for col in cles)), df['nom_ue'].tolist(), matieres):
+        if cle not in ues:
+            ues[cle] = {"code": cle[2], "nom": nom_ue, "matieres": []}
+        ues[cle]["matieres"].append(matiere)
+    
+    return [
+        {
+            "annee_academique": annee_academique,
+            "annee_debut": int(annee_debut),
+            "annee_fin": int(annee_fin),
+            "niveau": niveau,
+            "semestre": semestre,
+            "unite_enseignement": ue
+        }
+        for (niveau, semestre, _), ue in ues.items()
+    ]
+
+def upsert_heures_enseignement(records, username, progress=None):
+    """Importe des UE par lots de UpdateOne(upsert=True) et renvoie les compteurs inserted/updated/unchanged"""
+    # Dédoublonnage sur la clé naturelle: la dernière occurrence du fichier l'emporte
+    par_cle = {}
+    for record in records:
+        cle = (record['annee_academique'], record['niveau'], record['semestre'], record['unite_enseignement']['code'])
+        par_cle[cle] = record
+    
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne(
+            {
+                "annee_academique": annee_academique,
+                "niveau": niveau,
+                "semestre": semestre,
+                "unite_enseignement.code": code
+            },
+            {
+                # Les métadonnées ne sont posées qu'à la création pour qu'un réimport
+                # identique ne modifie pas le document
+                "$set": record,
+                "$setOnInsert": {"uploaded_by": username, "uploaded_at": now}
+            },
+            upsert=True
+        )
+        for (annee_academique, niveau, semestre, code), record in par_cle.items()
+    ]
+    
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    if progress:
+        progress(0, len(operations))
+    for start in range(0, len(operations), HEURES_ENSEIGNEMENT_BULK_BATCH_SIZE):
+        batch = operations[start:start + HEURES_ENSEIGNEMENT_BULK_BATCH_SIZE]
+        result = heures_enseignement_collection.bulk_write(batch, ordered=False)
+        counts["inserted"] += result.upserted_count
+        counts["updated"] += result.modified_count
+        counts["unchanged"] += result.matched_count - result.modified_count
+        if progress:
+            progress(start + len(batch))
+    
+    return counts
+
+@bp.route('/api/heures-enseignement/form', methods=['POST'])
+@token_required
+def add_heures_enseignement_form(current_user):
+    """Endpoint pour ajouter des heures d'enseignement via formulaire"""
+    # Vérification des permissions
+    user_role = current_user['role']
+    if 'edit' not in PERMISSIONS.get(user_role, []):
+        return jsonify({"error": "Permissions insuffisantes"}), 403
+        
+    data = request.json
+    
+    # Validation des données
+    required_fields = ['annee_debut', 'annee_fin', 'niveau', 'semestre', 'unite_enseignement']
+    for field in required_fields:
+        if not data.get(field):
+            return jsonify({"error": f"Le champ {field} est requis"}), 400
+    
+    try:
+        # Préparation des données
+        annee_academique = f"{data['annee_debut']}-{data['annee_fin']}"
+        
+        # Préparer le document pour MongoDB
+        record = {
+            "annee_academique": annee_academique,
+            "annee_debut": int(data['annee_debut']),
+            "annee_fin": int(data['annee_fin']),
+            "niveau": data['niveau'],
+            "semestre": data['semestre'],
+            "unite_enseignement": data['unite_enseignement'],
+            "created_by": current_user['username'],
+            "created_at": datetime.utcnow()
+        }
+        
+        # Insérer ou mettre à jour les données
+        result = heures_enseignement_collection.update_one(
+            {
+                "annee_academique": annee_academique,
+                "niveau": data['niveau'],
+                "semestre": data['semestre'],
+                "unite_enseignement.code": data['unite_enseignement']['code']
+            },
+            {"$set": record},
+            upsert=True
+        )
+        
+        if result.upserted_id:
+            message = "Nouvelles données d'heures d'enseignement ajoutées avec succès"
+        else:
+            message = "Données d'heures d'enseignement mises à jour avec succès"
+            
+        return jsonify({"message": message, "success": True}), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de l'ajout des données: {str(e)}"}), 500
+
+@bp.route('/api/heures-enseignement', methods=['GET'])
+@token_required
+def get_heures_enseignement(current_user):
+    """Endpoint pour récupérer les données d'heures d'enseignement"""
+    try:
+        # Paramètres de filtrage
+        annee_debut = request.args.get('annee_debut')
+        annee_fin = request.args.get('annee_fin')
+        niveau = request.args.get('niveau')
+        semestre = request.args.get('semestre')
+        intervenant = request.args.get('intervenant')
+        
+        # Construire le filtre en fonction des paramètres fournis
+        filter_query = {}
+        
+        if annee_debut and annee_fin:
+            filter_query["annee_academique"] = f"{annee_debut}-{annee_fin}"
+        elif annee_debut:
+            filter_query["annee_debut"] = int(annee_debut)
+        
+        if niveau:
+            filter_query["niveau"] = niveau
+            
+        if semestre:
+            filter_query["semestre"] = semestre
+
+        if intervenant:
+            # Cette partie est délicate car nous devons filtrer à l'intérieur d'un tableau
+            filter_query["unite_enseignement.matieres.intervenant"] = intervenant
+        # Récupérer les données
+        data = list(heures_enseignement_collection.find(filter_query, {'_id': 0}))
+        
+        return jsonify(data), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la récupération des données: {str(e)}"}), 500
+
+@bp.route('/api/heures-enseignement/stats', methods=['GET'])
+@token_required
+def get_heures_enseignement_stats(current_user):
+    """Endpoint pour récupérer les statistiques des heures d'enseignement"""
+    try:
+        # Paramètres de filtrage
+        annee_debut = request.args.get('annee_debut')
+        annee_fin = request.args.get('annee_fin')
+        niveau = request.args.get('niveau')
+        intervenant = request.args.get('intervenant')
+        # Construire le filtre en fonction des paramètres fournis
+        filter_query = {}
+        
+        if annee_debut and annee_fin:
+            filter_query["annee_academique"] = f"{annee_debut}-{annee_fin}"
+        elif annee_debut:
+            filter_query["annee_debut"] = int(annee_debut)
+        
+        if niveau:
+            filter_query["niveau"] = niveau
+
+        if intervenant:
+            # Cette partie est délicate car nous devons filtrer à l'intérieur d'un tableau
+            filter_query["unite_enseignement.matieres.intervenant"] = intervenant
+        # Récupérer les données
+        data = list(heures_enseignement_collection.find(filter_query, {'_id': 0}))
+        
+        if not data:
+            return jsonify({"error": "Aucune donnée trouvée"}), 404
+        
+        # Calculer les statistiques
+        total_ue = 0
+        total_matieres = 0
+        total_heures = {
+            "cm": {"hm": 0, "hp": 0, "hr": 0},
+            "td": {"hm": 0, "hp": 0, "hr": 0},
+            "tp": {"hm": 0, "hp": 0, "hr": 0}
+        }
+        
+        intervenants = set()
+        
+        for record in data:
+            # Compter les UE
+            total_ue += 1
+            
+            # Parcourir les matières
+            for matiere in record["unite_enseignement"]["matieres"]:
+                total_matieres += 1
+                
+                # Ajouter l'intervenant
+                if matiere.get("intervenant"):
+                    intervenants.add(matiere["intervenant"])
+                
+                # Ajouter les heures
+                for type_heures in ["cm", "td", "tp"]:
+                    heures_key = f"heures_{type_heures}"
+                    if heures_key in matiere:
+                        for mesure in ["hm", "hp", "hr"]:
+                            total_heures[type_heures][mesure] += matiere[heures_key].get(mesure, 0)
+        
+        # Préparer la réponse
+        stats = {
+            "nombre_ue": total_ue,
+            "nombre_matieres": total_matieres,
+            "nombre_intervenants": len(intervenants),
+            "heures_totales": {
+                "cm": {
+                    "hm": round(total_heures["cm"]["hm"], 2),
+                    "hp": round(total_heures["cm"]["hp"], 2),
+                    "hr": round(total_heures["cm"]["hr"], 2)
+                },
+                "td": {
+                    "hm": round(total_heures["td"]["hm"], 2),
+                    "hp": round(total_heures["td"]["hp"], 2),
+                    "hr": round(total_heures["td"]["hr"], 2)
+                },
+                "tp": {
+                    "hm": round(total_heures["tp"]["hm"], 2),
+                    "hp": round(total_heures["tp"]["hp"], 2),
+                    "hr": round(total_heures["tp"]["hr"], 2)
+                }
+            },
+            "total_global": {
+                "hm": round(
+                    total_heures["cm"]["hm"] + 
+                    total_heures["td"]["hm"] + 
+                    total_heures["tp"]["hm"], 2
+                ),
+                "hp": round(
+                    total_heures["cm"]["hp"] + 
+                    total_heures["td"]["hp"] + 
+                    total_heures["tp"]["hp"], 2
+                ),
+                "hr": round(
+                    total_heures["cm"]["hr"] + 
+                    total_heures["td"]["hr"] + 
+                    total_heures["tp"]["hr"], 2
+                )
+            },
+            "filtres_appliques": {
+                "annee_academique": f"{annee_debut}-{annee_fin}" if annee_debut and annee_fin else "Toutes",
+                "niveau": niveau if niveau else "Tous"
+            }
+        }
+        
+        return jsonify(stats), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors du calcul des statistiques: {str(e)}"}), 500
+
+@bp.route('/api/heures-enseignement/delete', methods=['DELETE'])
+@token_required
+def delete_heures_enseignement(current_user):
+    """Endpoint pour supprimer des données d'heures d'enseignement"""
+    # Vérification des permissions
+    user_role = current_user['role']
+    if 'delete' not in PERMISSIONS.get(user_role, []):
+        return jsonify({"error": "Permissions insuffisantes"}), 403
+    
+    # Paramètres de suppression
+    data = request.json
+    
+    if not data or not data.get('annee_academique') or not data.get('niveau') or not data.get('semestre'):
+        return jsonify({"error": "Paramètres de suppression incomplets"}), 400
+    
+    try:
+        # Critères de suppression
+        delete_query = {
+            "annee_academique": data['annee_academique'],
+            "niveau": data['niveau'],
+            "semestre": data['semestre']
+        }
+        
+        # Si un code d'UE est spécifié, supprimer uniquement cette UE
+        if data.get('code_ue'):
+            delete_query["unite_enseignement.code"] = data['code_ue']
+        
+        # Supprimer les données
+        result = heures_enseignement_collection.delete_many(delete_query)
+        
+        if result.deleted_count > 0:
+            return jsonify({
+                "message": f"{result.deleted_count} enregistrements supprimés avec succès",
+                "success": True
+            }), 200
+        else:
+            return jsonify({"error": "Aucune donnée trouvée correspondant aux critères"}), 404
+            
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la suppression: {str(e)}"}), 500
+
+# Routes pour les listes déroulantes (références)
+@bp.route('/api/references/annees-academiques', methods=['GET'])
+@token_required
+def get_annees_academiques(current_user):
+    """Récupérer la liste des années académiques disponibles"""
+    try:
+        # Exécuter une agrégation pour obtenir les années uniques
+        pipeline = [
+            {"$group": {"_id": "$annee_academique"}},
+            {"$sort": {"_id": 1}}
+        ]
+        
+        result = list(heures_enseignement_collection.aggregate(pipeline))
+        
+        annees = [item["_id"] for item in result]
+        
+        # Ajouter les années prédéfinies si elles ne sont pas déjà présentes
+        annees_predefinies = ["2020-2021", "2024-2025"]
+        for annee in annees_predefinies:
+            if annee not in annees:
+                annees.append(annee)
+        
+        annees.sort()
+        
+        return jsonify(annees), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la récupération des années: {str(e)}"}), 500
+
+@bp.route('/api/references/niveaux', methods=['GET'])
+@token_required
+def get_niveaux(current_user):
+    """Récupérer la liste des niveaux disponibles"""
+    try:
+        # Exécuter une agrégation pour obtenir les niveaux uniques
+        pipeline = [
+            {"$group": {"_id": "$niveau"}},
+            {"$sort": {"_id": 1}}
+        ]
+        
+        result = list(heures_enseignement_collection.aggregate(pipeline))
+        
+        niveaux = [item["_id"] for item in result]
+        
+        # Ajouter les niveaux prédéfinis s'ils ne sont pas déjà présents
+        niveaux_predefinis = ["FIE1", "FIE2", "FIE3", "FIE4", "FIE5", "FIA3", "FIA5"]
+        for niveau in niveaux_predefinis:
+            if niveau not in niveaux:
+                niveaux.append(niveau)
+        
+        niveaux.sort()
+        
+        return jsonify(niveaux), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la récupération des niveaux: {str(e)}"}), 500
+
+@bp.route('/api/heures-enseignement/graph-data', methods=['GET'])
+@token_required
+def get_heures_enseignement_graph_data(current_user):
+    """Endpoint pour récupérer les données formatées pour les graphiques"""
+    try:
+        # Paramètres de filtrage
+        annee_debut = request.args.get('annee_debut')
+        annee_fin = request.args.get('annee_fin')
+        niveau = request.args.get('niveau')
+        semestre = request.args.get('semestre')
+        intervenant = request.args.get('intervenant')
+        # Construire le filtre en fonction des paramètres fournis
+        filter_query = {}
+        
+        if annee_debut and annee_fin:
+            filter_query["annee_academique"] = f"{annee_debut}-{annee_fin}"
+        elif annee_debut:
+            filter_query["annee_debut"] = int(annee_debut)
+        
+        if niveau:
+            filter_query["niveau"] = niveau
+            
+        if semestre:
+            filter_query["semestre"] = semestre
+            
+        if intervenant:
+            # Cette partie est délicate car nous devons filtrer à l'intérieur d'un tableau
+            filter_query["unite_enseignement.matieres.intervenant"] = intervenant
+        # Récupérer les données
+        data = list(heures_enseignement_collection.find(filter_query, {'_id': 0}))
+        
+        if not data:
+            return jsonify({"error": "Aucune donnée trouvée avec ces filtres"}), 404
+        
+        # Préparation des données pour les graphiques
+        graph_data = {
+            "pie_chart": prepare_pie_chart_data(data),
+            "line_chart": prepare_line_chart_data(data),
+            "bar_chart_niveau": prepare_bar_chart_niveau_data(data),
+            "bar_chart_semestre": prepare_bar_chart_semestre_data(data)
+        }
+        
+        return jsonify(graph_data), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la récupération des données: {str(e)}"}), 500
+
+def prepare_pie_chart_data(data):
+    """Prépare les données pour le graphique camembert des types d'heures"""
+    total_cm = 0
+    total_td = 0
+    total_tp = 0
+    
+    for record in data:
+        ue = record.get('unite_enseignement', {})
+        for matiere in ue.get('matieres', []):
+            # Additionner les heures maquette (hm) de chaque type
+            total_cm += matiere.get('heures_cm', {}).get('hm', 0)
+            total_td += matiere.get('heures_td', {}).get('hm', 0)
+            total_tp += matiere.get('heures_tp', {}).get('hm', 0)
+    
+    return {
+        "labels": ["CM", "TD", "TP"],
+        "data": [total_cm, total_td, total_tp]
+    }
+
+def prepare_line_chart_data(data):
+    """Prépare les données pour le graphique d'évolution des heures par année"""
+    # Regrouper les données par année académique
+    annees = {}
+    
+    for record in data:
+        annee = record.get('annee_academique')
+        if not annee in annees:
+            annees[annee] = {'cm': 0, 'td': 0, 'tp': 0}
+        
+        ue = record.get('unite_enseignement', {})
+        for matiere in ue.get('matieres', []):
+            annees[annee]['cm'] += matiere.get('heures_cm', {}).get('hm', 0)
+            annees[annee]['td'] += matiere.get('heures_td', {}).get('hm', 0)
+            annees[annee]['tp'] += matiere.get('heures_tp', {}).get('hm', 0)
+    
+    # Trier les années
+    sorted_annees = sorted(annees.keys())
+    
+    return {
+        "labels": sorted_annees,
+        "datasets": [
+            {
+                "label": "CM",
+                "data": [annees[annee]['cm'] for annee in sorted_annees]
+            },
+            {
+                "label": "TD",
+                "data": [annees[annee]['td'] for annee in sorted_annees]
+            },
+            {
+                "label": "TP",
+                "data": [annees[annee]['tp'] for annee in sorted_annees]
+            }
+        ]
+    }
+
+def prepare_bar_chart_niveau_data(data):
+    """Prépare les données pour le graphique à barres des heures par niveau"""
+    # Regrouper les données par niveau
+    niveaux = {}
+    
+    for record in data:
+        niveau = record.get('niveau')
+        if not niveau in niveaux:
+            niveaux[niveau] = {'cm': 0, 'td': 0, 'tp': 0}
+        
+        ue = record.get('unite_enseignement', {})
+        for matiere in ue.get('matieres', []):
+            niveaux[niveau]['cm'] += matiere.get('heures_cm', {}).get('hm', 0)
+            niveaux[niveau]['td'] += matiere.get('heures_td', {}).get('hm', 0)
+            niveaux[niveau]['tp'] += matiere.get('heures_tp', {}).get('hm', 0)
+    
+    # Obtenir la liste des niveaux
+    niveau_labels = list(niveaux.keys())
+    
+    return {
+        "labels": niveau_labels,
+        "datasets": [
+            {
+                "label": "CM",
+                "data": [niveaux[niveau]['cm'] for niveau in niveau_labels]
+            },
+            {
+                "label": "TD",
+                "data": [niveaux[niveau]['td'] for niveau in niveau_labels]
+            },
+            {
+                "label": "TP",
+                "data": [niveaux[niveau]['tp'] for niveau in niveau_labels]
+            }
+        ]
+    }
+
+def prepare_bar_chart_semestre_data(data):
+    """Prépare les données pour le graphique à barres des heures par semestre"""
+    # Regrouper les données par semestre
+    semestres = {}
+    
+    for record in data:
+        semestre = record.get('semestre')
+        if not semestre in semestres:
+            semestres[semestre] = {'cm': 0, 'td': 0, 'tp': 0}
+        
+        ue = record.get('unite_enseignement', {})
+        for matiere in ue.get('matieres', []):
+            semestres[semestre]['cm'] += matiere.get('heures_cm', {}).get('hm', 0)
+            semestres[semestre]['td'] += matiere.get('heures_td', {}).get('hm', 0)
+            semestres[semestre]['tp'] += matiere.get('heures_tp', {}).get('hm', 0)
+    
+    # Trier les semestres
+    semestre_labels = sorted(semestres.keys())
+    
+    return {
+        "labels": semestre_labels,
+        "datasets": [
+            {
+                "label": "CM",
+                "data": [semestres[semestre]['cm'] for semestre in semestre_labels]
+            },
+            {
+                "label": "TD",
+                "data": [semestres[semestre]['td'] for semestre in semestre_labels]
+            },
+            {
+                "label": "TP",
+                "data": [semestres[semestre]['tp'] for semestre in semestre_labels]
+            }
+        ]
+    }
+
+@bp.route('/api/references/intervenants', methods=['GET'])
+@token_required
+def get_intervenants(current_user):
+    """Récupérer la liste des intervenants disponibles"""
+    try:
+        # Utiliser une agrégation MongoDB pour extraire tous les intervenants uniques
+        pipeline = [
+            {"$unwind": "$unite_enseignement.matieres"},  # Décomposer le tableau des matières
+            {"$group": {"_id": "$unite_enseignement.matieres.intervenant"}},  # Grouper par intervenant
+            {"$match": {"_id": {"$ne": ""}}},  # Exclure les valeurs vides
+            {"$sort": {"_id": 1}}  # Trier par ordre alphabétique
+        ]
+        
+        result = list(heures_enseignement_collection.aggregate(pipeline))
+        
+        intervenants = [item["_id"] for item in result if item["_id"]]
+        
+        return jsonify(intervenants), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la récupération des intervenants: {str(e)}"}), 500
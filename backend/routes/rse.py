@@ -0,0 +1,801 @@
+"""
+Routes RSE (Responsabilité Sociétale des Entreprises)
+"""
+
+import math
+from datetime import datetime
+from pymongo import ReturnDocument
+from flask import Blueprint, request, jsonify
+
+from config import *
+from extensions import (
+    rse_collection, rse_stats_collection, bump_collection_version, chart_renderer, import_jobs,
+    snapshots, cached_chart, token_required, wants_ndjson, ndjson_response, reponse_import_job
+)
+from rse_stats import CHAMPS_HEURES, appliquer_variations_rse, agreger_rse_stats, inserer_rse, normaliser_heures
+
+bp = Blueprint('rse', __name__)
+
+@bp.route('/api/rse/stats', methods=['GET'])
+@token_required
+def get_rse_stats(current_user):
+    """Endpoint pour récupérer les statistiques RSE
+
+    Paramètres optionnels:
+    - include=rows : ajoute une page des lignes RSE (donnees_par_element) et la pagination
+    - page / per_page : page demandée avec include=rows (per_page plafonné à RSE_ROWS_MAX_PER_PAGE)
+    """
+    try:
+        include = [valeur.strip() for valeur in request.args.get('include', '').split(',') if valeur.strip()]
+        
+        # Lecture du résumé matérialisé (rse_stats), indépendante de la taille des données RSE
+        resume = agreger_rse_stats(rse_stats_collection)
+        
+        if not resume:
+            return jsonify({"error": "Aucune donnée RSE trouvée"}), 404
+        
+        promotion_stats = resume['par_promotion']
+        type_activite_stats = resume['par_type']
+        evolution_stats = {str(annee): stats for annee, stats in resume['par_annee'].items()}
+        
+        # Calcul des totaux globaux
+        total_heures_cm = resume['heures_cm']
+        total_heures_td = resume['heures_td']
+        total_heures_tp = resume['heures_tp']
+        total_heures_rse = total_heures_cm + total_heures_td + total_heures_tp
+        
+        # Calcul des pourcentages pour les graphiques
+        format_cours_pourcentage = {
+            'CM': round(total_heures_cm / total_heures_rse * 100 if total_heures_rse > 0 else 0, 1),
+            'TD': round(total_heures_td / total_heures_rse * 100 if total_heures_rse > 0 else 0, 1),
+            'TP': round(total_heures_tp / total_heures_rse * 100 if total_heures_rse > 0 else 0, 1)
+        }
+        
+        # Préparation des données pour les graphiques
+        graphiques = {
+            'promotions': {
+                'labels': list(promotion_stats.keys()),
+                'values': [promotion_stats[p]['total_heures'] for p in promotion_stats]
+            },
+            'evolution': {
+                'labels': list(evolution_stats.keys()),
+                'values': [evolution_stats[a]['total_heures'] for a in evolution_stats]
+            },
+            'type_activite': {
+                'labels': list(type_activite_stats.keys()),
+                'values': [type_activite_stats[t]['total_heures'] for t in type_activite_stats]
+            },
+            'format_cours': {
+                'labels': ['CM', 'TD', 'TP'],
+                'values': [total_heures_cm, total_heures_td, total_heures_tp]
+            }
+        }
+        
+        # Construire la réponse avec toutes les statistiques
+        stats = {
+            "total_heures_rse": total_heures_rse,
+            "total_activites": resume['nombre_activites'],
+            "promotions_impliquees": len(promotion_stats),
+            "etudiants_impliques": 342,  # Valeur simulée - à calculer selon votre logique
+            "repartition_par_promotion": promotion_stats,
+            "repartition_par_type": type_activite_stats,
+            "evolution_annuelle": evolution_stats,
+            "annees_disponibles": list(resume['par_annee'].keys()),
+            "promotions_disponibles": list(promotion_stats.keys()),
+            "format_cours_pourcentage": format_cours_pourcentage,
+            "graphiques": graphiques
+        }
+        
+        # Les lignes détaillées ne sont renvoyées que sur demande, par page
+        if 'rows' in include:
+            try:
+                page = max(int(request.args.get('page', 1)), 1)
+                per_page = int(request.args.get('per_page', RSE_ROWS_DEFAULT_PER_PAGE))
+            except ValueError:
+                return jsonify({"error": "Paramètres de pagination invalides"}), 400
+            per_page = min(max(per_page, 1), RSE_ROWS_MAX_PER_PAGE)
+            
+            total = rse_collection.count_documents({})
+            # Même ordre que /api/rse/data, avec _id pour une pagination stable
+            cursor = rse_collection.find({}, {'_id': 0}) \
+                .sort([('annee', -1), ('_id', 1)]) \
+                .skip((page - 1) * per_page) \
+                .limit(per_page)
+            
+            stats["donnees_par_element"] = list(cursor)
+            stats["pagination"] = {
+                "page": page,
+                "per_page": per_page,
+                "total": total,
+                "pages": math.ceil(total / per_page)
+            }
+        
+        return jsonify(stats), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors du calcul des statistiques RSE: {str(e)}"}), 500
+
+def filtre_rse_depuis_requete():
+    """Construit le filtre MongoDB des données RSE à partir des paramètres de la requête"""
+    annee = request.args.get('annee')
+    promotion = request.args.get('promotion')
+    semestre = request.args.get('semestre')
+    type_activite = request.args.get('type_activite')
+    
+    filter_query = {}
+    
+    if annee:
+        filter_query["annee"] = int(annee)
+        
+    if promotion:
+        filter_query["promotion"] = promotion
+        
+    if semestre:
+        filter_query["semestre"] = semestre
+        
+    if type_activite:
+        filter_query["type_activite"] = type_activite
+    
+    return filter_query
+
+@bp.route('/api/rse/data', methods=['GET'])
+@token_required
+def get_rse_data(current_user):
+    """Endpoint pour récupérer toutes les données RSE"""
+    try:
+        # Construire le filtre en fonction des paramètres fournis
+        filter_query = filtre_rse_depuis_requete()
+        
+        # Récupérer les données avec tri par année décroissante
+        cursor = rse_collection.find(filter_query, {'_id': 0}).sort('annee', -1)
+        
+        if wants_ndjson():
+            return ndjson_response(cursor)
+        
+        data = list(cursor)
+        
+        return jsonify(data), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la récupération des données RSE: {str(e)}"}), 500
+
+@bp.route('/api/rse/item/<string:rse_id>', methods=['GET'])
+@token_required
+def get_rse_item(current_user, rse_id):
+    """Endpoint pour récupérer un élément RSE par son identifiant"""
+    item = rse_collection.find_one({"id": rse_id}, {'_id': 0})
+    if not item:
+        return jsonify({"error": f"Aucun élément RSE trouvé avec l'ID {rse_id}"}), 404
+    return jsonify(item), 200
+
+# Heures complémentaires présentes dans certains imports RSE
+HEURES_SUPPLEMENTAIRES_RSE = ['heure1', 'heure2', 'heure3', 'heure4']
+
+def somme_heures_rse(*champs):
+    """Expression d'agrégation: somme des champs d'heures
+
+    Comme rse_stats._nombre, une valeur absente, nulle ou non numérique compte 0;
+    les chaînes numériques des anciens imports sont converties.
+    """
+    return {"$add": [
+        {"$convert": {"input": f"${champ}", "to": "double", "onError": 0, "onNull": 0}}
+        for champ in champs
+    ]}
+
+@bp.route('/api/rse/dashboard', methods=['GET'])
+@token_required
+def get_rse_dashboard(current_user):
+    """Endpoint pour les séries du tableau de bord RSE, calculées en une seule agrégation
+
+    Paramètres optionnels (mêmes filtres que /api/rse/data): annee, promotion, semestre, type_activite
+    """
+    try:
+        filter_query = filtre_rse_depuis_requete()
+    except ValueError:
+        return jsonify({"error": "Paramètre annee invalide"}), 400
+    
+    try:
+        totaux = {
+            "_id": None,
+            "heures_cm": {"$sum": somme_heures_rse('heures_cm')},
+            "heures_td": {"$sum": somme_heures_rse('heures_td')},
+            "heures_tp": {"$sum": somme_heures_rse('heures_tp')}
+        }
+        for champ in HEURES_SUPPLEMENTAIRES_RSE:
+            totaux[champ] = {"$sum": somme_heures_rse(champ)}
+            totaux[f"{champ}_present"] = {"$max": {"$cond": [{"$gt": [f"${champ}", None]}, 1, 0]}}
+        
+        pipeline = [
+            {"$match": filter_query},
+            {"$facet": {
+                "totaux": [{"$group": totaux}],
+                "par_annee": [
+                    {"$match": {"annee": {"$nin": [None, "", 0]}}},
+                    {"$group": {
+                        "_id": "$annee",
+                        "cm": {"$sum": somme_heures_rse('heures_cm')},
+                        "td": {"$sum": somme_heures_rse('heures_td')},
+                        "tp": {"$sum": somme_heures_rse('heures_tp')}
+                    }},
+                    {"$sort": {"_id": 1}}
+                ],
+                "par_type": [
+                    {"$group": {
+                        "_id": {"$ifNull": ["$type_activite", "Non spécifié"]},
+                        "total_heures": {"$sum": somme_heures_rse('heures_cm', 'heures_td', 'heures_tp')}
+                    }},
+                    {"$sort": {"total_heures": -1}}
+                ],
+                "par_promotion": [
+                    {"$match": {"promotion": {"$nin": [None, ""]}}},
+                    {"$group": {
+                        "_id": "$promotion",
+                        "total_heures": {"$sum": somme_heures_rse('heures_cm', 'heures_td', 'heures_tp', *HEURES_SUPPLEMENTAIRES_RSE)}
+                    }},
+                    {"$sort": {"_id": 1}}
+                ]
+            }}
+        ]
+        resultat = next(rse_collection.aggregate(pipeline))
+        
+        totaux = resultat["totaux"][0] if resultat["totaux"] else {}
+        total_cm = int(totaux.get("heures_cm", 0))
+        total_td = int(totaux.get("heures_td", 0))
+        total_tp = int(totaux.get("heures_tp", 0))
+        total = total_cm + total_td + total_tp
+        
+        heures = {"heures_cm": total_cm, "heures_td": total_td, "heures_tp": total_tp}
+        for champ in HEURES_SUPPLEMENTAIRES_RSE:
+            if totaux.get(f"{champ}_present"):
+                heures[champ] = int(totaux[champ])
+        
+        return jsonify({
+            "heures": heures,
+            "format_cours": {
+                "total_cm": total_cm,
+                "total_td": total_td,
+                "total_tp": total_tp,
+                "percent_cm": round(total_cm / total * 100, 1) if total > 0 else 0,
+                "percent_td": round(total_td / total * 100, 1) if total > 0 else 0,
+                "percent_tp": round(total_tp / total * 100, 1) if total > 0 else 0
+            },
+            "evolution": [
+                {
+                    "annee": item["_id"],
+                    "cm": int(item["cm"]),
+                    "td": int(item["td"]),
+                    "tp": int(item["tp"]),
+                    "total": int(item["cm"] + item["td"] + item["tp"])
+                }
+                for item in resultat["par_annee"]
+            ],
+            "types": [
+                {"type_activite": item["_id"], "total_heures": int(item["total_heures"])}
+                for item in resultat["par_type"]
+            ],
+            "promotions": [
+                {"promotion": item["_id"], "total_heures": int(item["total_heures"])}
+                for item in resultat["par_promotion"]
+            ],
+            "promotions_disponibles": [item["_id"] for item in resultat["par_promotion"]]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors du calcul du tableau de bord RSE: {str(e)}"}), 500
+
+@bp.route('/api/rse/add', methods=['POST'])
+@token_required
+def add_rse_data(current_user):
+    """Endpoint pour ajouter/modifier des données RSE"""
+    # Vérification des permissions
+    user_role = current_user['role']
+    if 'edit' not in PERMISSIONS.get(user_role, []):
+        return jsonify({"error": "Permissions insuffisantes"}), 403
+        
+    data = request.json
+    
+    if not data:
+        return jsonify({"error": "Données manquantes"}), 400
+    
+    # Validation des champs obligatoires
+    required_fields = ['annee', 'promotion', 'semestre', 'type_activite', 'heures_cm', 'heures_td', 'heures_tp']
+    for field in required_fields:
+        if field not in data:
+            return jsonify({"error": f"Le champ {field} est requis"}), 400
+    
+    try:
+        # Vérifier le type d'activité
+        activites_valides = [
+            "Transition écologique et numérique",
+            "Responsabilité sociale et environnementale de l'ingénieur",
+            "Anthropocène",
+            "Numérique responsable",
+            "Enjeux socio environnementaux"
+        ]
+        
+        # Le type d'activité est maintenant un champ libre ou sélectionné dans une liste
+        # Pas besoin de validation stricte ici
+        
+        # Conversion des types
+        data['annee'] = int(data['annee'])
+        data['heures_cm'] = int(data['heures_cm'])
+        data['heures_td'] = int(data['heures_td'])
+        data['heures_tp'] = int(data['heures_tp'])
+        
+        # Calcul du total
+        data['total_heures'] = data['heures_cm'] + data['heures_td'] + data['heures_tp']
+        
+        # Ajout de métadonnées
+        data['created_by'] = current_user['username']
+        data['created_at'] = datetime.utcnow()
+        data['updated_by'] = current_user['username']
+        data['updated_at'] = datetime.utcnow()
+        
+        # Vérifier si c'est une mise à jour ou un ajout
+        if 'id' in data and data['id']:
+            # Mise à jour
+            query = {"id": data['id']}
+            data['updated_at'] = datetime.utcnow()
+            ancien = rse_collection.find_one_and_update(
+                query, {"$set": data}, upsert=True, return_document=ReturnDocument.BEFORE
+            )
+            appliquer_variations_rse(rse_stats_collection, ajouts=[{**(ancien or {}), **data}], retraits=[ancien])
+            message = "Données RSE mises à jour avec succès"
+        else:
+            # Nouvel ajout - générer un ID unique
+            data['id'] = f"rse_{int(datetime.utcnow().timestamp())}"
+            rse_collection.insert_one(data)
+            appliquer_variations_rse(rse_stats_collection, ajouts=[data])
+            message = "Nouvelles données RSE ajoutées avec succès"
+        
+        bump_collection_version(MONGO_COLLECTION_RSE)
+            
+        return jsonify({"message": message, "success": True}), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de l'ajout des données RSE: {str(e)}"}), 500
+
+@bp.route('/api/rse/update', methods=['POST'])
+@token_required
+def update_rse_data(current_user):
+    """Endpoint pour mettre à jour des données RSE"""
+    # Vérification des permissions
+    user_role = current_user['role']
+    if 'edit' not in PERMISSIONS.get(user_role, []):
+        return jsonify({"error": "Permissions insuffisantes"}), 403
+        
+    data = request.json
+    
+    if not data or 'id' not in data:
+        return jsonify({"error": "ID manquant pour la mise à jour"}), 400
+    
+    try:
+        # Conversion des types si nécessaire
+        if 'heures_cm' in data:
+            data['heures_cm'] = int(data['heures_cm'])
+        if 'heures_td' in data:
+            data['heures_td'] = int(data['heures_td'])
+        if 'heures_tp' in data:
+            data['heures_tp'] = int(data['heures_tp'])
+        
+        # Recalculer le total si les heures ont changé
+        if any(field in data for field in ['heures_cm', 'heures_td', 'heures_tp']):
+            existing_data = rse_collection.find_one({"id": data['id']})
+            if existing_data:
+                data['total_heures'] = (
+                    data.get('heures_cm', existing_data.get('heures_cm', 0)) +
+                    data.get('heures_td', existing_data.get('heures_td', 0)) +
+                    data.get('heures_tp', existing_data.get('heures_tp', 0))
+                )
+        
+        # Ajout de métadonnées de mise à jour
+        data['updated_by'] = current_user['username']
+        data['updated_at'] = datetime.utcnow()
+        
+        # Mise à jour
+        ancien = rse_collection.find_one_and_update(
+            {"id": data['id']}, 
+            {"$set": data},
+            return_document=ReturnDocument.BEFORE
+        )
+        
+        if ancien is None:
+            return jsonify({"error": "Aucune donnée trouvée avec cet ID"}), 404
+        
+        appliquer_variations_rse(rse_stats_collection, ajouts=[{**ancien, **data}], retraits=[ancien])
+        bump_collection_version(MONGO_COLLECTION_RSE)
+            
+        return jsonify({"message": "Données RSE mises à jour avec succès", "success": True}), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la mise à jour des données RSE: {str(e)}"}), 500
+
+@bp.route('/api/rse/delete/<string:rse_id>', methods=['DELETE'])
+@token_required
+def delete_rse_data(current_user, rse_id):
+    """Endpoint pour supprimer des données RSE"""
+    # Vérification des permissions
+    user_role = current_user['role']
+    if 'delete' not in PERMISSIONS.get(user_role, []):
+        return jsonify({"error": "Permissions insuffisantes"}), 403
+        
+    try:
+        # Suppression des données
+        supprime = rse_collection.find_one_and_delete({"id": rse_id})
+        
+        if supprime is None:
+            return jsonify({"error": f"Aucune donnée RSE trouvée avec l'ID {rse_id}"}), 404
+        
+        appliquer_variations_rse(rse_stats_collection, retraits=[supprime])
+        bump_collection_version(MONGO_COLLECTION_RSE)
+            
+        return jsonify({"message": "Données RSE supprimées avec succès", "success": True}), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la suppression des données RSE: {str(e)}"}), 500
+
+@bp.route('/api/rse/upload', methods=['POST'])
+@token_required
+def upload_rse_csv(current_user):
+    """Endpoint pour uploader des données RSE (supporte CSV et JSON)"""
+    # Vérification des permissions
+    user_role = current_user['role']
+    if 'upload' not in PERMISSIONS.get(user_role, []):
+        return jsonify({"error": "Permissions insuffisantes"}), 403
+    
+    # Vérifier s'il s'agit d'une requête JSON (bulk_add)
+    if request.is_json:
+        data = request.get_json()
+        
+        if not data or 'data' not in data:
+            return jsonify({"error": "Données manquantes ou format incorrect"}), 400
+        
+        records = data['data']
+        
+        if not records or not isinstance(records, list):
+            return jsonify({"error": "Format de données invalide - tableau attendu"}), 400
+        
+        try:
+            # Traitement des enregistrements
+            for i, record in enumerate(records):
+                # Ajout d'un ID unique s'il n'existe pas
+                if 'id' not in record:
+                    record['id'] = f"rse_{int(datetime.utcnow().timestamp())}_{i}"
+                
+                # Métadonnées
+                record['uploaded_by'] = current_user['username']
+                record['uploaded_at'] = datetime.utcnow()
+                record['created_by'] = current_user['username']
+                record['created_at'] = datetime.utcnow()
+                record['updated_by'] = current_user['username']
+                record['updated_at'] = datetime.utcnow()
+                
+                # S'assurer que les champs numériques sont des nombres
+                record['annee'] = int(record.get('annee', datetime.utcnow().year))
+                record['heures_cm'] = int(record.get('heures_cm', 0))
+                record['heures_td'] = int(record.get('heures_td', 0))
+                record['heures_tp'] = int(record.get('heures_tp', 0))
+                
+                # Traitement des champs supplémentaires (heure1, heure2, heure3, heure4)
+                for hour_field in ['heure1', 'heure2', 'heure3', 'heure4']:
+                    if hour_field in record:
+                        record[hour_field] = int(record.get(hour_field, 0))
+                
+                # Recalculer le total des heures si nécessaire
+                record['total_heures'] = record['heures_cm'] + record['heures_td'] + record['heures_tp']
+            
+            # Insertion dans la base de données
+            try:
+                inserted = inserer_rse(rse_collection, rse_stats_collection, records)
+            finally:
+                # Une partie des documents a pu être écrite même si l'insertion a échoué
+                bump_collection_version(MONGO_COLLECTION_RSE, insertion_seule=True)
+            
+            return jsonify({
+                "message": "Données RSE ajoutées avec succès",
+                "records_inserted": inserted,
+                "success": True
+            }), 200
+            
+        except Exception as e:
+            return jsonify({"error": f"Erreur lors de l'ajout des données RSE: {str(e)}"}), 500
+    
+    # Sinon, c'est un upload de fichier CSV comme avant
+    if 'file' not in request.files:
+        return jsonify({"error": "Aucun fichier n'a été envoyé"}), 400
+    
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"error": "Aucun fichier n'a été sélectionné"}), 400
+    if file and file.filename.endswith('.csv'):
+        job_id = import_jobs.submit('rse', traiter_import_rse, file, {'username': current_user['username']})
+        return reponse_import_job(job_id)
+    
+    return jsonify({"error": "Format de fichier non pris en charge. Seuls les fichiers CSV sont acceptés."}), 400
+
+def traiter_import_rse(chemin, params, progress):
+    """Traite en tâche de fond un fichier CSV RSE (format spécifique ou standard)"""
+    import pandas as pd
+    try:
+        # Lecture du fichier CSV avec pandas
+        df = pd.read_csv(chemin, encoding='utf-8')
+    
+        # Vérifier que le fichier correspond au format attendu
+        expected_columns = ['promotion_semestre', 'activite', 'cm_maquette', 'td_maquette', 
+                          'cm_hors_maquette', 'td1', 'td2', 'td3', 'td4', 'td5', 'total_heures']
+    
+        missing_columns = [col for col in expected_columns if col not in df.columns]
+        if missing_columns:
+            # Si certaines colonnes manquent, vérifier si c'est un format alternatif
+            # Pour le format standard RSE
+            alt_columns = ['annee', 'promotion', 'semestre', 'type_activite', 'heures_cm', 'heures_td', 'heures_tp']
+            alt_missing = [col for col in alt_columns if col not in df.columns]
+        
+            if alt_missing:
+                return {
+                    "error": f"Format de fichier non reconnu. Colonnes manquantes: {', '.join(missing_columns)}"
+                }, 400
+            else:
+                # C'est le format standard RSE, on peut procéder directement
+                return process_standard_rse_format(df, params['username'], progress)
+    
+        # C'est le format spécifique avec promotion_semestre, etc.
+        # Transformation en format RSE standard
+        records = []
+    
+        for _, row in df.iterrows():
+            # Extraire promotion et semestre de promotion_semestre
+            promotion_semestre = str(row.get('promotion_semestre', ''))
+        
+            # Pattern attendu: FIEx-Sy
+            parts = promotion_semestre.split('-')
+            if len(parts) == 2:
+                promotion = parts[0].strip()
+                semestre = parts[1].strip()
+            else:
+                # Si format incorrect, utiliser des valeurs par défaut
+                promotion = promotion_semestre
+                semestre = "S1"  # Valeur par défaut
+        
+            # Déterminer l'année en fonction de la promotion (approximation)
+            current_year = datetime.utcnow().year
+            annee = current_year
+        
+            # Extraire les heures
+            heures_cm = parse_numeric_value(row.get('cm_maquette', 0)) + parse_numeric_value(row.get('cm_hors_maquette', 0))
+            heures_td = sum([
+                parse_numeric_value(row.get('td_maquette', 0)),
+                parse_numeric_value(row.get('td1', 0)),
+                parse_numeric_value(row.get('td2', 0))
+            ])
+            heures_tp = sum([
+                parse_numeric_value(row.get('td3', 0)),
+                parse_numeric_value(row.get('td4', 0)),
+                parse_numeric_value(row.get('td5', 0))
+            ])
+        
+            # Calculer le total ou utiliser celui fourni
+            total_heures = parse_numeric_value(row.get('total_heures', 0))
+            if total_heures == 0:
+                total_heures = heures_cm + heures_td + heures_tp
+        
+            # Créer l'enregistrement au format standard RSE
+            record = {
+                'id': f"rse_{int(datetime.utcnow().timestamp())}_{len(records)}",
+                'annee': annee,
+                'promotion': promotion,
+                'semestre': semestre,
+                'type_activite': str(row.get('activite', '')),
+                'heures_cm': int(heures_cm),
+                'heures_td': int(heures_td),
+                'heures_tp': int(heures_tp),
+                'total_heures': int(total_heures),
+                'uploaded_by': params['username'],
+                'uploaded_at': datetime.utcnow(),
+                'created_by': params['username'],
+                'created_at': datetime.utcnow(),
+                'updated_by': params['username'],
+                'updated_at': datetime.utcnow()
+            }
+        
+            records.append(record)
+    
+        # Insertion des nouvelles données
+        if records:
+            try:
+                inserted = inserer_rse(rse_collection, rse_stats_collection, records, progress, IMPORT_JOB_BATCH_SIZE)
+            finally:
+                # Une partie des documents a pu être écrite même si l'insertion a échoué
+                bump_collection_version(MONGO_COLLECTION_RSE, insertion_seule=True)
+        
+            return {
+                "message": "Fichier CSV RSE traité avec succès", 
+                "records_inserted": inserted,
+                "success": True
+            }, 200
+        else:
+            return {
+                "warning": "Aucune donnée valide trouvée dans le fichier CSV RSE",
+                "success": False
+            }, 400
+        
+    except Exception as e:
+        return {"error": f"Erreur lors du traitement du fichier CSV RSE: {str(e)}"}, 500
+
+def process_standard_rse_format(df, username, progress):
+    """Traite un fichier CSV au format RSE standard"""
+    try:
+        # Conversion du DataFrame en liste de dictionnaires pour MongoDB
+        records = df.to_dict('records')
+        
+        # Ajout de métadonnées et calculs
+        for i, record in enumerate(records):
+            record['id'] = f"rse_{int(datetime.utcnow().timestamp())}_{i}"
+            
+            # Convertir les types numériques
+            record['annee'] = int(record.get('annee', datetime.utcnow().year))
+            record['heures_cm'] = int(record.get('heures_cm', 0))
+            record['heures_td'] = int(record.get('heures_td', 0))
+            record['heures_tp'] = int(record.get('heures_tp', 0))
+            
+            # Calculer le total
+            record['total_heures'] = record['heures_cm'] + record['heures_td'] + record['heures_tp']
+            
+            # Métadonnées
+            record['uploaded_by'] = username
+            record['uploaded_at'] = datetime.utcnow()
+            record['created_by'] = username
+            record['created_at'] = datetime.utcnow()
+            record['updated_by'] = username
+            record['updated_at'] = datetime.utcnow()
+        
+        # Insertion des nouvelles données
+        try:
+            inserted = inserer_rse(rse_collection, rse_stats_collection, records, progress, IMPORT_JOB_BATCH_SIZE)
+        finally:
+            # Une partie des documents a pu être écrite même si l'insertion a échoué
+            bump_collection_version(MONGO_COLLECTION_RSE, insertion_seule=True)
+        
+        return {
+            "message": "Fichier CSV RSE traité avec succès", 
+            "records_inserted": inserted,
+            "success": True
+        }, 200
+    except Exception as e:
+        return {"error": f"Erreur lors du traitement du fichier CSV RSE standard: {str(e)}"}, 500
+
+def parse_numeric_value(value):
+    """Convertit une valeur en nombre, gère les cas particuliers"""
+    if value is None:
+        return 0
+    
+    if isinstance(value, (int, float)):
+        return value
+    
+    try:
+        # Supprimer les caractères non numériques sauf le point décimal
+        cleaned_value = ''.join(c for c in str(value) if c.isdigit() or c == '.')
+        if cleaned_value:
+            return float(cleaned_value)
+        return 0
+    except (ValueError, TypeError):
+        return 0
+    
+@bp.route('/api/rse/bulk_add', methods=['POST'])
+@token_required
+def rse_bulk_add(current_user):
+    """Endpoint pour l'ajout en masse de données RSE à partir du CSV transformé"""
+    # Vérification des permissions
+    user_role = current_user['role']
+    if 'upload' not in PERMISSIONS.get(user_role, []):
+        return jsonify({"error": "Permissions insuffisantes"}), 403
+    
+    # Récupérer les données JSON
+    data = request.get_json()
+    
+    if not data or 'data' not in data:
+        return jsonify({"error": "Données manquantes ou format incorrect"}), 400
+    
+    records = data['data']
+    
+    if not records or not isinstance(records, list):
+        return jsonify({"error": "Format de données invalide - tableau attendu"}), 400
+    
+    try:
+        # Traitement des enregistrements
+        for i, record in enumerate(records):
+            # Ajout d'un ID unique s'il n'existe pas
+            if 'id' not in record:
+                record['id'] = f"rse_{int(datetime.utcnow().timestamp())}_{i}"
+            
+            # Métadonnées
+            record['uploaded_by'] = current_user['username']
+            record['uploaded_at'] = datetime.utcnow()
+            record['created_by'] = current_user['username']
+            record['created_at'] = datetime.utcnow()
+            record['updated_by'] = current_user['username']
+            record['updated_at'] = datetime.utcnow()
+            
+            # Heures stockées en nombres, comme pour les autres écritures
+            normaliser_heures(record, CHAMPS_HEURES + tuple(HEURES_SUPPLEMENTAIRES_RSE))
+        
+        # Insertion dans la base de données
+        try:
+            inserted = inserer_rse(rse_collection, rse_stats_collection, records)
+        finally:
+            # Une partie des documents a pu être écrite même si l'insertion a échoué
+            bump_collection_version(MONGO_COLLECTION_RSE, insertion_seule=True)
+        
+        return jsonify({
+            "message": "Données RSE ajoutées avec succès",
+            "records_inserted": inserted,
+            "success": True
+        }), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de l'ajout des données RSE: {str(e)}"}), 500
+
+@bp.route('/api/rse/charts/<chart_type>', methods=['GET'])
+@token_required
+@cached_chart(MONGO_COLLECTION_RSE)
+def get_rse_chart(current_user, chart_type):
+    """Endpoint pour générer des graphiques spécifiques aux données RSE"""
+    try:
+        # Instantané DataFrame de la collection RSE (relu seulement après une écriture)
+        df = snapshots.frame(rse_collection)
+        
+        if df.empty:
+            return jsonify({"error": "Aucune donnée RSE trouvée"}), 404
+        
+        if chart_type == 'promotions_pie':
+            # Répartition par promotion
+            promotion_totals = df.groupby('promotion')['total_heures'].sum()
+            spec = {
+                'type': 'pie',
+                'values': promotion_totals.values.tolist(),
+                'labels': [str(promotion) for promotion in promotion_totals.index],
+                'title': 'Répartition des heures RSE par promotion'
+            }
+            
+        elif chart_type == 'evolution_line':
+            # Évolution par année
+            evolution = df.groupby('annee')['total_heures'].sum().sort_index()
+            spec = {
+                'type': 'line',
+                'series': [{'x': evolution.index.tolist(), 'y': evolution.values.tolist()}],
+                'title': 'Évolution des heures RSE par année',
+                'xlabel': 'Année',
+                'ylabel': 'Heures RSE'
+            }
+            
+        elif chart_type == 'type_activite_bar':
+            # Répartition par type d'activité
+            type_totals = df.groupby('type_activite')['total_heures'].sum()
+            spec = {
+                'type': 'bar',
+                'labels': [str(type_activite) for type_activite in type_totals.index],
+                'values': type_totals.values.tolist(),
+                'title': 'Répartition par type d\'activité RSE',
+                'xlabel': 'Type d\'activité',
+                'ylabel': 'Heures',
+                'xtick_rotation': 45,
+                'xtick_ha': 'right'
+            }
+            
+        elif chart_type == 'format_cours_doughnut':
+            # Répartition CM/TD/TP, en beignet sur la même figure que les autres graphiques
+            spec = {
+                'type': 'pie',
+                'values': [float(df['heures_cm'].sum()), float(df['heures_td'].sum()), float(df['heures_tp'].sum())],
+                'labels': ['CM', 'TD', 'TP'],
+                'wedge_width': 0.5,
+                'title': 'Répartition CM/TD/TP en RSE'
+            }
+            
+        else:
+            return jsonify({"error": "Type de graphique non reconnu"}), 400
+        
+        return jsonify({"image": chart_renderer.render(spec)}), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la génération du graphique RSE: {str(e)}"}), 500
@@ -0,0 +1,326 @@
+"""
+Routes des vacataires
+"""
+
+import io
+import math
+import uuid
+from datetime import datetime
+from flask import Blueprint, current_app, request, jsonify
+
+from config import *
+from extensions import (
+    vacataire_collection, import_jobs, token_required, wants_ndjson, ndjson_response,
+    reponse_import_job
+)
+from import_jobs import inserer_par_lots
+
+bp = Blueprint('vacataire', __name__)
+
+@bp.route('/api/vacataire/add', methods=['POST'])
+@token_required
+def add_vacataire(current_user):
+    """Endpoint pour ajouter un vacataire manuellement"""
+    try:
+        data = request.json
+        
+        # Valider les données requises
+        required_fields = ['nom', 'prenom', 'email']
+        for field in required_fields:
+            if not data.get(field):
+                return jsonify({"error": f"Le champ {field} est requis"}), 400
+        
+        # Générer un ID unique si non fourni
+        if not data.get('id'):
+            data['id'] = str(uuid.uuid4())
+            
+        # Ajouter la date de création
+        data['date_creation'] = datetime.now().isoformat()
+        data['cree_par'] = current_user.get('username', 'system')
+        
+        # Insérer dans la collection
+        result = vacataire_collection.insert_one(data)
+        
+        if result.inserted_id:
+            return jsonify({"message": "Vacataire ajouté avec succès", "id": data['id']}), 201
+        else:
+            return jsonify({"error": "Erreur lors de l'ajout du vacataire"}), 500
+            
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors de l'ajout d'un vacataire: {str(e)}")
+        return jsonify({"error": f"Erreur lors de l'ajout: {str(e)}"}), 500
+@bp.route('/api/vacataire/data', methods=['GET'])
+@token_required
+def get_vacataire_data(current_user):
+    """Endpoint pour récupérer les données des vacataires"""
+    try:
+        # Récupérer tous les documents de la collection vacataire
+        cursor = vacataire_collection.find({}, {'_id': 0})
+        
+        if wants_ndjson():
+            return ndjson_response(cursor, nettoyer_document_vacataire)
+        
+        # Convertir le curseur en liste nettoyée
+        vacataires = [nettoyer_document_vacataire(doc) for doc in cursor]
+        
+        return jsonify(vacataires), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors de la récupération des données vacataires: {str(e)}")
+        return jsonify({"error": f"Erreur lors de la récupération des données: {str(e)}"}), 500
+
+def nettoyer_document_vacataire(doc):
+    """Remplace None et NaN par des chaînes vides"""
+    for key, value in doc.items():
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            doc[key] = ""
+    return doc
+    
+@bp.route('/api/vacataire/upload-csv', methods=['POST'])
+@token_required
+def upload_vacataire_csv(current_user):
+    """Endpoint pour uploader un fichier CSV de vacataires"""
+    if 'file' not in request.files:
+        return jsonify({"error": "Aucun fichier n'a été envoyé"}), 400
+        
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"error": "Aucun fichier n'a été sélectionné"}), 400
+        
+    if file and file.filename.endswith('.csv'):
+        job_id = import_jobs.submit('vacataire', traiter_import_vacataire, file, {
+            'username': current_user.get('username', 'system')
+        })
+        return reponse_import_job(job_id)
+    
+    return jsonify({"error": "Le fichier doit être au format CSV"}), 400
+
+def traiter_import_vacataire(chemin, params, progress):
+    """Traite en tâche de fond un fichier CSV de vacataires"""
+    import pandas as pd
+    # Lire le contenu du fichier
+    with open(chemin, encoding='utf-8') as f:
+        content = f.read()
+    
+    try:
+        # Utiliser pandas pour lire le CSV avec des options tolérantes aux erreurs
+        df = pd.read_csv(io.StringIO(content), on_bad_lines='skip', sep=None, engine='python')
+        
+        current_app.logger.info(f"Colonnes détectées dans le CSV: {df.columns.tolist()}")
+        
+        # Préparer les données pour insertion exactement comme elles sont
+        records = []
+        for idx, row in df.iterrows():
+            # Créer un dictionnaire avec toutes les colonnes du CSV
+            record = {}
+            
+            # Parcourir toutes les colonnes et ajouter leurs valeurs
+            for col in df.columns:
+                if not pd.isna(row[col]):
+                    record[col] = str(row[col])
+                else:
+                    record[col] = ""  # Valeur vide pour les champs NA/NaN
+            
+            # Ajouter un ID unique s'il n'existe pas
+            if 'id' not in record:
+                record['id'] = str(uuid.uuid4())
+            
+            # Ajouter les métadonnées de base
+            record['date_creation'] = datetime.now().isoformat()
+            record['cree_par'] = params['username']
+            
+            records.append(record)
+        
+        # Insérer les données dans MongoDB exactement comme elles sont
+        if records:
+            inserted = inserer_par_lots(vacataire_collection, records, progress, IMPORT_JOB_BATCH_SIZE)
+            current_app.logger.info(f"Import CSV réussi: {inserted} enregistrements insérés")
+            return {
+                "message": "Import CSV réussi",
+                "records_inserted": inserted
+            }, 200
+        else:
+            return {"message": "Aucun enregistrement à importer"}, 200
+            
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors du traitement du CSV: {str(e)}")
+        
+        # Essayer avec une approche plus simple si pandas échoue
+        try:
+            current_app.logger.info("Tentative avec une approche plus simple...")
+            
+            # Lire les lignes du fichier
+            lines = content.strip().split('\n')
+            
+            if not lines:
+                return {"error": "Le fichier CSV est vide"}, 400
+            
+            # Traiter manuellement le CSV
+            records = []
+            
+            # Détecter le séparateur (virgule, point-virgule, tabulation)
+            sep = ','  # Séparateur par défaut
+            for potential_sep in [',', ';', '\t']:
+                if potential_sep in lines[0]:
+                    sep = potential_sep
+                    current_app.logger.info(f"Séparateur détecté: {sep}")
+                    break
+            
+            # Extraire les en-têtes
+            headers = [h.strip() for h in lines[0].split(sep)]
+            
+            # Créer un enregistrement pour chaque ligne de données
+            for line in lines[1:]:
+                if not line.strip():
+                    continue  # Ignorer les lignes vides
+                    
+                # Initialiser l'enregistrement avec l'ID et les métadonnées
+                record = {
+                    'id': str(uuid.uuid4()),
+                    'date_creation': datetime.now().isoformat(),
+                    'cree_par': params['username']
+                }
+                
+                # Remplir avec les valeurs disponibles
+                values = line.split(sep)
+                for i, val in enumerate(values):
+                    if i < len(headers):
+                        header = headers[i].strip()
+                        if header:  # S'assurer que l'en-tête n'est pas vide
+                            record[header] = val.strip()
+                
+                records.append(record)
+            
+            # Insérer les données dans MongoDB
+            if records:
+                inserted = inserer_par_lots(vacataire_collection, records, progress, IMPORT_JOB_BATCH_SIZE)
+                current_app.logger.info(f"Import CSV réussi (méthode alternative): {inserted} enregistrements insérés")
+                return {
+                    "message": "Import CSV réussi",
+                    "records_inserted": inserted
+                }, 200
+            else:
+                return {"message": "Aucun enregistrement à importer"}, 200
+                
+        except Exception as inner_e:
+            current_app.logger.error(f"Échec de l'approche alternative: {str(inner_e)}")
+            return {"error": f"Erreur lors du traitement du CSV: {str(e)}"}, 400
+@bp.route('/api/vacataire/delete/<string:id>', methods=['DELETE'])
+@token_required
+def delete_vacataire(current_user, id):
+    """Endpoint pour supprimer un vacataire"""
+    try:
+        result = vacataire_collection.delete_one({"id": id})
+        
+        if result.deleted_count:
+            return jsonify({"message": "Vacataire supprimé avec succès"}), 200
+        else:
+            return jsonify({"error": "Vacataire non trouvé"}), 404
+            
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors de la suppression d'un vacataire: {str(e)}")
+        return jsonify({"error": f"Erreur lors de la suppression: {str(e)}"}), 500
+
+@bp.route('/api/vacataire/update/<string:id>', methods=['PUT'])
+@token_required
+def update_vacataire(current_user, id):
+    """Endpoint pour mettre à jour un vacataire"""
+    try:
+        data = request.json
+        
+        # Vérifier si le vacataire existe
+        existing = vacataire_collection.find_one({"id": id})
+        if not existing:
+            return jsonify({"error": "Vacataire non trouvé"}), 404
+            
+        # Ajouter les métadonnées de mise à jour
+        data['date_modification'] = datetime.now().isoformat()
+        data['modifie_par'] = current_user.get('username', 'system')
+        
+        # Mettre à jour le document
+        result = vacataire_collection.update_one(
+            {"id": id},
+            {"$set": data}
+        )
+        
+        if result.modified_count:
+            return jsonify({"message": "Vacataire mis à jour avec succès"}), 200
+        else:
+            return jsonify({"message": "Aucune modification effectuée"}), 200
+            
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors de la mise à jour d'un vacataire: {str(e)}")
+        return jsonify({"error": f"Erreur lors de la mise à jour: {str(e)}"}), 500
+
+@bp.route('/api/vacataire/stats', methods=['GET'])
+@token_required
+def get_vacataire_stats(current_user):
+    """Endpoint pour récupérer les statistiques des vacataires"""
+    try:
+        # Récupérer tous les documents de la collection vacataire
+        cursor = vacataire_collection.find({}, {'_id': 0})
+        vacataires = list(cursor)
+        
+        # Statistiques par profession
+        professions = {}
+        pays = {}
+        etats_recrutement = {}
+        
+        for v in vacataires:
+            # Compter par profession
+            profession = v.get('Type de profession', '')
+            if profession:
+                professions[profession] = professions.get(profession, 0) + 1
+                
+            # Compter par pays
+            pays_val = v.get('Pays', '')
+            if pays_val:
+                pays[pays_val] = pays.get(pays_val, 0) + 1
+                
+            # Compter par état de recrutement
+            etat = v.get('État recrutement', '')
+            if etat:
+                etats_recrutement[etat] = etats_recrutement.get(etat, 0) + 1
+        
+        # Préparer les données pour les heures
+        vacataires_heures = []
+        for v in vacataires:
+            try:
+                heures = float(v.get('Nombre d\'heures estimées', 0))
+                if heures > 0:
+                    vacataires_heures.append({
+                        'nom': f"{v.get('Prénom', '')} {v.get('Nom', '')}",
+                        'heures': heures
+                    })
+            except:
+                pass
+        
+        # Trier et prendre les 10 premiers
+        vacataires_heures.sort(key=lambda x: x['heures'], reverse=True)
+        top_10_heures = vacataires_heures[:10]
+        
+        # Formatter les résultats
+        stats = {
+            "profession": {
+                "labels": list(professions.keys()),
+                "values": list(professions.values())
+            },
+            "pays": {
+                "labels": list(pays.keys()),
+                "values": list(pays.values())
+            },
+            "etat_recrutement": {
+                "labels": list(etats_recrutement.keys()),
+                "values": list(etats_recrutement.values())
+            },
+            "heures": {
+                "labels": [v['nom'] for v in top_10_heures],
+                "values": [v['heures'] for v in top_10_heures]
+            }
+        }
+        
+        return jsonify(stats), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Erreur lors de la récupération des statistiques vacataires: {str(e)}")
+        return jsonify({"error": f"Erreur lors de la récupération des statistiques: {str(e)}"}), 500
@@ -0,0 +1,172 @@
+"""
+Statistiques RSE matérialisées
+
+La collection rse_stats contient une ligne par (annee, promotion, type_activite,
+semestre) avec les sommes d'heures CM/TD/TP et le nombre d'activités. Chaque
+écriture sur les données RSE y est répercutée par des $inc, si bien que
+/api/rse/stats ne lit que ce résumé, quelle que soit la taille de la table.
+
+Les insertions passent par inserer_rse, qui ne répercute que les documents
+effectivement écrits. Un arrêt entre l'écriture et le $inc peut malgré tout
+laisser le résumé en retard: verifier_rse_stats le compare aux données au
+démarrage de chaque processus (initialiser_base) et le reconstruit s'il a
+dérivé; `python migrations.py rse_stats` lance la même vérification.
+"""
+
+import math
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+CHAMPS_CLE = ('annee', 'promotion', 'type_activite', 'semestre')
+CHAMPS_HEURES = ('heures_cm', 'heures_td', 'heures_tp')
+
+
+def _nombre(value):
+    """Convertit une valeur d'heures en nombre (0 si absente ou invalide)"""
+    try:
+        nombre = float(value)
+    except (TypeError, ValueError):
+        return 0
+    if math.isnan(nombre):
+        return 0
+    return int(nombre) if nombre.is_integer() else nombre
+
+
+def normaliser_heures(record, champs=CHAMPS_HEURES):
+    """Stocke en nombres les champs d'heures présents dans un document RSE (0 si invalide)"""
+    for champ in champs:
+        if champ in record:
+            record[champ] = _nombre(record[champ])
+    return record
+
+
+def _variations(ajouts, retraits):
+    variations = {}
+    for records, signe in ((ajouts, 1), (retraits, -1)):
+        for record in records:
+            if record is None:
+                continue
+            cle = tuple(record.get(champ) for champ in CHAMPS_CLE)
+            delta = variations.setdefault(cle, dict.fromkeys(CHAMPS_HEURES + ('nombre_activites',), 0))
+            for champ in CHAMPS_HEURES:
+                delta[champ] += signe * _nombre(record.get(champ))
+            delta['nombre_activites'] += signe
+    return variations
+
+
+def appliquer_variations_rse(stats_collection, ajouts=(), retraits=()):
+    """Répercute des lignes RSE ajoutées et/ou retirées sur le résumé"""
+    operations = [
+        UpdateOne(dict(zip(CHAMPS_CLE, cle)), {'$inc': delta}, upsert=True)
+        for cle, delta in _variations(ajouts, retraits).items()
+        if any(delta.values())
+    ]
+    if operations:
+        stats_collection.bulk_write(operations, ordered=False)
+        stats_collection.delete_many({'nombre_activites': {'$lte': 0}})
+
+
+def inserer_rse(rse_collection, stats_collection, records, progress=None, taille_lot=None):
+    """Insère des lignes RSE par lots et répercute sur le résumé celles qui ont été écrites
+
+    Renvoie le nombre inséré. Si un lot échoue, les documents écrits avant
+    l'erreur (insertion ordonnée) sont répercutés avant de relever l'exception.
+    """
+    taille_lot = taille_lot or max(len(records), 1)
+    inserted = 0
+    if progress:
+        progress(0, len(records))
+    for debut in range(0, len(records), taille_lot):
+        lot = records[debut:debut + taille_lot]
+        try:
+            ids = set(rse_collection.insert_many(lot).inserted_ids)
+        except BulkWriteError as e:
+            appliquer_variations_rse(stats_collection, ajouts=lot[:e.details.get('nInserted', 0)])
+            raise
+        ecrits = [record for record in lot if record.get('_id') in ids]
+        appliquer_variations_rse(stats_collection, ajouts=ecrits)
+        inserted += len(ecrits)
+        if progress:
+            progress(inserted)
+    return inserted
+
+
+def _resume_attendu(rse_collection):
+    projection = dict.fromkeys(CHAMPS_CLE + CHAMPS_HEURES, 1)
+    projection['_id'] = 0
+    return _variations(rse_collection.find({}, projection), ())
+
+
+def _ecrire_resume(stats_collection, variations):
+    stats_collection.delete_many({})
+    if variations:
+        stats_collection.insert_many([
+            {**dict(zip(CHAMPS_CLE, cle)), **delta}
+            for cle, delta in variations.items()
+        ])
+
+
+def reconstruire_rse_stats(rse_collection, stats_collection):
+    """Recalcule entièrement le résumé à partir des données RSE"""
+    _ecrire_resume(stats_collection, _resume_attendu(rse_collection))
+
+
+def verifier_rse_stats(rse_collection, stats_collection):
+    """Compare le résumé aux données RSE et le reconstruit s'il a dérivé
+
+    Renvoie le nombre de lignes du résumé réécrites (0 s'il était exact).
+    """
+    attendu = _resume_attendu(rse_collection)
+    actuel = {
+        tuple(ligne.get(champ) for champ in CHAMPS_CLE): ligne
+        for ligne in stats_collection.find({}, {'_id': 0})
+    }
+    exact = attendu.keys() == actuel.keys() and all(
+        math.isclose(actuel[cle].get(champ, 0), valeur, abs_tol=1e-9)
+        for cle, delta in attendu.items()
+        for champ, valeur in delta.items()
+    )
+    if exact:
+        return 0
+    _ecrire_resume(stats_collection, attendu)
+    return max(len(attendu), len(actuel))
+
+
+def _regrouper(lignes, champ):
+    groupes = {}
+    for ligne in lignes:
+        valeur = ligne.get(champ)
+        if valeur is None:
+            continue
+        groupe = groupes.setdefault(valeur, dict.fromkeys(CHAMPS_HEURES + ('nombre_activites',), 0))
+        for nom in groupe:
+            groupe[nom] += ligne.get(nom, 0)
+
+    return {
+        valeur: {
+            'total_heures': int(groupe['heures_cm'] + groupe['heures_td'] + groupe['heures_tp']),
+            'heures_cm': int(groupe['heures_cm']),
+            'heures_td': int(groupe['heures_td']),
+            'heures_tp': int(groupe['heures_tp']),
+            'nombre_activites': int(groupe['nombre_activites'])
+        }
+        for valeur, groupe in sorted(groupes.items(), key=lambda item: str(item[0]))
+    }
+
+
+def agreger_rse_stats(stats_collection):
+    """Agrège le résumé par promotion, type d'activité et année; None si aucune donnée"""
+    lignes = list(stats_collection.find({}, {'_id': 0}))
+    if not lignes:
+        return None
+
+    return {
+        'par_promotion': _regrouper(lignes, 'promotion'),
+        'par_type': _regrouper(lignes, 'type_activite'),
+        'par_annee': _regrouper(lignes, 'annee'),
+        'heures_cm': int(sum(ligne.get('heures_cm', 0) for ligne in lignes)),
+        'heures_td': int(sum(ligne.get('heures_td', 0) for ligne in lignes)),
+        'heures_tp': int(sum(ligne.get('heures_tp', 0) for ligne in lignes)),
+        'nombre_activites': int(sum(ligne.get('nombre_activites', 0) for ligne in lignes))
+    }
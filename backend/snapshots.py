@@ -0,0 +1,134 @@
+"""
+Instantanés pandas des collections pour les endpoints qui calculent en DataFrame
+
+Le premier appel lit la collection et la convertit en DataFrame. Les colonnes
+texte à faible cardinalité sont encodées en catégories. Les appels suivants
+réutilisent l'instantané, sans le copier, tant que la version de la collection (voir
+bump_collection_version) n'a pas changé. Si seules des insertions ont eu lieu
+depuis, seuls les documents d'_id supérieur sont lus et ajoutés. Toute autre
+écriture (mise à jour, suppression) provoque une relecture complète.
+"""
+
+import threading
+
+
+class SnapshotCache:
+    """Un DataFrame par collection, invalidé par le numéro de version de la collection"""
+
+    def __init__(self, get_etat, max_ratio_categorie):
+        # get_etat(nom) -> (version, modifications): modifications ne compte que les écritures
+        # autres que des insertions
+        self._get_etat = get_etat
+        self.max_ratio_categorie = max_ratio_categorie
+        self.hits = 0
+        self.misses = 0
+        self.incremental = 0
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _verrou(self, nom):
+        with self._lock:
+            return self._locks.setdefault(nom, threading.Lock())
+
+    def frame(self, collection):
+        """Instantané de la collection (sans _id), partagé entre les requêtes
+
+        Aucune donnée n'est copiée: le DataFrame renvoyé est une vue superficielle
+        de l'instantané. Ajouter ou remplacer une colonne n'a pas d'effet sur le
+        cache, mais les valeurs ne doivent pas être modifiées en place (fillna,
+        affectations .loc): l'appelant qui en a besoin fait d'abord sa propre copie().
+        """
+        nom = collection.name
+        version, modifications = self._get_etat(nom)
+
+        # Un verrou par collection: une seule relecture à la fois après une écriture
+        with self._verrou(nom):
+            entry = self._entries.get(nom)
+            if entry is not None and entry['version'] == version:
+                self.hits += 1
+            elif entry is not None and entry['modifications'] == modifications:
+                entry = self._completer(collection, entry, version) or self._charger(collection, version, modifications)
+            else:
+                entry = self._charger(collection, version, modifications)
+            df = entry['df']
+
+        return df.copy(deep=False)
+
+    def _charger(self, collection, version, modifications):
+        import pandas as pd
+        self.misses += 1
+        documents = list(collection.find({}).sort('_id', 1))
+        return self._stocker(collection.name, pd.DataFrame(documents), version, modifications)
+
+    def _completer(self, collection, entry, version):
+        """Ajoute les documents insérés depuis l'instantané; None si l'instantané ne peut être complété"""
+        import pandas as pd
+        if entry['max_id'] is None:
+            return None
+        nouveaux = list(collection.find({'_id': {'$gt': entry['max_id']}}).sort('_id', 1))
+        # Un _id inférieur au dernier vu (autre client, même seconde) échapperait au filtre
+        if len(entry['df']) + len(nouveaux) != collection.count_documents({}):
+            return None
+
+        self.incremental += 1
+        df = entry['df']
+        if nouveaux:
+            ancien = df.astype({colonne: object for colonne, dtype in df.dtypes.items() if dtype == 'category'})
+            df = pd.concat([ancien, pd.DataFrame(nouveaux)], ignore_index=True)
+        return self._stocker(collection.name, df, version, entry['modifications'], entry['max_id'])
+
+    def _stocker(self, nom, df, version, modifications, max_id=None):
+        # Documents lus triés par _id: le dernier donne le point de reprise des insertions suivantes
+        if '_id' in df.columns:
+            max_id = df['_id'].iloc[-1] if len(df) else None
+            df = df.drop(columns='_id')
+        entry = {
+            'version': version,
+            'modifications': modifications,
+            'max_id': max_id,
+            'df': self._encoder(df)
+        }
+        self._entries[nom] = entry
+        return entry
+
+    def _encoder(self, df):
+        """Encode en catégories les colonnes texte dont peu de valeurs sont distinctes"""
+        import pandas as pd
+        for colonne in df.columns:
+            serie = df[colonne]
+            # Texte: object (pandas 2) ou StringDtype (inféré par défaut depuis pandas 3)
+            if not (serie.dtype == object or isinstance(serie.dtype, pd.StringDtype)) or len(serie) == 0:
+                continue
+            valeurs = serie.dropna()
+            if not all(isinstance(valeur, str) for valeur in valeurs):
+                continue
+            if valeurs.nunique() <= self.max_ratio_categorie * len(serie):
+                df[colonne] = serie.astype('category')
+        return df
+
+    def invalider(self, nom=None):
+        """Oublie l'instantané d'une collection, ou tous"""
+        with self._lock:
+            if nom is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(nom, None)
+
+    def stats(self):
+        """Statistiques d'utilisation et taille mémoire des instantanés"""
+        with self._lock:
+            entries = dict(self._entries)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "incremental": self.incremental,
+            "collections": {
+                nom: {
+                    "version": entry['version'],
+                    "rows": len(entry['df']),
+                    "bytes": int(entry['df'].memory_usage(deep=True).sum())
+                }
+                for nom, entry in entries.items()
+            }
+        }
@@ -0,0 +1,86 @@
+"""
+Fixtures communes des tests de l'API
+
+Les tests s'exécutent sans serveur MongoDB: le client partagé (extensions.mongo)
+est remplacé par un client mongomock, vidé à chaque test.
+
+Usage (depuis backend/):
+    pip install -r requirements-test.txt
+    python -m pytest tests
+"""
+
+import io
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+
+mongomock = pytest.importorskip('mongomock')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import extensions
+from app import create_app
+from chart_cache import ChartCache
+from config import JWT_SECRET_KEY, CHART_CACHE_MAX_BYTES
+
+# Les opérations de bulk_write de PyMongo récent passent un argument sort que mongomock ne connaît pas
+_add_update = mongomock.collection.BulkOperationBuilder.add_update
+mongomock.collection.BulkOperationBuilder.add_update = (
+    lambda self, *args, sort=None, **kwargs: _add_update(self, *args, **kwargs)
+)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Application Flask sur une base mongomock vide, sans cache hérité d'un autre test"""
+    monkeypatch.setattr(extensions.mongo, '_client', mongomock.MongoClient())
+    monkeypatch.setattr(extensions.mongo, '_pid', os.getpid())
+    monkeypatch.setattr(extensions.import_jobs, 'spool_dir', str(tmp_path))
+    monkeypatch.setattr(extensions, '_base_initialisee', False)
+    monkeypatch.setattr(extensions, 'chart_cache', ChartCache(CHART_CACHE_MAX_BYTES))
+    extensions.snapshots.invalider()
+    return create_app({'TESTING': True})
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def make_token(username='admin', role='admin', expires_in=timedelta(hours=1)):
+    """Jeton signé comme ceux de /api/login; jti unique pour ne pas partager le cache entre tests"""
+    return jwt.encode({
+        'user_id': username,
+        'username': username,
+        'role': role,
+        'jti': uuid.uuid4().hex,
+        'exp': int((datetime.utcnow() + expires_in).timestamp())
+    }, JWT_SECRET_KEY, algorithm='HS256')
+
+
+def auth_headers(username='admin', role='admin'):
+    return {'Authorization': f'Bearer {make_token(username, role)}'}
+
+
+@pytest.fixture
+def headers():
+    return auth_headers()
+
+
+def upload(client, url, headers, contenu, filename, data=None):
+    """Envoie un fichier (et les champs de formulaire data) et renvoie la réponse finale de l'import
+
+    Attend la fin du job si l'API répond 202.
+    """
+    response = client.post(
+        url, headers=headers, content_type='multipart/form-data',
+        data={**(data or {}), 'file': (io.BytesIO(contenu.encode('utf-8')), filename)}
+    )
+    if response.status_code == 202:
+        job = extensions.import_jobs.wait(response.get_json()['job_id'], 30)
+        return job['result'], job['http_status']
+    return response.get_json(), response.status_code
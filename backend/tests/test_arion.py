@@ -0,0 +1,65 @@
+"""
+Statistiques ARION calculées par agrégation sur les dates normalisées à l'ingestion
+"""
+
+import io
+
+import pytest
+
+import extensions
+from conftest import auth_headers, upload
+
+ACTIVITE = {
+    'annee': '2023-2024', 'groupe': 'G1', 'activite': 'Cours', 'code_y': 'Y1', 'niveau': 'FIE3', 'duree': '2'
+}
+
+
+@pytest.fixture
+def activites(client):
+    for formateur, statut, date in [
+        ('Dupont', 'Vacataire', '15/01/2024'),
+        ('Durand', 'Vacataires', '2024-01-20'),
+        ('Dupont', 'Vacataire', '03/02/2024'),
+        ('Martin', 'Non spécifié', '2023-11-05'),
+        ('Petit', 'Permanent', 'date inconnue'),
+    ]:
+        response = client.post('/api/arion/add', json={**ACTIVITE, 'formateur': formateur, 'statut': statut, 'date': date})
+        assert response.status_code == 200
+
+
+def test_dates_stockees_en_datetime(activites):
+    document = extensions.arion_collection.find_one({'formateur': 'Durand'})
+    assert (document['date'].year, document['year'], document['month']) == (2024, 2024, 1)
+    illisible = extensions.arion_collection.find_one({'formateur': 'Petit'})
+    assert (illisible['date'], illisible['year'], illisible['month']) == ('date inconnue', None, None)
+
+
+def test_statistiques_mensuelles(client, headers, activites):
+    toutes = client.get('/api/arion/monthly_stats', headers=headers).get_json()
+    assert toutes['values'][0:2] == [2, 1] and toutes['values'][10] == 1
+    assert sum(toutes['values']) == 4
+
+    annee_2024 = client.get('/api/arion/monthly_stats?year=2024', headers=headers).get_json()
+    assert sum(annee_2024['values']) == 3
+    assert client.get('/api/arion/monthly_stats?year=abc', headers=headers).status_code == 400
+
+
+def test_formateurs_distincts_par_statut(client, headers, activites):
+    stats = client.get('/api/arion/status-stats', headers=headers).get_json()['status_stats']
+    assert dict(zip(stats['labels'], stats['values'])) == {'Non spécifié': 1, 'Permanent': 1, 'Vacataires': 2}
+
+
+def test_upload_authentifie_et_job_du_deposant(client):
+    contenu = "annee,activite,groupe,code_y,niveau,date,duree,formateur\n2023-2024,Cours,G1,Y1,FIE3,15/01/2024,2,Dupont\n"
+    response = client.post('/api/arion/upload', content_type='multipart/form-data',
+                           data={'file': (io.BytesIO(contenu.encode('utf-8')), 'arion.csv')})
+    assert response.status_code == 401
+
+    deposant = auth_headers('gestionnaire', 'responsable_admin')
+    resultat, status = upload(client, '/api/arion/upload', deposant, contenu, 'arion.csv')
+    assert status == 200
+    assert extensions.arion_collection.find_one({})['created_by'] == 'gestionnaire'
+    job = extensions.import_jobs.collection.find_one({})
+    assert job['created_by'] == 'gestionnaire'
+    assert client.get(f"/api/jobs/{job['_id']}", headers=deposant).status_code == 200
+    assert client.get(f"/api/jobs/{job['_id']}", headers=auth_headers('autre', 'secretaire')).status_code == 404
@@ -0,0 +1,68 @@
+"""
+Cache des graphiques rendus: ETag, 304 Not Modified et invalidation par version
+"""
+
+import pytest
+
+import extensions
+
+
+@pytest.fixture
+def rendus(monkeypatch):
+    """Remplace le pool de rendu par une image factice et compte les rendus"""
+    specs = []
+
+    def render(spec):
+        specs.append(spec)
+        return f"image-{len(specs)}"
+
+    monkeypatch.setattr(extensions.chart_renderer, 'render', render)
+    return specs
+
+
+@pytest.fixture
+def etudiants(app):
+    extensions.etudiants_collection.insert_many([
+        {'id': str(i), 'annee': '2023-2024', 'niveau': f'FIE{i % 3 + 1}', 'boursier': i % 2 == 0}
+        for i in range(6)
+    ])
+
+
+def test_second_appel_servi_depuis_le_cache(client, headers, etudiants, rendus):
+    premier = client.get('/api/etudiants/chart/niveaux_bar', headers=headers)
+    second = client.get('/api/etudiants/chart/niveaux_bar', headers=headers)
+
+    assert premier.status_code == second.status_code == 200
+    assert premier.headers['ETag'] == second.headers['ETag']
+    assert second.get_json()['image'] == premier.get_json()['image']
+    assert len(rendus) == 1
+
+
+def test_if_none_match_renvoie_304(client, headers, etudiants, rendus):
+    etag = client.get('/api/etudiants/chart/niveaux_bar', headers=headers).headers['ETag']
+
+    response = client.get('/api/etudiants/chart/niveaux_bar', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+    # Un autre filtre est un autre graphique
+    response = client.get('/api/etudiants/chart/niveaux_bar?annee=2023-2024',
+                          headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+
+
+def test_ecriture_invalide_l_etag(client, headers, etudiants, rendus):
+    etag = client.get('/api/etudiants/chart/niveaux_bar', headers=headers).headers['ETag']
+
+    extensions.bump_collection_version('etudiants')
+    response = client.get('/api/etudiants/chart/niveaux_bar', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert len(rendus) == 2
+
+
+def test_erreur_non_mise_en_cache(client, headers, etudiants, rendus):
+    response = client.get('/api/etudiants/chart/inconnu', headers=headers)
+    assert response.status_code == 400
+    assert 'ETag' not in response.headers
+    assert extensions.chart_cache.stats()['entries'] == 0
@@ -0,0 +1,55 @@
+"""
+Champs canoniques des étudiants: complément au démarrage et cohérence statistiques / graphiques
+"""
+
+import pytest
+
+import extensions
+
+# Documents enregistrés avant la normalisation à l'ingestion: colonnes d'origine seulement
+ANCIENS_ETUDIANTS = [
+    {'Nom': 'A', 'Genre': 'Masculin', 'Boursier(ère)': 'Oui', 'Etranger(ère)': 'Non', 'Nationalité': 'Française', 'niveau': 'FIE3', 'annee': '2023-2024'},
+    {'Nom': 'B', 'Genre': 'Féminin', 'Boursier(ère)': '', 'Etranger(ère)': '', 'Nationalité': 'Marocaine', 'niveau': 'FIE3', 'annee': '2023-2024'},
+    {'Nom': 'C', 'Genre': 'féminin', 'Boursier(ère)': 'non', 'Etranger(ère)': 'Oui', 'Nationalité': 'Italienne', 'niveau': 'FIE4', 'annee': '2023-2024'},
+    {'Nom': 'D', 'Genre': 'F', 'Boursier(ère)': None, 'Etranger(ère)': '', 'Nationalité': '', 'niveau': 'FIE4', 'annee': '2022-2023'},
+]
+
+
+@pytest.fixture
+def anciens_etudiants(app):
+    extensions.etudiants_collection.insert_many([dict(etudiant) for etudiant in ANCIENS_ETUDIANTS])
+
+
+@pytest.fixture
+def rendus(monkeypatch):
+    """Remplace le pool de rendu et conserve les spécifications reçues"""
+    specs = []
+
+    def render(spec):
+        specs.append(spec)
+        return 'image'
+
+    monkeypatch.setattr(extensions.chart_renderer, 'render', render)
+    return specs
+
+
+def test_champs_canoniques_completes_a_la_premiere_requete(client, headers, anciens_etudiants):
+    stats = client.get('/api/etudiants/stats', headers=headers).get_json()
+
+    assert extensions.etudiants_collection.count_documents({'boursier': {'$exists': False}}) == 0
+    assert (stats['boursiers']['boursiers'], stats['boursiers']['non_boursiers']) == (1, 3)
+    assert (stats['genre']['masculin'], stats['genre']['feminin']) == (1, 3)
+    assert stats['etrangers']['total_etrangers'] == 2
+
+
+def test_graphiques_coherents_avec_les_statistiques(client, headers, anciens_etudiants, rendus):
+    stats = client.get('/api/etudiants/stats', headers=headers).get_json()
+    for chart_type in ('boursiers_pie', 'genre_pie', 'etrangers_bar'):
+        assert client.get(f'/api/etudiants/chart/{chart_type}', headers=headers).status_code == 200
+    boursiers, genre, etrangers = rendus
+
+    assert boursiers['values'] == [stats['boursiers']['boursiers'], stats['boursiers']['non_boursiers']]
+    assert genre['values'] == [stats['genre']['masculin'], stats['genre']['feminin']]
+    assert dict(zip(etrangers['labels'], etrangers['values'])) == {
+        niveau: donnees['taux_etrangers'] for niveau, donnees in stats['etrangers']['par_niveau'].items()
+    }
@@ -0,0 +1,146 @@
+"""
+Imports d'étudiants: upload-data (JSON) et upload-csv
+"""
+
+import extensions
+from conftest import auth_headers, upload
+from migrations import dedoublonner_etudiants
+
+# Format documenté du CSV d'effectifs (voir effectifs_etudiants.html)
+EFFECTIFS_CSV = (
+    "Nom,Prénom,Genre,Date de naissance,Nationalité,Unnamed:6,Etranger(ère),Boursier(ère),"
+    "Adresse fixe,Code postal,Ville,Pays,Formation\n"
+    "Martin,Léa,Féminin,12/04/2003,Française,,Non,Oui,1 rue A,69000,Lyon,France,FIE3\n"
+    "Diallo,Moussa,Masculin,03/09/2002,Sénégalaise,,Oui,Non,2 rue B,69100,Villeurbanne,France,FIE4\n"
+)
+
+
+def importer_effectifs(client, headers, contenu, annee='2024-2025'):
+    """Import du CSV d'effectifs pour une année académique (champ annee du formulaire)"""
+    return upload(client, '/api/etudiants/upload-csv', headers, contenu, 'effectifs.csv', {'annee': annee})
+
+
+def test_upload_data_echec_si_aucune_ligne_ecrite(client, headers):
+    extensions.etudiants_collection.insert_many([{'_id': 'e1', 'Nom': 'A'}, {'_id': 'e2', 'Nom': 'B'}])
+
+    # Mêmes _id que des documents existants: chaque ligne est rejetée
+    response = client.post('/api/etudiants/upload-data', headers=headers, json={
+        'etudiants': [{'_id': 'e1', 'Nom': 'A'}, {'_id': 'e2', 'Nom': 'B'}]
+    })
+    body = response.get_json()
+    assert response.status_code == 400
+    assert body['success'] is False
+    assert body['records_failed'] == 2
+    assert [erreur['index'] for erreur in body['errors']] == [0, 1]
+
+
+def test_upload_data_succes_partiel(client, headers):
+    extensions.etudiants_collection.insert_one({'_id': 'e1', 'Nom': 'A'})
+
+    response = client.post('/api/etudiants/upload-data', headers=headers, json={
+        'etudiants': [{'_id': 'e1', 'Nom': 'A'}, {'Nom': 'B'}]
+    })
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['success'] is True
+    assert (body['records_inserted'], body['records_failed']) == (1, 1)
+
+
+def test_reimport_csv_identique_idempotent(client, headers):
+    premier, status = importer_effectifs(client, headers, EFFECTIFS_CSV)
+    assert status == 200
+    assert premier['records_inserted'] == 2
+    assert 'warning' not in premier
+
+    second, status = importer_effectifs(client, headers, EFFECTIFS_CSV)
+    assert status == 200
+    assert (second['records_inserted'], second['records_updated'], second['records_unchanged']) == (0, 0, 2)
+    assert extensions.etudiants_collection.count_documents({}) == 2
+
+
+def test_reimport_csv_modifie_met_a_jour(client, headers):
+    importer_effectifs(client, headers, EFFECTIFS_CSV)
+
+    modifie = EFFECTIFS_CSV.replace('Française,,Non,Oui', 'Française,,Non,Non')
+    resultat, status = importer_effectifs(client, headers, modifie)
+    assert status == 200
+    assert (resultat['records_inserted'], resultat['records_updated']) == (0, 1)
+    assert extensions.etudiants_collection.find_one({'Nom': 'Martin'})['boursier'] is False
+    assert extensions.etudiants_collection.count_documents({}) == 2
+
+
+def test_csv_sans_colonnes_de_la_cle_refuse(client, headers):
+    sans_date = "Nom,Prénom,Genre,Formation\nMartin,Léa,Féminin,FIE3\n"
+    resultat, status = importer_effectifs(client, headers, sans_date)
+    assert status == 400
+    assert 'Date de naissance' in resultat['error']
+    assert extensions.etudiants_collection.count_documents({}) == 0
+
+
+def test_csv_ligne_sans_cle_signalee(client, headers):
+    sans_formation = EFFECTIFS_CSV + "Petit,Jean,Masculin,01/01/2001,Française,,Non,Non,,,,,\n"
+    resultat, status = importer_effectifs(client, headers, sans_formation)
+    assert status == 200
+    assert resultat['records_without_key'] == 1
+    assert 'Formation' in resultat['warning']
+
+
+def test_upload_data_sans_cle_signale(client, headers):
+    response = client.post('/api/etudiants/upload-data', headers=headers, json={
+        'etudiants': [{'Nom': 'Martin', 'Prénom': 'Léa', 'Date de naissance': '12/04/2003', 'Formation': 'FIE3',
+                       'annee': '2024-2025'},
+                      {'Nom': 'Diallo'}]
+    })
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['records_without_key'] == 1
+    assert 'warning' in body
+
+
+def test_upload_csv_autorise_basic_upload(client):
+    resultat, status = importer_effectifs(client, auth_headers('secretaire', 'secretaire'), EFFECTIFS_CSV)
+    assert status == 200
+    assert resultat['records_inserted'] == 2
+
+    response = client.post('/api/etudiants/upload-csv', headers=auth_headers('invite', 'invite'))
+    assert response.status_code == 403
+
+
+def test_annee_fait_partie_de_la_cle(client, headers):
+    importer_effectifs(client, headers, EFFECTIFS_CSV, '2023-2024')
+    resultat, status = importer_effectifs(client, headers, EFFECTIFS_CSV, '2024-2025')
+    assert status == 200
+    assert resultat['records_inserted'] == 2
+    assert sorted(extensions.etudiants_collection.distinct('annee')) == ['2023-2024', '2024-2025']
+
+    assert importer_effectifs(client, headers, EFFECTIFS_CSV, 'courante')[1] == 400
+
+
+def test_csv_sans_annee_refuse(client, headers):
+    resultat, status = upload(client, '/api/etudiants/upload-csv', headers, EFFECTIFS_CSV, 'effectifs.csv')
+    assert status == 400
+    assert 'annee' in resultat['error']
+
+
+def test_doublons_du_lot_comptes(client, headers):
+    lignes = EFFECTIFS_CSV.splitlines(keepends=True)
+    resultat, status = importer_effectifs(client, headers, EFFECTIFS_CSV + lignes[1].replace(',Oui,1 rue A', ',Non,1 rue A'))
+    assert status == 200
+    assert (resultat['records_inserted'], resultat['records_duplicated']) == (2, 1)
+    assert 'doublon' in resultat['message']
+    assert extensions.etudiants_collection.find_one({'Nom': 'Martin'})['boursier'] is False
+
+
+def test_dedoublonnage_simule_par_defaut(app):
+    etudiant = {'Nom': 'Martin', 'Prénom': 'Léa', 'Date de naissance': '12/04/2003', 'Formation': 'FIE3',
+                'annee': '2024-2025'}
+    extensions.etudiants_collection.insert_many([dict(etudiant), dict(etudiant), {**etudiant, 'Formation': ''}])
+    lignes = []
+
+    assert dedoublonner_etudiants(extensions.etudiants_collection, rapport=lignes.append) == 0
+    assert extensions.etudiants_collection.count_documents({}) == 3
+    assert any('supprimé(s)' in ligne for ligne in lignes) and 'Simulation: 1 doublon' in lignes[-1]
+
+    assert dedoublonner_etudiants(extensions.etudiants_collection, appliquer=True, rapport=lignes.append) == 2
+    assert extensions.etudiants_collection.count_documents({}) == 2
+    assert extensions.etudiants_collection.count_documents({'Formation': {'$exists': False}}) == 1
@@ -0,0 +1,39 @@
+"""
+/etudiants/liste: statistiques en une agrégation, lignes complètes ou paginées à la demande
+"""
+
+import pytest
+
+import extensions
+
+
+@pytest.fixture
+def etudiants(app):
+    extensions.etudiants_collection.insert_many([
+        {'id': str(i), 'niveau': f'FIE{i % 3 + 1}', 'Genre': 'Féminin', 'Nationalité': 'Française',
+         'annee': '2023-2024', 'Boursier(ère)': 'Oui' if i < 50 else 'Non'}
+        for i in range(150)
+    ])
+
+
+def test_sans_pagination_toutes_les_lignes(client, headers, etudiants):
+    body = client.get('/etudiants/liste', headers=headers).get_json()
+    assert len(body['etudiants']) == 150
+    assert 'pagination' not in body
+    assert body['stats']['total_etudiants'] == 150
+    assert body['stats']['boursiers'] == {'Oui': 50, 'Non': 100}
+    assert body['stats']['niveaux'] == {'FIE1': 50, 'FIE2': 50, 'FIE3': 50}
+
+
+def test_pagination_demandee(client, headers, etudiants):
+    body = client.get('/etudiants/liste?page=2&per_page=40', headers=headers).get_json()
+    assert [etudiant['id'] for etudiant in body['etudiants']] == [str(i) for i in range(40, 80)]
+    assert body['pagination'] == {'page': 2, 'per_page': 40, 'total': 150, 'pages': 4}
+
+    body = client.get('/etudiants/liste?page=1', headers=headers).get_json()
+    assert len(body['etudiants']) == 100
+
+
+def test_stats_seules(client, headers, etudiants):
+    body = client.get('/etudiants/liste?stats_only=true', headers=headers).get_json()
+    assert 'etudiants' not in body and body['stats']['total_etudiants'] == 150
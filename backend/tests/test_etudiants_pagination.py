@@ -0,0 +1,34 @@
+"""
+/api/etudiants: tableau d'origine sans paramètre de page, pages par curseur sinon
+"""
+
+import pytest
+
+import extensions
+
+
+@pytest.fixture
+def etudiants(app):
+    extensions.etudiants_collection.insert_many([{'id': str(i), 'niveau': 'FIE3'} for i in range(7)])
+
+
+def test_forme_d_origine_sans_pagination(client, etudiants):
+    body = client.get('/api/etudiants').get_json()
+    assert [etudiant['id'] for etudiant in body] == [str(i) for i in range(7)]
+    assert '_id' not in body[0]
+
+    assert len(client.get('/api/etudiants?limit=3').get_json()) == 3
+
+
+def test_pages_par_curseur(client, etudiants):
+    ids, params = [], 'page_size=3'
+    while True:
+        page = client.get(f'/api/etudiants?{params}').get_json()
+        assert page['count'] == len(page['etudiants']) <= 3
+        ids += [etudiant['id'] for etudiant in page['etudiants']]
+        if not page['next_cursor']:
+            break
+        params = f"page_size=3&cursor={page['next_cursor']}"
+    assert ids == [str(i) for i in range(7)]
+
+    assert client.get('/api/etudiants?cursor=invalide').status_code == 400
@@ -0,0 +1,58 @@
+"""
+Import des heures d'enseignement: construction des UE en colonnes et upsert idempotent
+"""
+
+import io
+
+import pandas as pd
+
+import extensions
+from conftest import upload
+from routes.heures_enseignement import construire_ues_heures_enseignement
+
+MAQUETTE = (
+    "code_ue,nom_matiere,niveau,semestre,cm_hm,td_hm\n"
+    "UE1,Mathématiques,FIE3,S5,10,x\n"
+    ",Algèbre,FIE3,S5,5,2\n"
+    "UE2,Informatique,FIE3,S5,3,\n"
+)
+
+
+def test_construire_ues_regroupe_les_matieres_par_ue():
+    df = pd.read_csv(io.StringIO(MAQUETTE))
+    ues = construire_ues_heures_enseignement(df, '2023-2024', '2023', '2024')
+
+    assert [ue['unite_enseignement']['code'] for ue in ues] == ['UE1', 'UE2']
+    ue1 = ues[0]['unite_enseignement']
+    assert ue1['nom'] == 'Mathématiques'
+    assert [matiere['nom'] for matiere in ue1['matieres']] == ['Mathématiques (cours)', 'Algèbre']
+    # Valeur non numérique ou absente -> 0
+    assert ue1['matieres'][0]['heures_td']['hm'] == 0
+    assert ue1['matieres'][1]['heures_td']['hm'] == 2
+    assert ues[0]['annee_debut'] == 2023 and ues[0]['niveau'] == 'FIE3'
+
+
+def test_reimport_identique_ne_cree_pas_de_doublon(client, headers):
+    url = '/api/heures-enseignement/upload'
+    premier, status = upload(client, url, headers, MAQUETTE, 'maquette_2023-2024.csv')
+    assert status == 200
+    assert premier['records_inserted'] == 2
+
+    second, status = upload(client, url, headers, MAQUETTE, 'maquette_2023-2024.csv')
+    assert status == 200
+    assert (second['records_inserted'], second['records_updated'], second['records_unchanged']) == (0, 0, 2)
+    assert extensions.heures_enseignement_collection.count_documents({}) == 2
+
+
+def test_reimport_modifie_met_a_jour_l_ue(client, headers):
+    url = '/api/heures-enseignement/upload'
+    upload(client, url, headers, MAQUETTE, 'maquette_2023-2024.csv')
+
+    modifiee = MAQUETTE.replace('UE2,Informatique,FIE3,S5,3', 'UE2,Informatique,FIE3,S5,4')
+    resultat, status = upload(client, url, headers, modifiee, 'maquette_2023-2024.csv')
+    assert status == 200
+    assert (resultat['records_inserted'], resultat['records_updated']) == (0, 1)
+
+    ue2 = extensions.heures_enseignement_collection.find_one({'unite_enseignement.code': 'UE2'})
+    assert ue2['unite_enseignement']['matieres'][0]['heures_cm']['hm'] == 4
+    assert extensions.heures_enseignement_collection.count_documents({}) == 2
@@ -0,0 +1,61 @@
+"""
+Suivi des imports en tâche de fond: visibilité des jobs et jobs interrompus
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import extensions
+from conftest import auth_headers
+from config import IMPORT_JOB_STALE_SECONDS
+
+
+def _job(job_id, status='succeeded', created_by='alice', age=timedelta(0)):
+    date = datetime.utcnow() - age
+    return {
+        '_id': job_id, 'type': 'rse', 'filename': 'rse.csv', 'status': status,
+        'rows_total': None, 'rows_processed': 0, 'result': None, 'error': None, 'http_status': None,
+        'created_by': created_by, 'created_at': date, 'updated_at': date, 'started_at': date, 'finished_at': None
+    }
+
+
+@pytest.fixture
+def job_alice(app):
+    extensions.jobs_collection.insert_one(_job('job-alice'))
+    return 'job-alice'
+
+
+def test_le_createur_suit_son_import(client, job_alice):
+    response = client.get(f'/api/jobs/{job_alice}', headers=auth_headers('alice', 'responsable_admin'))
+    assert response.status_code == 200
+    assert response.get_json()['job_id'] == job_alice
+
+
+def test_un_autre_utilisateur_ne_voit_pas_l_import(client, job_alice):
+    response = client.get(f'/api/jobs/{job_alice}', headers=auth_headers('bob', 'responsable_admin'))
+    assert response.status_code == 404
+    assert 'rse.csv' not in response.get_data(as_text=True)
+
+
+def test_l_administrateur_voit_tous_les_imports(client, job_alice):
+    response = client.get(f'/api/jobs/{job_alice}', headers=auth_headers('root', 'admin'))
+    assert response.status_code == 200
+
+
+def test_jobs_interrompus_marques_en_echec_au_demarrage(client):
+    ancien = timedelta(seconds=IMPORT_JOB_STALE_SECONDS + 60)
+    extensions.jobs_collection.insert_many([
+        _job('perdu', status='running', age=ancien),
+        _job('jamais-lance', status='queued', age=ancien),
+        _job('actif', status='running'),
+        _job('termine', status='succeeded', age=ancien),
+    ])
+
+    # Première requête du processus: initialiser_base clôt les jobs sans progression
+    client.get('/api/test')
+
+    statuts = {job['_id']: job['status'] for job in extensions.jobs_collection.find()}
+    assert statuts == {'perdu': 'failed', 'jamais-lance': 'failed', 'actif': 'running', 'termine': 'succeeded'}
+    perdu = extensions.jobs_collection.find_one({'_id': 'perdu'})
+    assert perdu['http_status'] == 500 and perdu['finished_at'] is not None
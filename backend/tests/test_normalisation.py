@@ -0,0 +1,74 @@
+"""
+Normalisation à l'ingestion: dates ARION et champs canoniques des étudiants
+"""
+
+from datetime import date, datetime
+
+import pytest
+
+from normalisation import (
+    normaliser_date_arion, normaliser_etudiant, parser_annee_debut, parser_date, parser_oui_non
+)
+
+
+@pytest.mark.parametrize('valeur, attendu', [
+    ('2024-03-15', datetime(2024, 3, 15)),
+    ('2024-03-15T10:30:00+02:00', datetime(2024, 3, 15, 10, 30)),
+    ('15/03/2024', datetime(2024, 3, 15)),
+    ('15-03-2024', datetime(2024, 3, 15)),
+    ('2024/03/15', datetime(2024, 3, 15)),
+    (date(2024, 3, 15), datetime(2024, 3, 15)),
+    ('', None),
+    ('pas une date', None),
+    (None, None),
+])
+def test_parser_date(valeur, attendu):
+    assert parser_date(valeur) == attendu
+
+
+def test_normaliser_date_arion():
+    assert normaliser_date_arion({'date': '15/03/2024'}) == {'date': datetime(2024, 3, 15), 'year': 2024, 'month': 3}
+    # Une date illisible est conservée telle quelle
+    assert normaliser_date_arion({'date': 'bientôt'}) == {'date': 'bientôt', 'year': None, 'month': None}
+
+
+@pytest.mark.parametrize('valeur, attendu', [
+    ('Oui', True), (' OUI ', True), ('o', True), ('1', True), (1, True), (True, True),
+    ('Non', False), ('n', False), ('0', False), (0, False), (False, False),
+    ('', None), ('peut-être', None), (2, None), (None, None),
+])
+def test_parser_oui_non(valeur, attendu):
+    assert parser_oui_non(valeur) is attendu
+
+
+@pytest.mark.parametrize('valeur, attendu', [
+    ('2021-2022', 2021), (' 2021 - 2022 ', 2021), ('2023', 2023), (2023, 2023), (2023.0, 2023),
+    ('', None), ('année', None), (True, None), (None, None),
+])
+def test_parser_annee_debut(valeur, attendu):
+    assert parser_annee_debut(valeur) == attendu
+
+
+def test_normaliser_etudiant_conserve_les_colonnes_d_origine():
+    etudiant = normaliser_etudiant({
+        'Genre': 'Féminin', 'Boursier(ère)': 'Oui', 'Etranger(ère)': 'Non',
+        'Nationalité': 'Italienne', 'annee': '2022-2023'
+    })
+    assert (etudiant['genre'], etudiant['boursier'], etudiant['etranger'], etudiant['annee_debut']) == \
+        ('feminin', True, False, 2022)
+    assert etudiant['Genre'] == 'Féminin' and etudiant['Boursier(ère)'] == 'Oui'
+
+
+@pytest.mark.parametrize('nationalite, attendu', [
+    ('Française', False), ('francaise', False), ('', False), (None, False), ('Marocaine', True),
+])
+def test_normaliser_etudiant_etranger_deduit_de_la_nationalite(nationalite, attendu):
+    assert normaliser_etudiant({'Etranger(ère)': '', 'Nationalité': nationalite})['etranger'] is attendu
+
+
+def test_normaliser_etudiant_valeurs_absentes():
+    etudiant = normaliser_etudiant({'Genre': 'Autre'})
+    # Boursier non renseigné -> non boursier; genre inconnu -> None
+    assert etudiant['boursier'] is False
+    assert etudiant['genre'] is None
+    assert etudiant['annee_debut'] is None
@@ -0,0 +1,101 @@
+"""
+Résumé rse_stats tenu à jour par variations à chaque écriture RSE
+"""
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+import extensions
+from rse_stats import appliquer_variations_rse, inserer_rse, reconstruire_rse_stats, verifier_rse_stats
+
+
+def _resume(collection):
+    return sorted(
+        (tuple(ligne[champ] for champ in ('annee', 'promotion', 'type_activite', 'semestre')),
+         ligne['heures_cm'], ligne['heures_td'], ligne['heures_tp'], ligne['nombre_activites'])
+        for ligne in collection.find({}, {'_id': 0})
+    )
+
+
+def _activite(index, promotion='FIE3', heures=(1, 2, 3)):
+    return {
+        'id': f'rse_test_{index}', 'annee': 2023, 'promotion': promotion, 'semestre': 'S1',
+        'type_activite': 'Anthropocène', 'heures_cm': heures[0], 'heures_td': heures[1], 'heures_tp': heures[2]
+    }
+
+
+def test_variations_ajout_puis_retrait(app):
+    stats = extensions.mongo.db['rse_stats_unitaire']
+    activite = _activite(1)
+    appliquer_variations_rse(stats, ajouts=[activite, _activite(2, heures=(4, 0, 'x'))])
+    assert _resume(stats) == [((2023, 'FIE3', 'Anthropocène', 'S1'), 5, 2, 3, 2)]
+
+    appliquer_variations_rse(stats, retraits=[activite])
+    assert _resume(stats) == [((2023, 'FIE3', 'Anthropocène', 'S1'), 4, 0, 0, 1)]
+
+    # Une ligne dont le nombre d'activités retombe à 0 disparaît du résumé
+    appliquer_variations_rse(stats, retraits=[_activite(2, heures=(4, 0, 0))])
+    assert _resume(stats) == []
+
+
+def test_resume_incremental_egal_a_la_reconstruction(client, headers):
+    activites = [_activite(i, promotion=('FIE3', 'FIE4')[i % 2], heures=(i, 1, 0)) for i in range(6)]
+    assert client.post('/api/rse/bulk_add', headers=headers, json={'data': activites}).status_code == 200
+    assert client.post('/api/rse/update', headers=headers,
+                       json={'id': 'rse_test_1', 'heures_cm': 9, 'promotion': 'FIE5'}).status_code == 200
+    assert client.delete('/api/rse/delete/rse_test_2', headers=headers).status_code == 200
+    assert client.post('/api/rse/add', headers=headers,
+                       json={**_activite(3, heures=(2, 2, 2)), 'id': 'rse_test_3'}).status_code == 200
+
+    incremental = _resume(extensions.rse_stats_collection)
+    reconstruire_rse_stats(extensions.rse_collection, extensions.rse_stats_collection)
+    assert incremental == _resume(extensions.rse_stats_collection)
+
+    stats = client.get('/api/rse/stats', headers=headers).get_json()
+    assert stats['total_activites'] == 5
+    assert stats['total_heures_rse'] == sum(
+        activite['heures_cm'] + activite['heures_td'] + activite['heures_tp']
+        for activite in extensions.rse_collection.find()
+    )
+
+
+def test_bulk_add_stocke_les_heures_en_nombres(client, headers):
+    activite = {**_activite(1, heures=('2', '1.5', '')), 'heure1': '3', 'heure2': 'n/a'}
+    assert client.post('/api/rse/bulk_add', headers=headers, json={'data': [activite]}).status_code == 200
+
+    document = extensions.rse_collection.find_one({'id': 'rse_test_1'})
+    assert [document[champ] for champ in ('heures_cm', 'heures_td', 'heures_tp', 'heure1', 'heure2')] == [2, 1.5, 0, 3, 0]
+    assert 'heure3' not in document
+    assert _resume(extensions.rse_stats_collection) == [((2023, 'FIE3', 'Anthropocène', 'S1'), 2, 1.5, 0, 1)]
+
+
+def test_somme_heures_tolere_les_valeurs_non_numeriques():
+    from routes.rse import somme_heures_rse
+
+    conversion = somme_heures_rse('heure1')['$add'][0]['$convert']
+    assert (conversion['to'], conversion['onError'], conversion['onNull']) == ('double', 0, 0)
+
+
+def test_insertion_partielle_ne_compte_que_les_documents_ecrits(app):
+    extensions.rse_collection.insert_one({**_activite(0), '_id': 'existant'})
+    reconstruire_rse_stats(extensions.rse_collection, extensions.rse_stats_collection)
+
+    lot = [_activite(1), {**_activite(2), '_id': 'existant'}, _activite(3)]
+    with pytest.raises(BulkWriteError):
+        inserer_rse(extensions.rse_collection, extensions.rse_stats_collection, lot)
+
+    assert extensions.rse_collection.count_documents({}) == 2
+    assert _resume(extensions.rse_stats_collection) == [((2023, 'FIE3', 'Anthropocène', 'S1'), 2, 4, 6, 2)]
+    assert verifier_rse_stats(extensions.rse_collection, extensions.rse_stats_collection) == 0
+
+
+def test_verification_reconstruit_un_resume_derive(app):
+    extensions.rse_collection.insert_many([_activite(1), _activite(2, promotion='FIE4')])
+    appliquer_variations_rse(extensions.rse_stats_collection, ajouts=[_activite(1)])
+
+    assert verifier_rse_stats(extensions.rse_collection, extensions.rse_stats_collection) == 2
+    assert _resume(extensions.rse_stats_collection) == [
+        ((2023, 'FIE3', 'Anthropocène', 'S1'), 1, 2, 3, 1),
+        ((2023, 'FIE4', 'Anthropocène', 'S1'), 1, 2, 3, 1),
+    ]
+    assert verifier_rse_stats(extensions.rse_collection, extensions.rse_stats_collection) == 0
@@ -0,0 +1,127 @@
+"""
+Instantanés DataFrame: réutilisation, complément après insertion et relecture après modification
+"""
+
+import numpy as np
+import pytest
+from bson.objectid import ObjectId
+
+import extensions
+from snapshots import SnapshotCache
+
+
+@pytest.fixture
+def collection(app):
+    collection = extensions.mongo.collection('instantanes')
+    collection.insert_many([{'niveau': f'FIE{i % 2 + 1}', 'valeur': i} for i in range(10)])
+    return collection
+
+
+@pytest.fixture
+def snapshots(app):
+    return SnapshotCache(extensions.get_collection_etat, 0.5)
+
+
+def test_instantane_reutilise_tant_que_la_version_ne_change_pas(collection, snapshots):
+    premier = snapshots.frame(collection)
+    second = snapshots.frame(collection)
+
+    assert len(premier) == len(second) == 10
+    assert '_id' not in premier.columns
+    assert str(premier['niveau'].dtype) == 'category'
+    assert (snapshots.misses, snapshots.hits, snapshots.incremental) == (1, 1, 0)
+
+
+def test_insertion_seule_complete_l_instantane(collection, snapshots):
+    snapshots.frame(collection)
+
+    collection.insert_many([{'niveau': 'FIE3', 'valeur': 10}, {'niveau': 'FIE3', 'valeur': 11}])
+    extensions.bump_collection_version('instantanes', insertion_seule=True)
+    df = snapshots.frame(collection)
+
+    assert (snapshots.misses, snapshots.incremental) == (1, 1)
+    assert sorted(df['valeur'].tolist()) == list(range(12))
+    assert df['niveau'].value_counts()['FIE3'] == 2
+
+
+def test_modification_provoque_une_relecture(collection, snapshots):
+    snapshots.frame(collection)
+
+    collection.update_many({'niveau': 'FIE1'}, {'$set': {'niveau': 'FIE9'}})
+    extensions.bump_collection_version('instantanes')
+    df = snapshots.frame(collection)
+
+    assert (snapshots.misses, snapshots.incremental) == (2, 0)
+    assert set(df['niveau']) == {'FIE2', 'FIE9'}
+
+
+def test_insertion_hors_de_la_reprise_provoque_une_relecture(collection, snapshots):
+    snapshots.frame(collection)
+
+    # _id inférieur au dernier lu (autre client): le complément par _id ne le verrait pas
+    collection.insert_one({'_id': ObjectId('0' * 24), 'valeur': -1})
+    extensions.bump_collection_version('instantanes', insertion_seule=True)
+    df = snapshots.frame(collection)
+
+    assert (snapshots.misses, snapshots.incremental) == (2, 0)
+    assert len(df) == 11
+
+
+def test_instantane_partage_sans_copie(collection, snapshots):
+    premier = snapshots.frame(collection)
+    second = snapshots.frame(collection)
+
+    assert premier is not second
+    assert np.shares_memory(premier['valeur'].to_numpy(), second['valeur'].to_numpy())
+    # Une colonne ajoutée par un appelant ne remonte pas dans l'instantané
+    premier['derivee'] = premier['valeur'] * 2
+    assert 'derivee' not in snapshots.frame(collection).columns
+
+
+@pytest.fixture
+def rendus(monkeypatch):
+    """Remplace le pool de rendu et conserve les spécifications reçues"""
+    specs = []
+
+    def render(spec):
+        specs.append(spec)
+        return 'image'
+
+    monkeypatch.setattr(extensions.chart_renderer, 'render', render)
+    return specs
+
+
+def test_graphiques_etudiants_ne_modifient_pas_l_instantane(client, headers, rendus):
+    extensions.etudiants_collection.insert_many([
+        {'Nom': str(i), 'Genre': 'Féminin', 'Boursier(ère)': '', 'Etranger(ère)': '', 'Nationalité': None,
+         'niveau': f'FIE{i % 3 + 1}', 'annee': ('2022-2023', '2023-2024')[i % 2]}
+        for i in range(12)
+    ])
+    client.get('/api/etudiants/stats', headers=headers)
+    avant = extensions.snapshots.frame(extensions.etudiants_collection).copy()
+
+    for chart_type in ('boursiers_pie', 'niveaux_bar', 'genre_pie', 'etrangers_bar', 'evolution_line'):
+        assert client.get(f'/api/etudiants/chart/{chart_type}', headers=headers).status_code == 200
+    assert client.get('/api/etudiants/chart/niveaux_bar?annee=2023-2024', headers=headers).status_code == 200
+
+    apres = extensions.snapshots.frame(extensions.etudiants_collection)
+    assert list(apres.columns) == list(avant.columns)
+    assert apres.equals(avant)
+
+    evolution = rendus[4]
+    assert [serie['label'] for serie in evolution['series']] == ['FIE1', 'FIE2', 'FIE3']
+    assert evolution['series'][0]['x'] == ['2022', '2023']
+    assert sum(sum(serie['y']) for serie in evolution['series']) == 12
+    # Année filtrée: niveaux présents uniquement, sans barre à 0
+    assert sum(rendus[5]['values']) == 6 and 0 not in rendus[5]['values']
+
+
+def test_annees_sans_instantane(client, headers):
+    extensions.etudiants_collection.insert_many([
+        {'annee': '2023-2024'}, {'annee': '2022-2023'}, {'annee': '2023-2024'}, {'Nom': 'sans année'}
+    ])
+    misses = extensions.snapshots.misses
+
+    response = client.get('/api/etudiants/annees', headers=headers)
+    assert response.get_json() == {'annees': ['2022-2023', '2023-2024']}
+    assert extensions.snapshots.misses == misses
@@ -0,0 +1,96 @@
+"""
+Cache des claims JWT et révocation des jetons à la déconnexion
+"""
+
+import time
+from datetime import timedelta
+
+import jwt
+import pytest
+
+import extensions
+from conftest import make_token
+from config import JWT_SECRET_KEY
+from token_cache import TokenCache
+
+
+def test_claims_servis_depuis_le_cache():
+    cache = TokenCache(max_entries=10, ttl=60)
+    assert cache.get('jeton') is None
+    cache.put('jeton', {'username': 'alice', 'exp': time.time() + 60})
+
+    claims = cache.get('jeton')
+    assert claims['username'] == 'alice'
+    # Une copie: modifier les claims renvoyés ne modifie pas le cache
+    claims['username'] = 'bob'
+    assert cache.get('jeton')['username'] == 'alice'
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_entree_jamais_servie_apres_exp():
+    cache = TokenCache(max_entries=10, ttl=60)
+    cache.put('jeton', {'username': 'alice', 'exp': time.time() - 1})
+    assert cache.get('jeton') is None
+
+
+def test_cache_borne_en_nombre_d_entrees():
+    cache = TokenCache(max_entries=2, ttl=60)
+    for jeton in ('a', 'b', 'c'):
+        cache.put(jeton, {'username': jeton})
+    assert cache.get('a') is None
+    assert cache.stats()['entries'] == 2
+
+
+def test_revocation_jusqu_a_exp():
+    cache = TokenCache(max_entries=10, ttl=60)
+    cache.put('jeton', {'username': 'alice'})
+    cache.revoke('jeton', time.time() + 60)
+    assert cache.is_revoked('jeton')
+    assert cache.get('jeton') is None
+
+    cache.revoke('expire', time.time() - 1)
+    assert not cache.is_revoked('expire')
+    assert not cache.is_revoked('autre')
+
+
+@pytest.fixture
+def jeton(app):
+    return make_token('alice', 'responsable_admin')
+
+
+def test_jeton_refuse_apres_deconnexion(client, jeton):
+    headers = {'Authorization': f'Bearer {jeton}'}
+    # Première requête: claims mis en cache
+    assert client.get('/api/check-auth', headers=headers).status_code == 200
+
+    assert client.post('/api/logout', headers=headers).status_code == 200
+
+    response = client.get('/api/check-auth', headers=headers)
+    assert response.status_code == 401
+    assert response.get_json()['error'] == "Token révoqué"
+    assert client.post('/api/logout', headers=headers).status_code == 401
+
+
+def test_revocation_partagee_entre_processus(client, jeton, monkeypatch):
+    headers = {'Authorization': f'Bearer {jeton}'}
+    client.post('/api/logout', headers=headers)
+    assert extensions.jetons_revoques_collection.find_one({'_id': TokenCache.digest(jeton)})['expire_at'] is not None
+
+    # Autre processus: ni claims en cache ni révocation locale, seulement la trace dans MongoDB
+    autre_processus = TokenCache(max_entries=10, ttl=60)
+    monkeypatch.setattr(extensions, 'token_cache', autre_processus)
+    assert client.get('/api/check-auth', headers=headers).status_code == 401
+    assert autre_processus.is_revoked(jeton)
+
+
+def test_autres_jetons_non_concernes(client, jeton):
+    client.post('/api/logout', headers={'Authorization': f'Bearer {jeton}'})
+    autre = make_token('alice', 'responsable_admin')
+    assert client.get('/api/check-auth', headers={'Authorization': f'Bearer {autre}'}).status_code == 200
+
+
+def test_jeton_expire_ou_invalide(client):
+    expire = make_token(expires_in=timedelta(seconds=-10))
+    assert client.get('/api/check-auth', headers={'Authorization': f'Bearer {expire}'}).get_json()['error'] == "Token expiré"
+    falsifie = jwt.encode({'username': 'admin', 'role': 'admin'}, JWT_SECRET_KEY + 'x', algorithm='HS256')
+    assert client.get('/api/check-auth', headers={'Authorization': f'Bearer {falsifie}'}).get_json()['error'] == "Token invalide"
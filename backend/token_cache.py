@@ -0,0 +1,101 @@
+"""
+Cache des claims JWT déjà vérifiés
+
+Les tableaux de bord déclenchent une dizaine de requêtes par page avec le même
+jeton: plutôt que de revérifier la signature HS256 à chaque fois, on garde les
+claims décodés, indexés par l'empreinte SHA-256 du jeton. Une entrée n'est
+jamais servie après l'expiration (exp) du jeton ni au-delà du TTL configuré.
+
+Un jeton révoqué (déconnexion) est inscrit sur une liste de refus jusqu'à son
+exp: il n'est plus accepté, même si sa signature reste valide.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenCache:
+    """Cache LRU thread-safe, borné en nombre d'entrées et en durée"""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Empreinte -> exp des jetons révoqués
+        self._revoked = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(token):
+        """Empreinte SHA-256 d'un jeton: seule trace conservée, le jeton lui-même n'est pas stocké"""
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def get(self, token):
+        """Renvoie une copie des claims en cache, ou None si absents ou expirés"""
+        key = self.digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def put(self, token, claims):
+        """Met en cache les claims d'un jeton vérifié, jusqu'à son exp au plus tard"""
+        expires_at = time.time() + self.ttl
+        if isinstance(claims.get('exp'), (int, float)):
+            expires_at = min(expires_at, claims['exp'])
+
+        key = self.digest(token)
+        with self._lock:
+            self._entries[key] = (expires_at, dict(claims))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def revoke(self, token, expires_at=None):
+        """Refuse un jeton jusqu'à son exp (déconnexion) et retire ses claims du cache
+
+        Sans exp, le jeton reste refusé tant que le processus tourne.
+        """
+        key = self.digest(token)
+        now = time.time()
+        with self._lock:
+            self._entries.pop(key, None)
+            # Les jetons expirés sont de toute façon refusés par jwt.decode: inutile de les garder
+            for revoked_key in [k for k, exp in self._revoked.items() if exp <= now]:
+                del self._revoked[revoked_key]
+            self._revoked[key] = expires_at if isinstance(expires_at, (int, float)) else math.inf
+
+    def is_revoked(self, token):
+        """Indique si le jeton a été révoqué et n'a pas encore expiré"""
+        key = self.digest(token)
+        with self._lock:
+            expires_at = self._revoked.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.time():
+                del self._revoked[key]
+                return False
+            return True
+
+    def stats(self):
+        """Statistiques d'utilisation du cache"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "revoked": len(self._revoked),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses
+            }
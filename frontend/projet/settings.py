@@ -115,6 +115,21 @@ CRISPY_TEMPLATE_PACK = 'bootstrap4'
 # Configuration API Flask Backend
 API_BASE_URL = 'http://localhost:5000'
 API_URL = f'{API_BASE_URL}/api'
+
+# Vérification locale des jetons de l'API (même clé que JWT_SECRET_KEY côté Flask)
+API_JWT_SECRET_KEY = os.environ.get('API_JWT_SECRET_KEY', 'votre-cle-secrete-super-secure-pour-flask-jwt-2024')
+API_JWT_ALGORITHMS = ['HS256']
+# Intervalle (secondes) entre deux revalidations du jeton auprès de /api/check-auth
+API_AUTH_REVALIDATION_SECONDS = 300
+
+# Client HTTP vers l'API (pool de connexions par processus worker)
+API_CLIENT_POOL_MAXSIZE = int(os.environ.get('API_CLIENT_POOL_MAXSIZE', 10))
+API_CLIENT_TIMEOUT = 10  # secondes, si l'appel n'en précise pas
+API_CLIENT_RETRIES = 2  # verbes idempotents, erreurs de connexion et 502/503/504 uniquement
+API_CLIENT_BACKOFF_FACTOR = 0.3
+# Appels parallèles d'une même page: nombre de threads et échéance commune (secondes)
+API_CLIENT_FANOUT_WORKERS = 8
+API_CLIENT_FANOUT_DEADLINE = 20
 # Dans settings.py
 
 
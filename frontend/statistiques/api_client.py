@@ -0,0 +1,178 @@
+"""
+Client HTTP partagé pour les appels du frontend vers l'API Flask
+
+Une seule requests.Session par processus: les connexions TCP vers l'API sont
+réutilisées (keep-alive) au lieu d'être ouvertes à chaque appel. Toutes les
+requêtes ont un timeout par défaut, les verbes idempotents sont rejoués avec
+backoff sur les erreurs de connexion et les réponses 502/503/504, et la latence de chaque endpoint est
+comptée dans un histogramme. gather() lance en parallèle les appels
+indépendants d'une même page, avec une échéance commune.
+"""
+
+import bisect
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Bornes supérieures (ms) des tranches de l'histogramme de latence
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Segments d'URL variables (identifiants) regroupés sous un même endpoint
+_ID_SEGMENT = re.compile(r'^(?=.*\d)[\w-]{6,}$|^\d+$')
+
+
+def endpoint_label(method, url):
+    """Libellé d'un endpoint pour les statistiques: méthode + chemin sans identifiants"""
+    path = urlsplit(url).path
+    segments = ['<id>' if _ID_SEGMENT.match(segment) else segment for segment in path.split('/')]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+class ApiClient:
+    """Session HTTP avec pool de connexions, timeouts, retries et mesure de latence"""
+
+    def __init__(self, pool_maxsize, timeout, retries, backoff_factor, fanout_workers):
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.fanout_workers = fanout_workers
+        self._session = None
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._latencies = {}
+
+    def _build_session(self):
+        # Rejeu seulement si la requête n'a pas atteint l'API (connexion refusée) ou si la
+        # passerelle répond 502/503/504: un timeout de lecture n'est jamais rejoué, sinon un
+        # appel lent bloquerait la vue pendant (retries + 1) fois le timeout
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=0,
+            status=self.retries,
+            other=0,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE']),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    @property
+    def session(self):
+        """Session du processus courant (les sockets ne sont pas partagées après un fork)"""
+        with self._lock:
+            self._reset_after_fork()
+            if self._session is None:
+                self._session = self._build_session()
+            return self._session
+
+    def _get_executor(self):
+        with self._lock:
+            self._reset_after_fork()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.fanout_workers, thread_name_prefix='api')
+            return self._executor
+
+    def _reset_after_fork(self):
+        # Ni les sockets ni les threads du processus parent ne sont utilisables dans un fils
+        if self._pid != os.getpid():
+            self._session = None
+            self._executor = None
+            self._latencies = {}
+            self._pid = os.getpid()
+
+    def gather(self, tasks, deadline):
+        """Exécute en parallèle des appels indépendants (nom -> fonction sans argument)
+
+        Renvoie nom -> résultat, ou l'exception levée par l'appel; un appel non
+        terminé à l'échéance (secondes) est remplacé par une TimeoutError.
+        """
+        executor = self._get_executor()
+        futures = {name: executor.submit(task) for name, task in tasks.items()}
+        wait(futures.values(), timeout=deadline)
+
+        results = {}
+        for name, future in futures.items():
+            if not future.done():
+                future.cancel()
+                results[name] = TimeoutError(f"Appel '{name}' non terminé après {deadline}s")
+            elif future.exception() is not None:
+                results[name] = future.exception()
+            else:
+                results[name] = future.result()
+        return results
+
+    def request(self, method, url, **kwargs):
+        """Envoie une requête avec le timeout par défaut et enregistre sa latence"""
+        kwargs.setdefault('timeout', self.timeout)
+        session = self.session
+        start = time.perf_counter()
+        try:
+            return session.request(method, url, **kwargs)
+        finally:
+            self._record(endpoint_label(method, url), (time.perf_counter() - start) * 1000)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def _record(self, label, elapsed_ms):
+        with self._lock:
+            stats = self._latencies.get(label)
+            if stats is None:
+                stats = self._latencies[label] = {
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1)
+                }
+            stats['count'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['buckets'][bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    def latency_stats(self):
+        """Histogramme de latence par endpoint pour ce processus"""
+        labels = [f"<={borne}ms" for borne in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        with self._lock:
+            return {
+                label: {
+                    'count': stats['count'],
+                    'avg_ms': round(stats['total_ms'] / stats['count'], 1),
+                    'max_ms': round(stats['max_ms'], 1),
+                    'histogram': dict(zip(labels, stats['buckets']))
+                }
+                for label, stats in sorted(self._latencies.items())
+            }
+
+
+api = ApiClient(
+    pool_maxsize=settings.API_CLIENT_POOL_MAXSIZE,
+    timeout=settings.API_CLIENT_TIMEOUT,
+    retries=settings.API_CLIENT_RETRIES,
+    backoff_factor=settings.API_CLIENT_BACKOFF_FACTOR,
+    fanout_workers=settings.API_CLIENT_FANOUT_WORKERS
+)
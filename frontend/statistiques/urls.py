@@ -26,6 +26,7 @@ urlpatterns = [
     path('effectifs-etudiants/', views.effectifs_etudiants, name='effectifs_etudiants'),
     path('effectifs-etudiants/add/', views.update_data, name='effectifs_add_data'),
     path('upload-csv-etudiants/', views.upload_csv_etudiants, name='upload_csv_etudiants'),
+    path('effectifs-etudiants/page/', views.etudiants_page, name='etudiants_page'),
 
  # Nouvelles routes pour les enseignants
     path('enseignement/', views.enseignement, name='enseignement'),
@@ -78,6 +79,12 @@ urlpatterns = [
     path('cat-special/upload-csv/', views.cat_special_upload_csv, name='cat_special_upload_csv'),
     path('cat-special/data/', views.get_cat_special_data, name='get_cat_special_data'),
 
+    # Suivi des imports traités en tâche de fond
+    path('api/jobs/<str:job_id>/', views.import_job_status, name='import_job_status'),
+
+    # Latence des appels du frontend vers l'API Flask
+    path('api/client-stats/', views.api_client_stats, name='api_client_stats'),
+
 ]
     
 
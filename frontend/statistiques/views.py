@@ -8,10 +8,13 @@ from django.contrib.auth import authenticate, login as auth_login, logout as aut
 from django.views.decorators.csrf import csrf_exempt
 from .forms import CSVUploadForm, UserRegisterForm, DataUpdateForm
 from .models import CSVFile, UserRole
+from .api_client import api
 import requests
 import json
 import logging
 import math
+import time
+import jwt
 from django.core.cache import cache
 import json
 import pandas as pd
@@ -71,7 +74,7 @@ def register(request):
                 'role': role
             }
             
-            response = requests.post(f"{settings.API_URL}/register", json=api_data, timeout=10)
+            response = api.post(f"{settings.API_URL}/register", json=api_data, timeout=10)
             
             if response.status_code == 201:
                 messages.success(request, 'Compte créé avec succès! Votre compte est en attente d\'approbation par un administrateur.')
@@ -99,7 +102,7 @@ def login_view(request):
             try:
                 # Authentification via l'API Flask
                 api_data = {'username': username, 'password': password}
-                response = requests.post(f"{settings.API_URL}/login", json=api_data, timeout=10)
+                response = api.post(f"{settings.API_URL}/login", json=api_data, timeout=10)
                 
                 if response.status_code == 200:
                     api_response = response.json()
@@ -107,6 +110,7 @@ def login_view(request):
                     # Stocker le token dans la session
                     request.session['api_token'] = api_response['token']
                     request.session['user_info'] = api_response['user']
+                    request.session.pop('api_auth', None)
                     
                     # Authentification Django (optionnelle, pour compatibilité)
                     user = authenticate(request, username=username, password=password)
@@ -145,7 +149,7 @@ def logout_view(request):
         token = request.session.get('api_token')
         if token:
             headers = {'Authorization': f'Bearer {token}'}
-            requests.post(f"{settings.API_URL}/logout", headers=headers, timeout=5)
+            api.post(f"{settings.API_URL}/logout", headers=headers, timeout=5)
         
         # Nettoyer la session
         request.session.flush()
@@ -159,24 +163,56 @@ def logout_view(request):
     
     return redirect('home')
 
+def _clear_api_auth(request):
+    """Retire le jeton et les claims en cache de la session"""
+    request.session.pop('api_token', None)
+    request.session.pop('user_info', None)
+    request.session.pop('api_auth', None)
+
 def is_api_authenticated(request):
-    """Vérifie si l'utilisateur est authentifié via l'API"""
+    """Vérifie si l'utilisateur est authentifié via l'API
+
+    Le jeton est vérifié localement (signature et exp) et ses claims sont gardés
+    en session jusqu'à son expiration; /api/check-auth n'est rappelé qu'une fois
+    par API_AUTH_REVALIDATION_SECONDS.
+    """
     token = request.session.get('api_token')
     if not token:
         return False, None
     
-    try:
-        headers = {'Authorization': f'Bearer {token}'}
-        response = requests.get(f"{settings.API_URL}/check-auth", headers=headers, timeout=5)
-        if response.status_code == 200:
-            return True, response.json()['user']
-        else:
-            # Token invalide, nettoyer la session
-            request.session.pop('api_token', None)
-            request.session.pop('user_info', None)
+    now = time.time()
+    auth = request.session.get('api_auth')
+    
+    if not auth or auth['exp'] <= now:
+        try:
+            claims = jwt.decode(token, settings.API_JWT_SECRET_KEY, algorithms=settings.API_JWT_ALGORITHMS)
+        except jwt.InvalidTokenError:
+            # Token invalide ou expiré, nettoyer la session
+            _clear_api_auth(request)
             return False, None
-    except:
-        return False, None
+        auth = {
+            'claims': claims,
+            'exp': claims.get('exp', now + settings.API_AUTH_REVALIDATION_SECONDS),
+            'checked_at': 0
+        }
+        request.session['api_auth'] = auth
+    
+    if now - auth['checked_at'] >= settings.API_AUTH_REVALIDATION_SECONDS:
+        try:
+            headers = {'Authorization': f'Bearer {token}'}
+            response = api.get(f"{settings.API_URL}/check-auth", headers=headers, timeout=5)
+            if response.status_code == 200:
+                auth['claims'] = response.json()['user']
+                auth['checked_at'] = now
+                request.session['api_auth'] = auth
+            elif response.status_code == 401:
+                _clear_api_auth(request)
+                return False, None
+        except requests.exceptions.RequestException as e:
+            # Le jeton a été vérifié localement: on réessaiera à la prochaine requête
+            logger.warning(f"Revalidation du jeton impossible: {e}")
+    
+    return True, auth['claims']
 
 def api_authenticated_required(view_func):
     """Décorateur pour vérifier l'authentification API"""
@@ -195,7 +231,7 @@ def dashboard(request):
     token = request.session.get('api_token')
     headers = {'Authorization': f'Bearer {token}'}
     try:
-        response = requests.get(f"{settings.API_URL}/statistics", headers=headers, timeout=10)
+        response = api.get(f"{settings.API_URL}/statistics", headers=headers, timeout=10)
         if response.status_code == 200:
             statistics = response.json()
         else:
@@ -227,7 +263,7 @@ def upload_csv(request):
                 }
                 
                 # Envoyer à l'API Flask
-                response = requests.post(
+                response = api.post(
                     f"{settings.API_URL}/upload", 
                     files=files, 
                     headers=headers,
@@ -287,7 +323,7 @@ def view_data(request):
     headers = {'Authorization': f'Bearer {token}'}
     
     try:
-        response = requests.get(f"{settings.API_URL}/data", headers=headers, timeout=10)
+        response = api.get(f"{settings.API_URL}/data", headers=headers, timeout=10)
         if response.status_code == 200:
             data = response.json()
         else:
@@ -313,7 +349,7 @@ def update_data(request):
             headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
             
             try:
-                response = requests.post(
+                response = api.post(
                     f"{settings.API_URL}/update",
                     json=data,
                     headers=headers,
@@ -370,7 +406,7 @@ def update_data(request):
 def api_status(request):
     """Vérifie le statut de l'API Flask"""
     try:
-        response = requests.get(f"{settings.API_BASE_URL}/", timeout=5)
+        response = api.get(f"{settings.API_BASE_URL}/", timeout=5)
         if response.status_code == 200:
             return JsonResponse({'status': 'online', 'message': 'API accessible'})
         else:
@@ -391,7 +427,7 @@ def admin_users(request):
     headers = {'Authorization': f'Bearer {token}'}
     
     try:
-        response = requests.get(f"{settings.API_URL}/users", headers=headers, timeout=10)
+        response = api.get(f"{settings.API_URL}/users", headers=headers, timeout=10)
         if response.status_code == 200:
             users_data = response.json()
             
@@ -464,7 +500,7 @@ def approve_user_proxy(request, user_id):
         logger.info(f"URL API appelée: {api_url}")
         
         # Envoyer la requête avec toutes les données disponibles
-        response = requests.post(
+        response = api.post(
             api_url,
             headers=headers,
             json=data,  # Envoyer toutes les données, y compris username si disponible
@@ -510,25 +546,41 @@ def effectifs_etudiants(request):
     headers = {'Authorization': f'Bearer {token}'}
     
     etudiants = []
+    next_cursor = None
     annees = []
     niveaux = []
     
-    try:
-        # Corriger l'URL pour récupérer tous les étudiants
+    def charger_etudiants():
+        # Première page seulement: le navigateur charge les suivantes avec next_cursor (etudiants_page)
         api_url = f"{settings.API_BASE_URL}/api/etudiants"
         logger.info(f"Appel à l'API: {api_url}")
-        
-        response = requests.get(api_url, headers=headers, timeout=30)  # Augmenter le timeout
+        response = api.get(api_url, headers=headers, params={'page_size': ''}, timeout=15)
+        if response.status_code != 200:
+            return response, {}
+        return response, response.json()
+    
+    # Les étudiants, les années et les niveaux sont récupérés en parallèle
+    reponses = api.gather({
+        'etudiants': charger_etudiants,
+        'annees': lambda: api.get(f"{settings.API_BASE_URL}/api/etudiants/annees", headers=headers, timeout=15),
+        'niveaux': lambda: api.get(f"{settings.API_BASE_URL}/api/etudiants/niveaux", headers=headers, timeout=15),
+    }, deadline=settings.API_CLIENT_FANOUT_DEADLINE)
+    
+    if isinstance(reponses['etudiants'], Exception):
+        logger.error(f"Erreur: {str(reponses['etudiants'])}")
+        messages.error(request, f"Une erreur s'est produite: {str(reponses['etudiants'])}")
+    else:
+        response, page = reponses['etudiants']
+        etudiants = page.get('etudiants', [])
+        next_cursor = page.get('next_cursor')
         logger.info(f"Réponse de l'API: Status {response.status_code}")
         
         if response.status_code == 200:
-            # Récupérer la liste des étudiants
-            etudiants = response.json()
             logger.info(f"Données étudiants récupérées: {len(etudiants)} étudiants")
             
-            # Récupérer les années disponibles
-            annees_response = requests.get(f"{settings.API_BASE_URL}/api/etudiants/annees", headers=headers, timeout=15)
-            if annees_response.status_code == 200:
+            # Années disponibles
+            annees_response = reponses['annees']
+            if not isinstance(annees_response, Exception) and annees_response.status_code == 200:
                 annees = annees_response.json().get('annees', [])
                 logger.info(f"Années récupérées: {annees}")
             else:
@@ -536,9 +588,9 @@ def effectifs_etudiants(request):
                 # Extraire les années à partir des données étudiants
                 annees = sorted(list(set([etudiant.get('annee', '') for etudiant in etudiants if etudiant.get('annee')])))
                 
-            # Récupérer les niveaux disponibles
-            niveaux_response = requests.get(f"{settings.API_BASE_URL}/api/etudiants/niveaux", headers=headers, timeout=15)
-            if niveaux_response.status_code == 200:
+            # Niveaux disponibles
+            niveaux_response = reponses['niveaux']
+            if not isinstance(niveaux_response, Exception) and niveaux_response.status_code == 200:
                 niveaux = niveaux_response.json().get('niveaux', [])
                 logger.info(f"Niveaux récupérés: {niveaux}")
             else:
@@ -548,10 +600,6 @@ def effectifs_etudiants(request):
         else:
             logger.error(f"Erreur API étudiants: {response.status_code} - {response.text}")
             messages.error(request, "Erreur lors de la récupération des données étudiants.")
-            
-    except Exception as e:
-        logger.error(f"Erreur: {str(e)}")
-        messages.error(request, f"Une erreur s'est produite: {str(e)}")
     
     # Si aucune donnée n'est disponible
     if not etudiants:
@@ -563,11 +611,26 @@ def effectifs_etudiants(request):
     
     return render(request, 'statistiques/effectifs_etudiants.html', {
         'etudiants': etudiants_json,
+        'next_cursor': next_cursor or '',
         'annees': annees,
         'niveaux': niveaux,  # Passer les niveaux au template
         'api_url': settings.API_BASE_URL
     })
 
+@api_authenticated_required
+def etudiants_page(request):
+    """Vue AJAX: page suivante des étudiants, à partir du curseur renvoyé par la page précédente"""
+    token = request.session.get('api_token')
+    headers = {'Authorization': f'Bearer {token}'}
+    params = {'cursor': request.GET.get('cursor', ''), 'page_size': request.GET.get('page_size', '')}
+    
+    try:
+        response = api.get(f"{settings.API_BASE_URL}/api/etudiants", headers=headers, params=params, timeout=15)
+        return JsonResponse(response.json(), status=response.status_code)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Erreur lors du chargement d'une page d'étudiants: {e}")
+        return JsonResponse({"error": "Erreur de connexion à l'API"}, status=500)
+
 @api_authenticated_required
 def upload_csv_etudiants(request):
     if request.method != 'POST':
@@ -582,54 +645,43 @@ def upload_csv_etudiants(request):
         return JsonResponse({"error": "Seuls les fichiers CSV sont acceptés"}, status=400)
     
     try:
-        # Lire le contenu du fichier CSV
-        file_content = file.read().decode('utf-8', errors='replace')
-        
-        # Diviser le contenu en lignes
-        lines = file_content.strip().split('\n')
-        
-        # La première ligne contient les en-têtes
-        headers = [h.strip() for h in lines[0].split(',')]
-        
-        # Traiter chaque ligne pour créer les documents étudiants
-        etudiants = []
-        for i in range(1, len(lines)):
-            line = lines[i].strip()
-            if not line:  # Ignorer les lignes vides
-                continue
-                
-            # Diviser la ligne en colonnes
-            columns = [col.strip() for col in line.split(',')]
-            
-            # Créer le document étudiant avec tous les champs du CSV
-            etudiant = {}
-            for j, col in enumerate(columns):
-                if j < len(headers):
-                    etudiant[headers[j]] = col
-            
-            etudiants.append(etudiant)
-        
-        # Envoyer les données à l'API
+        # Le fichier est transmis tel quel: l'API le lit en flux avec le module csv et l'insère par lots
         token = request.session.get('api_token')
-        headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
+        headers = {'Authorization': f'Bearer {token}'}
+        files = {'file': (file.name, file, 'text/csv')}
+        # Année académique de l'import: fait partie de la clé des étudiants côté API
+        data = {'annee': request.POST.get('annee', '')}
         
-        response = requests.post(
-            f"{settings.API_URL}/etudiants/upload-data",
-            json={'etudiants': etudiants},
+        response = api.post(
+            f"{settings.API_URL}/etudiants/upload-csv",
+            files=files,
+            data=data,
             headers=headers,
-            timeout=30
+            timeout=60
         )
         
+        # Import long: l'API répond 202 avec l'identifiant du job à suivre
+        if response.status_code == 202:
+            return JsonResponse(response.json(), status=202)
+        
+        api_response = response.json()
         if response.status_code == 200:
-            api_response = response.json()
             return JsonResponse({
                 "success": True,
-                "message": f"Données d'étudiants importées avec succès! {len(etudiants)} étudiants traités.",
-                "records_inserted": api_response.get('records_inserted', 0)
+                "message": api_response.get('message', "Données d'étudiants importées avec succès!"),
+                "records_inserted": api_response.get('records_inserted', 0),
+                "records_updated": api_response.get('records_updated', 0),
+                "records_unchanged": api_response.get('records_unchanged', 0),
+                "records_duplicated": api_response.get('records_duplicated', 0),
+                "records_failed": api_response.get('records_failed', 0),
+                "batch_errors": api_response.get('batch_errors', []),
+                "warning": api_response.get('warning')
             })
         else:
-            api_response = response.json()
-            return JsonResponse({"error": api_response.get('error', 'Erreur inconnue')}, status=response.status_code)
+            return JsonResponse({
+                "error": api_response.get('error', 'Erreur inconnue'),
+                "batch_errors": api_response.get('batch_errors', [])
+            }, status=response.status_code)
             
     except Exception as e:
         logger.error(f"Erreur: {str(e)}")
@@ -644,7 +696,7 @@ def heures_enseignement(request):
     
     try:
         # Essayer de récupérer des statistiques de base pour s'assurer que l'API est accessible
-        response = requests.get(f"{settings.API_URL}/heures-enseignement/stats", headers=headers, timeout=10)
+        response = api.get(f"{settings.API_URL}/heures-enseignement/stats", headers=headers, timeout=10)
         if response.status_code != 200:
             messages.warning(request, f"Impossible de récupérer les statistiques (Code: {response.status_code})")
     except requests.exceptions.RequestException as e:
@@ -667,7 +719,7 @@ def enseignement(request):
         api_url = f"{settings.API_URL}/enseignement/stats"
         logger.info(f"Appel à l'API: {api_url}")
         
-        response = requests.get(api_url, headers=headers, timeout=10)
+        response = api.get(api_url, headers=headers, timeout=10)
         logger.info(f"Réponse de l'API: Status {response.status_code}")
         
         if response.status_code == 200:
@@ -738,7 +790,7 @@ def enseignement_add_data(request):
         # Log pour débogage
         logger.info(f"Envoi des données à l'API: {data}")
         
-        response = requests.post(
+        response = api.post(
             f"{settings.API_URL}/enseignement/update",
             json=data,
             headers=headers,
@@ -790,7 +842,7 @@ def enseignement_upload_csv(request):
                 'text/csv'
             )
         }
-        response = requests.post(
+        response = api.post(
             f"{settings.API_URL}/enseignement/upload", 
             files=files, 
             headers=headers,
@@ -817,7 +869,7 @@ def enseignement_delete_data(request, annee, semestre):
     headers = {'Authorization': f'Bearer {token}'}
     
     try:
-        response = requests.delete(
+        response = api.delete(
             f"{settings.API_URL}/enseignement/delete/{annee}/{semestre}",
             headers=headers,
             timeout=10
@@ -841,7 +893,7 @@ def categories_enseignement(request):
     
     try:
         # Récupérer les statistiques spécifiques des catégories d'enseignement
-        response = requests.get(f"{settings.API_URL}/enseignement/categories/stats", headers=headers, timeout=10)
+        response = api.get(f"{settings.API_URL}/enseignement/categories/stats", headers=headers, timeout=10)
         
         if response.status_code == 200:
             stats_data = response.json()
@@ -948,7 +1000,7 @@ def heures_enseignement_upload_csv(request):
         files = {'file': (file.name, file.read(), 'application/octet-stream')}
         
         # Vous n'envoyez plus les paramètres supplémentaires, car ils seront extraits du fichier
-        response = requests.post(
+        response = api.post(
             f"{settings.API_URL}/heures-enseignement/upload",
             files=files,
             headers=headers,
@@ -957,13 +1009,19 @@ def heures_enseignement_upload_csv(request):
         
         logger.info(f"Réponse API: Status {response.status_code}")
         
+        # Import long: l'API répond 202 avec l'identifiant du job à suivre
+        if response.status_code == 202:
+            return JsonResponse(response.json(), status=202)
+        
         if response.status_code == 200:
             api_response = response.json()
             logger.info(f"Importation réussie: {api_response}")
             return JsonResponse({
                 "success": True,
                 "message": api_response.get('message', 'Fichier importé avec succès!'),
-                "records_inserted": api_response.get('records_inserted', 0)
+                "records_inserted": api_response.get('records_inserted', 0),
+                "records_updated": api_response.get('records_updated', 0),
+                "records_unchanged": api_response.get('records_unchanged', 0)
             })
         else:
             error_message = "Erreur lors de l'importation du fichier"
@@ -990,7 +1048,7 @@ def get_heures_enseignement_data(request):
     
     try:
         # Récupérer les données depuis l'API principale
-        response = requests.get(f"{settings.API_URL}/heures-enseignement/data", headers=headers, timeout=10)
+        response = api.get(f"{settings.API_URL}/heures-enseignement/data", headers=headers, timeout=10)
         
         if response.status_code == 200:
             return JsonResponse(response.json(), safe=False)
@@ -1028,7 +1086,7 @@ def get_heures_enseignement_graph_data(request):
             params['semestre'] = semestre
         
         # Appeler l'API
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        response = api.get(url, headers=headers, params=params, timeout=10)
         
         if response.status_code == 200:
             return JsonResponse(response.json(), safe=False)
@@ -1047,43 +1105,24 @@ def rse_view(request):
     
     stats = None
     rse_data = []
+    pagination = None
+    promotions_disponibles = []
     
     try:
-        # Récupérer les statistiques depuis l'API
-        response = requests.get(f"{settings.API_URL}/rse/stats", headers=headers, timeout=10)
+        # Récupérer les statistiques et une page des données détaillées en un seul appel
+        params = {'include': 'rows', 'page': request.GET.get('page', 1)}
+        response = api.get(f"{settings.API_URL}/rse/stats", headers=headers, params=params, timeout=10)
         if response.status_code == 200:
             stats = response.json()
-            logger.info(f"Stats RSE récupérées: {stats.keys()}")
+            rse_data = stats.pop('donnees_par_element', [])
+            pagination = stats.pop('pagination', None)
+            promotions_disponibles = stats.get('promotions_disponibles', [])
+            logger.info(f"Stats RSE récupérées: {len(rse_data)} enregistrements sur la page")
         else:
             logger.warning(f"Impossible de récupérer les stats RSE: Code {response.status_code}")
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des stats RSE: {e}")
     
-    try:
-        # Récupérer les données détaillées
-        response = requests.get(f"{settings.API_URL}/rse/data", headers=headers, timeout=10)
-        if response.status_code == 200:
-            rse_data = response.json()
-            logger.info(f"Données RSE récupérées: {len(rse_data)} enregistrements")
-            
-            # Extraire les promotions disponibles directement des données
-            promotions_disponibles = sorted(list(set(item.get('promotion') for item in rse_data if item.get('promotion'))))
-            
-            # Si stats existe déjà, mettre à jour ou ajouter les promotions disponibles
-            if stats:
-                stats['promotions_disponibles'] = promotions_disponibles
-            else:
-                # Créer des statistiques de base si stats n'existe pas
-                stats = {
-                    'promotions_disponibles': promotions_disponibles
-                }
-                
-            logger.info(f"Promotions disponibles: {promotions_disponibles}")
-        else:
-            logger.warning(f"Impossible de récupérer les données RSE: Code {response.status_code}")
-    except Exception as e:
-        logger.error(f"Erreur lors de la récupération des données RSE: {e}")
-    
     # Liste des types d'activités RSE
     activites_maquette = [
         "Transition écologique et numérique",
@@ -1097,31 +1136,19 @@ def rse_view(request):
         "Autre"
     ]
     
-    # Si pas de stats disponibles, créer des statistiques basiques à partir des données
-    if not stats and rse_data:
-        total_heures = sum(item.get('total_heures', 0) for item in rse_data)
-        promotions = set(item.get('promotion') for item in rse_data if item.get('promotion'))
-        
-        stats = {
-            'total_heures_rse': total_heures,
-            'total_activites': len(rse_data),
-            'promotions_impliquees': len(promotions),
-            'etudiants_impliques': len(promotions) * 30,  # Estimation
-            'promotions_disponibles': sorted(list(promotions)),
-            'annees_disponibles': sorted(list(set(item.get('annee') for item in rse_data if item.get('annee'))))
-        }
-    
     # Pour les requêtes AJAX, renvoyer juste les données JSON
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return JsonResponse({
             'stats': stats,
-            'rse_data': rse_data
+            'rse_data': rse_data,
+            'pagination': pagination
         })
     
     # Pour les requêtes normales, renvoyer la page HTML
     return render(request, 'statistiques/rse.html', {
         'stats': json.dumps(stats) if stats else "{}",
         'rse_data': rse_data,
+        'pagination': pagination,
         'activites_maquette': activites_maquette,
         'promotions_disponibles': promotions_disponibles
     })
@@ -1181,7 +1208,7 @@ def rse_add_data(request):
             url = f"{settings.API_URL}/rse/add"
             data.pop('id', None)  # Supprimer l'ID pour une nouvelle entrée
         
-        response = requests.post(
+        response = api.post(
             url,
             json=data,
             headers=headers,
@@ -1223,7 +1250,7 @@ def rse_delete_data(request, id):
     headers = {'Authorization': f'Bearer {token}'}
     
     try:
-        response = requests.delete(
+        response = api.delete(
             f"{settings.API_URL}/rse/delete/{id}",
             headers=headers,
             timeout=10
@@ -1298,7 +1325,7 @@ def rse_upload_csv(request):
             'Content-Type': 'application/json'
         }
         
-        response = requests.post(
+        response = api.post(
             f"{settings.API_URL}/rse/bulk_add",
             json={'data': result['data']},
             headers=headers,
@@ -1452,53 +1479,30 @@ def process_rse_csv(file_path):
                 os.remove(file_path)
             except:
                 pass
-@api_authenticated_required
-def get_rse_data(request):
-    """API pour obtenir les données RSE filtrées par promotion"""
+def _get_rse_dashboard(request, params=None):
+    """Récupère les séries agrégées de /api/rse/dashboard; renvoie (données, réponse d'erreur)"""
     token = request.session.get('api_token')
     headers = {'Authorization': f'Bearer {token}'}
     
+    response = api.get(f"{settings.API_URL}/rse/dashboard", headers=headers, params=params, timeout=10)
+    if response.status_code != 200:
+        return None, JsonResponse({'error': 'Erreur lors de la récupération des données RSE'}, status=response.status_code)
+    return response.json(), None
+
+@api_authenticated_required
+def get_rse_data(request):
+    """API pour obtenir les données RSE filtrées par promotion"""
     # Récupérer le paramètre de promotion s'il est spécifié
     promotion = request.GET.get('promotion', 'all')
     
     try:
-        # Récupérer les données RSE complètes
-        response = requests.get(f"{settings.API_URL}/rse/data", headers=headers, timeout=10)
-        
-        if response.status_code != 200:
-            return JsonResponse({'error': 'Erreur lors de la récupération des données RSE'}, status=response.status_code)
-        
-        # Traiter les données
-        rse_data = response.json()
-        
-        # Filtrer par promotion si nécessaire
-        if promotion != 'all':
-            rse_data = [item for item in rse_data if item.get('promotion') == promotion]
+        dashboard, erreur = _get_rse_dashboard(request, {'promotion': promotion} if promotion != 'all' else None)
+        if erreur:
+            return erreur
         
-        # Calculer les totaux pour les heures
-        total_cm = sum(int(item.get('heures_cm', 0)) for item in rse_data)
-        total_td = sum(int(item.get('heures_td', 0)) for item in rse_data)
-        total_tp = sum(int(item.get('heures_tp', 0)) for item in rse_data)
-        
-        # Calculer les heures additionnelles si présentes
-        additional_hours = {}
-        for hour_type in ['heure1', 'heure2', 'heure3', 'heure4']:
-            if any(hour_type in item for item in rse_data):
-                additional_hours[hour_type] = sum(int(item.get(hour_type, 0)) for item in rse_data)
-        
-        # Extraire la liste des promotions disponibles
-        promotions = list(set(item.get('promotion') for item in rse_data if item.get('promotion')))
-        promotions.sort()  # Trier les promotions
-        
-        # Retourner les données au format JSON
         return JsonResponse({
-            'data': {
-                'heures_cm': total_cm,
-                'heures_td': total_td,
-                'heures_tp': total_tp,
-                **additional_hours  # Inclure les heures additionnelles si présentes
-            },
-            'promotions': promotions
+            'data': dashboard['heures'],
+            'promotions': dashboard['promotions_disponibles']
         })
         
     except Exception as e:
@@ -1508,48 +1512,13 @@ def get_rse_data(request):
 @api_authenticated_required
 def get_rse_evolution_data(request):
     """API pour obtenir les données d'évolution des heures RSE par année"""
-    token = request.session.get('api_token')
-    headers = {'Authorization': f'Bearer {token}'}
-    
     try:
-        # Récupérer les données RSE complètes
-        response = requests.get(f"{settings.API_URL}/rse/data", headers=headers, timeout=10)
-        
-        if response.status_code != 200:
-            return JsonResponse({'error': 'Erreur lors de la récupération des données RSE'}, status=response.status_code)
-        
-        # Traiter les données
-        rse_data = response.json()
-        
-        # Récupérer la liste des années disponibles
-        annees = list(set(item.get('annee') for item in rse_data if item.get('annee')))
-        annees.sort()  # Trier les années
-        
-        # Initialiser les données d'évolution
-        evolution_data = []
-        
-        # Pour chaque année, calculer les totaux
-        for annee in annees:
-            # Filtrer les enregistrements pour cette année
-            records = [item for item in rse_data if item.get('annee') == annee]
-            
-            # Calculer les totaux pour cette année
-            total_cm = sum(int(item.get('heures_cm', 0)) for item in records)
-            total_td = sum(int(item.get('heures_td', 0)) for item in records)
-            total_tp = sum(int(item.get('heures_tp', 0)) for item in records)
-            total = total_cm + total_td + total_tp
-            
-            # Ajouter à nos données d'évolution
-            evolution_data.append({
-                'annee': annee,
-                'cm': total_cm,
-                'td': total_td,
-                'tp': total_tp,
-                'total': total
-            })
+        dashboard, erreur = _get_rse_dashboard(request)
+        if erreur:
+            return erreur
         
         return JsonResponse({
-            'evolution_data': evolution_data
+            'evolution_data': dashboard['evolution']
         })
         
     except Exception as e:
@@ -1559,39 +1528,13 @@ def get_rse_evolution_data(request):
 @api_authenticated_required
 def get_rse_activity_types(request):
     """API pour obtenir la répartition des heures par type d'activité"""
-    token = request.session.get('api_token')
-    headers = {'Authorization': f'Bearer {token}'}
-    
     try:
-        # Récupérer les données RSE complètes
-        response = requests.get(f"{settings.API_URL}/rse/data", headers=headers, timeout=10)
-        
-        if response.status_code != 200:
-            return JsonResponse({'error': 'Erreur lors de la récupération des données RSE'}, status=response.status_code)
-        
-        # Traiter les données
-        rse_data = response.json()
-        
-        # Créer un dictionnaire pour stocker les totaux par type d'activité
-        type_totals = {}
-        
-        # Calculer les totaux par type d'activité
-        for item in rse_data:
-            type_activite = item.get('type_activite', 'Non spécifié')
-            if type_activite not in type_totals:
-                type_totals[type_activite] = 0
-                
-            # Ajouter les heures totales pour ce type
-            heures_cm = int(item.get('heures_cm', 0))
-            heures_td = int(item.get('heures_td', 0))
-            heures_tp = int(item.get('heures_tp', 0))
-            type_totals[type_activite] += heures_cm + heures_td + heures_tp
-        
-        # Convertir en liste pour le tri
-        types_list = [{'type_activite': k, 'total_heures': v} for k, v in type_totals.items()]
+        dashboard, erreur = _get_rse_dashboard(request)
+        if erreur:
+            return erreur
         
-        # Trier par total d'heures décroissant
-        types_list.sort(key=lambda x: x['total_heures'], reverse=True)
+        # Types déjà triés par total d'heures décroissant
+        types_list = dashboard['types']
         
         # Limiter à 8 types pour la lisibilité si nécessaire
         if len(types_list) > 8:
@@ -1614,42 +1557,12 @@ def get_rse_activity_types(request):
 @api_authenticated_required
 def get_rse_format_cours(request):
     """API pour obtenir la répartition globale CM/TD/TP"""
-    token = request.session.get('api_token')
-    headers = {'Authorization': f'Bearer {token}'}
-    
     try:
-        # Récupérer les données RSE complètes
-        response = requests.get(f"{settings.API_URL}/rse/data", headers=headers, timeout=10)
+        dashboard, erreur = _get_rse_dashboard(request)
+        if erreur:
+            return erreur
         
-        if response.status_code != 200:
-            return JsonResponse({'error': 'Erreur lors de la récupération des données RSE'}, status=response.status_code)
-        
-        # Traiter les données
-        rse_data = response.json()
-        
-        # Calculer les totaux
-        total_cm = sum(int(item.get('heures_cm', 0)) for item in rse_data)
-        total_td = sum(int(item.get('heures_td', 0)) for item in rse_data)
-        total_tp = sum(int(item.get('heures_tp', 0)) for item in rse_data)
-        
-        # Calculer les pourcentages
-        total = total_cm + total_td + total_tp
-        
-        if total > 0:
-            percent_cm = (total_cm / total) * 100
-            percent_td = (total_td / total) * 100
-            percent_tp = (total_tp / total) * 100
-        else:
-            percent_cm = percent_td = percent_tp = 0
-        
-        return JsonResponse({
-            'total_cm': total_cm,
-            'total_td': total_td,
-            'total_tp': total_tp,
-            'percent_cm': round(percent_cm, 1),
-            'percent_td': round(percent_td, 1),
-            'percent_tp': round(percent_tp, 1)
-        })
+        return JsonResponse(dashboard['format_cours'])
         
     except Exception as e:
         logger.error(f"Erreur dans get_rse_format_cours: {e}")
@@ -1658,52 +1571,13 @@ def get_rse_format_cours(request):
 @api_authenticated_required
 def get_rse_hours_by_promotion(request):
     """API pour obtenir les heures RSE totales par promotion"""
-    token = request.session.get('api_token')
-    headers = {'Authorization': f'Bearer {token}'}
-    
     try:
-        # Récupérer les données RSE complètes
-        response = requests.get(f"{settings.API_URL}/rse/data", headers=headers, timeout=10)
-        
-        if response.status_code != 200:
-            return JsonResponse({'error': 'Erreur lors de la récupération des données RSE'}, status=response.status_code)
-        
-        # Traiter les données
-        rse_data = response.json()
-        
-        # Créer un dictionnaire pour stocker les totaux par promotion
-        promotion_totals = {}
-        
-        # Calculer les totaux par promotion
-        for item in rse_data:
-            promotion = item.get('promotion')
-            if not promotion:
-                continue
-                
-            if promotion not in promotion_totals:
-                promotion_totals[promotion] = 0
-                
-            # Ajouter les heures totales pour cette promotion
-            heures_cm = int(item.get('heures_cm', 0))
-            heures_td = int(item.get('heures_td', 0))
-            heures_tp = int(item.get('heures_tp', 0))
-            
-            # Ajouter les heures additionnelles si présentes
-            additional_hours = 0
-            for hour_key in ['heure1', 'heure2', 'heure3', 'heure4']:
-                if hour_key in item:
-                    additional_hours += int(item.get(hour_key, 0))
-            
-            promotion_totals[promotion] += heures_cm + heures_td + heures_tp + additional_hours
-        
-        # Convertir en liste pour le tri
-        promotions_list = [{'promotion': k, 'total_heures': v} for k, v in promotion_totals.items()]
-        
-        # Trier par nom de promotion
-        promotions_list.sort(key=lambda x: x['promotion'])
+        dashboard, erreur = _get_rse_dashboard(request)
+        if erreur:
+            return erreur
         
         return JsonResponse({
-            'promotions_data': promotions_list
+            'promotions_data': dashboard['promotions']
         })
         
     except Exception as e:
@@ -1717,22 +1591,14 @@ def get_rse_item(request, id):
     headers = {'Authorization': f'Bearer {token}'}
     
     try:
-        # Récupérer les données RSE complètes
-        response = requests.get(f"{settings.API_URL}/rse/data", headers=headers, timeout=10)
+        response = api.get(f"{settings.API_URL}/rse/item/{id}", headers=headers, timeout=10)
         
+        if response.status_code == 404:
+            return JsonResponse({'error': f'Aucun élément RSE trouvé avec l\'ID {id}'}, status=404)
         if response.status_code != 200:
             return JsonResponse({'error': 'Erreur lors de la récupération des données RSE'}, status=response.status_code)
         
-        # Traiter les données
-        rse_data = response.json()
-        
-        # Trouver l'élément avec l'ID spécifié
-        item = next((item for item in rse_data if item.get('id') == id), None)
-        
-        if not item:
-            return JsonResponse({'error': f'Aucun élément RSE trouvé avec l\'ID {id}'}, status=404)
-        
-        return JsonResponse(item)
+        return JsonResponse(response.json())
         
     except Exception as e:
         logger.error(f"Erreur dans get_rse_item: {e}")
@@ -1760,21 +1626,21 @@ def arion_api_redirect(request):
         if request.method == 'GET':
             # Transmettre les paramètres de requête GET
             params = request.GET.dict()
-            response = requests.get(flask_url, params=params)
+            response = api.get(flask_url, params=params)
         elif request.method == 'POST':
             # Vérifier s'il s'agit d'un formulaire multipart ou de données JSON
             if request.content_type and 'multipart/form-data' in request.content_type:
                 # Cas de l'upload de fichier CSV
                 files = {'file': request.FILES['file']} if 'file' in request.FILES else None
                 data = request.POST.dict()
-                response = requests.post(flask_url, files=files, data=data)
+                response = api.post(flask_url, files=files, data=data)
             else:
                 # Cas des données JSON
                 try:
                     data = json.loads(request.body)
-                    response = requests.post(flask_url, json=data)
+                    response = api.post(flask_url, json=data)
                 except json.JSONDecodeError:
-                    response = requests.post(flask_url, data=request.body)
+                    response = api.post(flask_url, data=request.body)
         else:
             # Méthode non supportée
             return JsonResponse({"error": f"Méthode {request.method} non supportée"}, status=405)
@@ -1797,7 +1663,7 @@ def arion_api_stats(request):
         flask_url = f"{FLASK_API_URL}/api/arion/stats"
         
         # Faire la requête à l'API Flask
-        response = requests.get(flask_url)
+        response = api.get(flask_url)
         
         # Retourner la réponse du serveur Flask
         return HttpResponse(
@@ -1820,7 +1686,7 @@ def arion_api_add(request):
         data = json.loads(request.body)
         
         # Faire la requête à l'API Flask
-        response = requests.post(flask_url, json=data)
+        response = api.post(flask_url, json=data)
         
         # Retourner la réponse du serveur Flask
         return HttpResponse(
@@ -1840,7 +1706,7 @@ def arion_api_delete(request, item_id):
         flask_url = f"{FLASK_API_URL}/api/arion/delete/{item_id}"
         
         # Faire la requête à l'API Flask
-        response = requests.delete(flask_url)
+        response = api.delete(flask_url)
         
         # Retourner la réponse du serveur Flask
         return HttpResponse(
@@ -1867,8 +1733,9 @@ def arion_api_upload(request):
         files = {'file': (file.name, file.read(), file.content_type)}
         data = {'annee_import': annee_import} if annee_import else {}
         
-        # Faire la requête à l'API Flask
-        response = requests.post(flask_url, files=files, data=data)
+        # Faire la requête à l'API Flask au nom de l'utilisateur connecté (propriétaire du job d'import)
+        headers = {'Authorization': f"Bearer {request.session.get('api_token')}"}
+        response = api.post(flask_url, files=files, data=data, headers=headers)
         
         # Retourner la réponse du serveur Flask
         return HttpResponse(
@@ -1877,7 +1744,7 @@ def arion_api_upload(request):
             content_type=response.headers.get('Content-Type', 'application/json')
         )
     except Exception as e:
-        return JsonResponse({"error": f"Erreur de connexion au serveur API: {str(e)}"}), 500
+        return JsonResponse({"error": f"Erreur de connexion au serveur API: {str(e)}"}, status=500)
 
 @api_authenticated_required
 def arion_status_stats(request):
@@ -1886,45 +1753,11 @@ def arion_status_stats(request):
     headers = {'Authorization': f'Bearer {token}'}
     
     try:
-        # Appel à l'API Flask pour obtenir les données
-        response = requests.get(f"{settings.API_URL}/arion/data", headers=headers, timeout=10)
+        # Le comptage des formateurs distincts par statut est fait par l'API
+        response = api.get(f"{settings.API_URL}/arion/status-stats", headers=headers, timeout=10)
         
         if response.status_code == 200:
-            # Récupérer les données
-            data = response.json()
-            
-            # Utiliser un dictionnaire pour suivre les formateurs uniques par statut
-            formateurs_par_statut = {}
-            
-            for item in data:
-                # Extraire le formateur et le statut
-                formateur = item.get('formateur')
-                statut = item.get('statut', 'Non spécifié')
-                
-                # Standardiser les statuts pour éviter les variations mineures
-                if statut == 'Vacataire':
-                    statut = 'Vacataires'
-                elif not statut or statut.lower() == 'non spécifié':
-                    statut = 'Non spécifié'
-                
-                # Initialiser le dictionnaire pour ce statut si nécessaire
-                if statut not in formateurs_par_statut:
-                    formateurs_par_statut[statut] = set()
-                
-                # Ajouter le formateur à l'ensemble pour ce statut (les ensembles éliminent les doublons)
-                if formateur:
-                    formateurs_par_statut[statut].add(formateur)
-            
-            # Calculer le nombre de formateurs uniques par statut
-            status_stats = {
-                "labels": list(formateurs_par_statut.keys()),
-                "values": [len(formateurs) for formateurs in formateurs_par_statut.values()]
-            }
-            
-            return JsonResponse({
-                'success': True,
-                'status_stats': status_stats
-            })
+            return JsonResponse(response.json())
         else:
             # En cas d'erreur, renvoyer un message approprié
             return JsonResponse({
@@ -1940,6 +1773,7 @@ def arion_status_stats(request):
 
 @api_authenticated_required
 def arion_monthly_stats(request):
+    """Vue pour obtenir le nombre d'activités ARION par mois"""
     try:
         # Récupérer le paramètre d'année optionnel
         selected_year = request.GET.get('year', None)
@@ -1953,54 +1787,18 @@ def arion_monthly_stats(request):
         token = request.session.get('api_token')
         headers = {'Authorization': f'Bearer {token}'}
         
-        # Ajouter des paramètres de pagination et limiter les données
-        # Faire la requête à l'API Flask pour récupérer les données
-        response = requests.get(
-            f"{settings.API_URL}/arion/data", 
-            headers=headers, 
-            params={'limit': 500},  # Limiter à 500 résultats pour améliorer les performances
-            timeout=5  # Réduire le timeout
+        # Les comptes par mois sont agrégés par l'API
+        response = api.get(
+            f"{settings.API_URL}/arion/monthly_stats",
+            headers=headers,
+            params={'year': selected_year} if selected_year else None,
+            timeout=10
         )
         
         if response.status_code != 200:
             return JsonResponse({"error": "Impossible de récupérer les données"}, status=response.status_code)
         
-        # Obtenir les données
-        data = response.json()
-        
-        # Initialiser les compteurs pour chaque mois
-        monthly_counts = {month: 0 for month in range(1, 13)}
-        
-        # Parcourir les données et compter les activités par mois
-        for item in data:
-            # Vérifier si la date est valide
-            if 'date' in item and item['date']:
-                try:
-                    # La date est au format YYYY-MM-DD
-                    date_parts = item['date'].split('-')
-                    if len(date_parts) == 3:
-                        year = date_parts[0]
-                        month = int(date_parts[1])
-                        
-                        # Filtrer par année si spécifiée
-                        if selected_year and year != selected_year:
-                            continue
-                            
-                        # Incrémenter le compteur pour ce mois
-                        if month in monthly_counts:
-                            monthly_counts[month] += 1
-                except Exception as e:
-                    # Ne pas surcharger les logs
-                    pass
-        
-        # Préparer les données pour le graphique
-        month_names = ["Jan", "Fév", "Mar", "Avr", "Mai", "Juin", "Juil", "Août", "Sep", "Oct", "Nov", "Déc"]
-        values = [monthly_counts[month] for month in range(1, 13)]
-        
-        result = {
-            "labels": month_names,
-            "values": values
-        }
+        result = response.json()
         
         # Stocker dans le cache pour 10 minutes (600 secondes)
         cache.set(cache_key, result, 600)
@@ -2020,7 +1818,7 @@ def vacataire(request):
     
     try:
         # Récupérer les données des vacataires depuis l'API
-        response = requests.get(f"{settings.API_URL}/vacataire/data", headers=headers, timeout=10)
+        response = api.get(f"{settings.API_URL}/vacataire/data", headers=headers, timeout=10)
         if response.status_code == 200:
             vacataires_data = response.json()
             logger.info(f"Données vacataires récupérées: {len(vacataires_data)} enregistrements")
@@ -2045,7 +1843,7 @@ def vacataire_data(request):
     
     try:
         # Récupérer les données des vacataires depuis l'API
-        response = requests.get(f"{settings.API_URL}/vacataire/data", headers=headers, timeout=10)
+        response = api.get(f"{settings.API_URL}/vacataire/data", headers=headers, timeout=10)
         if response.status_code == 200:
             vacataires_data = response.json()
             logger.info(f"Données vacataires récupérées: {len(vacataires_data)} enregistrements")
@@ -2065,7 +1863,7 @@ def vacataire_stats(request):
     
     try:
         # Récupérer les statistiques des vacataires depuis l'API
-        response = requests.get(f"{settings.API_URL}/vacataire/stats", headers=headers, timeout=10)
+        response = api.get(f"{settings.API_URL}/vacataire/stats", headers=headers, timeout=10)
         if response.status_code == 200:
             stats_data = response.json()
             logger.info("Statistiques vacataires récupérées avec succès")
@@ -2107,7 +1905,7 @@ def vacataire_add_data(request):
         data = request.POST.dict()
         
         # Envoyer les données à l'API
-        response = requests.post(
+        response = api.post(
             f"{settings.API_URL}/vacataire/add",
             headers=headers,
             json=data,
@@ -2149,7 +1947,7 @@ def vacataire_upload_csv(request):
         # Envoyer le fichier à l'API
         files = {'file': (csv_file.name, csv_file, 'text/csv')}
         
-        response = requests.post(
+        response = api.post(
             f"{settings.API_URL}/vacataire/upload-csv",
             headers=headers,
             files=files,
@@ -2158,6 +1956,10 @@ def vacataire_upload_csv(request):
         
         logger.info(f"Réponse API upload CSV: Status {response.status_code}")
         
+        # Import long: l'API répond 202 avec l'identifiant du job à suivre
+        if response.status_code == 202:
+            return JsonResponse(response.json(), status=202)
+        
         if response.status_code == 200:
             api_response = response.json()
             return JsonResponse({
@@ -2194,7 +1996,7 @@ def vacataire_delete(request, id):
     headers = {'Authorization': f'Bearer {token}'}
     
     try:
-        response = requests.delete(
+        response = api.delete(
             f"{settings.API_URL}/vacataire/delete/{id}",
             headers=headers,
             timeout=10
@@ -2224,7 +2026,7 @@ def vacataire_update(request, id):
         data = request.POST.dict()
         
         # Envoyer les données à l'API
-        response = requests.put(
+        response = api.put(
             f"{settings.API_URL}/vacataire/update/{id}",
             headers=headers,
             json=data,
@@ -2248,7 +2050,7 @@ def vacataire_stats(request):
     headers = {'Authorization': f'Bearer {token}'}
     
     try:
-        response = requests.get(f"{settings.API_URL}/vacataire/stats", headers=headers, timeout=10)
+        response = api.get(f"{settings.API_URL}/vacataire/stats", headers=headers, timeout=10)
         
         if response.status_code == 200:
             stats_data = response.json()
@@ -2297,7 +2099,7 @@ def cat_special_upload_csv(request):
         # Envoyer le fichier à l'API
         files = {'file': (file.name, file.read(), 'application/octet-stream')}
         
-        response = requests.post(
+        response = api.post(
             f"{settings.API_URL}/cat-special/upload",
             files=files,
             headers=headers,
@@ -2306,6 +2108,10 @@ def cat_special_upload_csv(request):
         
         logger.info(f"Réponse API: Status {response.status_code}")
         
+        # Import long: l'API répond 202 avec l'identifiant du job à suivre
+        if response.status_code == 202:
+            return JsonResponse(response.json(), status=202)
+        
         if response.status_code == 200:
             api_response = response.json()
             logger.info(f"Importation réussie: {api_response}")
@@ -2329,6 +2135,28 @@ def cat_special_upload_csv(request):
         logger.error(f"Erreur imprévue: {e}")
         return JsonResponse({"error": f"Erreur lors du traitement du fichier: {str(e)}"}, status=500)
 
+@api_authenticated_required
+def import_job_status(request, job_id):
+    """Vue pour suivre l'avancement d'un import traité en tâche de fond"""
+    token = request.session.get('api_token')
+    headers = {'Authorization': f'Bearer {token}'}
+    
+    try:
+        response = api.get(f"{settings.API_URL}/jobs/{job_id}", headers=headers, timeout=10)
+        return JsonResponse(response.json(), status=response.status_code)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Erreur lors du suivi de l'import {job_id}: {e}")
+        return JsonResponse({"error": "Erreur de connexion à l'API"}, status=500)
+
+@api_authenticated_required
+def api_client_stats(request):
+    """Vue pour consulter la latence des appels à l'API (admin seulement)"""
+    user_info = request.session.get('user_info', {})
+    if user_info.get('role') != 'admin':
+        return JsonResponse({"error": "Accès interdit"}, status=403)
+    
+    return JsonResponse({"endpoints": api.latency_stats()})
+
 @api_authenticated_required
 def get_cat_special_data(request):
     """Vue pour récupérer les données des catégories spéciales"""
@@ -2337,7 +2165,7 @@ def get_cat_special_data(request):
         headers = {'Authorization': f'Bearer {token}'}
         
         # Ajout du préfixe /api si nécessaire
-        response = requests.get(
+        response = api.get(
             f"{settings.API_URL}/api/cat-special",  # Notez le /api ajouté ici
             headers=headers,
             timeout=30